@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(scope='session', autouse=True)
+def locmem_cache(django_test_environment):
+    """Кэш в памяти для всех тестов, как у core.testing.TestRunner."""
+    from core.testing import locmem_cache
+
+    with locmem_cache():
+        yield
@@ -0,0 +1,50 @@
+"""Вспомогательные функции для замеров производительности."""
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """Выполняет блок в транзакции и откатывает все его изменения."""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * len(ordered))))
+    return ordered[index]
+
+
+def summarize(timings):
+    """Сводка по списку замеров в миллисекундах."""
+    return {
+        'runs': len(timings),
+        'min': round(min(timings), 3),
+        'median': round(statistics.median(timings), 3),
+        'p95': round(percentile(timings, 95), 3),
+        'max': round(max(timings), 3),
+    }
+
+
+def measure(func, repeat=20, warmup=2):
+    """Время выполнения func() в миллисекундах."""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize(timings)
@@ -0,0 +1,253 @@
+"""Кэш в файле SQLite, общий для всех процессов сервера."""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache ('
+    ' key TEXT PRIMARY KEY, value BLOB NOT NULL,'
+    ' expires REAL, accessed REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)',
+    'CREATE TABLE IF NOT EXISTS stats ('
+    ' name TEXT PRIMARY KEY, value INTEGER NOT NULL)',
+)
+STAT_NAMES = ('hits', 'misses', 'sets', 'deletes', 'evictions')
+
+
+class SQLiteCache(BaseCache):
+    """Кэш в файле SQLite (режим WAL), общий для процессов gunicorn.
+
+    Каждая запись хранит свой срок жизни. При превышении MAX_ENTRIES
+    вытесняются записи, которые дольше всех не читались (LRU). Время
+    чтения обновляется не чаще раза в ACCESS_RESOLUTION секунд, чтобы
+    чтения не превращались в записи. Счётчики hits/misses копятся в
+    процессе и периодически сбрасываются в общую таблицу stats.
+
+    OPTIONS: MAX_ENTRIES, CULL_FREQUENCY, ACCESS_RESOLUTION,
+    CULL_EVERY (проверять размер раз в N записей), STATS_FLUSH_EVERY.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._path = location
+        self._access_resolution = float(
+            options.get('ACCESS_RESOLUTION', 60)
+        )
+        self._cull_every = int(options.get('CULL_EVERY', 32))
+        self._flush_every = int(options.get('STATS_FLUSH_EVERY', 100))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._writes = 0
+
+    @property
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(
+                self._path, timeout=10, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            for statement in SCHEMA:
+                connection.execute(statement)
+            self._local.connection = connection
+        return connection
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._pending[name] += amount
+            flush = sum(self._pending.values()) >= self._flush_every
+        if flush:
+            self._flush_stats()
+
+    def _flush_stats(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return
+        self._connection.executemany(
+            'INSERT INTO stats (name, value) VALUES (?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+            pending.items(),
+        )
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _read(self, keys):
+        if not keys:
+            return {}
+        now = time.time()
+        placeholders = ', '.join('?' * len(keys))
+        rows = self._connection.execute(
+            f'SELECT key, value, expires, accessed FROM cache '
+            f'WHERE key IN ({placeholders})',
+            keys,
+        ).fetchall()
+        found, stale, touched = {}, [], []
+        for key, value, expires, accessed in rows:
+            if expires is not None and expires <= now:
+                stale.append(key)
+                continue
+            found[key] = pickle.loads(value)
+            if accessed < now - self._access_resolution:
+                touched.append((now, key))
+        if stale:
+            self._connection.executemany(
+                'DELETE FROM cache WHERE key = ? AND expires <= ?',
+                [(key, now) for key in stale],
+            )
+        if touched:
+            self._connection.executemany(
+                'UPDATE cache SET accessed = ? WHERE key = ?', touched
+            )
+        self._count('hits', len(found))
+        self._count('misses', len(keys) - len(found))
+        return found
+
+    def _write(self, items, timeout, replace=True):
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+        verb = 'INSERT OR REPLACE' if replace else 'INSERT OR IGNORE'
+        connection = self._connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            if not replace:
+                connection.execute(
+                    'DELETE FROM cache WHERE key = ? AND expires <= ?',
+                    (items[0][0], now),
+                )
+            cursor = connection.executemany(
+                f'{verb} INTO cache (key, value, expires, accessed) '
+                f'VALUES (?, ?, ?, ?)',
+                [
+                    (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                     expires, now)
+                    for key, value in items
+                ],
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        self._count('sets', cursor.rowcount)
+        with self._lock:
+            self._writes += 1
+            cull = self._writes % self._cull_every == 0
+        if cull:
+            self._cull()
+        return cursor.rowcount
+
+    def _cull(self):
+        connection = self._connection
+        connection.execute(
+            'DELETE FROM cache WHERE expires <= ?', (time.time(),)
+        )
+        if not self._max_entries:
+            return
+        (entries,) = connection.execute(
+            'SELECT COUNT(*) FROM cache'
+        ).fetchone()
+        if entries <= self._max_entries:
+            return
+        excess = entries - self._max_entries
+        if self._cull_frequency:
+            excess += self._max_entries // self._cull_frequency
+        connection.execute(
+            'DELETE FROM cache WHERE key IN ('
+            'SELECT key FROM cache ORDER BY accessed LIMIT ?)',
+            (excess,),
+        )
+        self._count('evictions', excess)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        return bool(self._write([(key, value)], timeout, replace=False))
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        return self._read([key]).get(key, default)
+
+    def get_many(self, keys, version=None):
+        mapped = {self._key(key, version): key for key in keys}
+        return {
+            mapped[key]: value
+            for key, value in self._read(list(mapped)).items()
+        }
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._write([(self._key(key, version), value)], timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        if data:
+            self._write(
+                [(self._key(key, version), value)
+                 for key, value in data.items()],
+                timeout,
+            )
+        return []
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        cursor = self._connection.execute(
+            'UPDATE cache SET expires = ? WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (self.get_backend_timeout(timeout), self._key(key, version),
+             time.time()),
+        )
+        return bool(cursor.rowcount)
+
+    def delete(self, key, version=None):
+        cursor = self._connection.execute(
+            'DELETE FROM cache WHERE key = ?', (self._key(key, version),)
+        )
+        self._count('deletes', cursor.rowcount)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        row = self._connection.execute(
+            'SELECT 1 FROM cache WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (self._key(key, version), time.time()),
+        ).fetchone()
+        return row is not None
+
+    def clear(self):
+        self._connection.execute('DELETE FROM cache')
+
+    def close(self, **kwargs):
+        # Django закрывает кэши после каждого запроса; соединение с
+        # файлом держим открытым на весь поток.
+        pass
+
+    def stats(self):
+        """Общая статистика кэша для всех процессов."""
+        self._flush_stats()
+        connection = self._connection
+        result = dict.fromkeys(STAT_NAMES, 0)
+        result.update(connection.execute('SELECT name, value FROM stats'))
+        (result['entries'],) = connection.execute(
+            'SELECT COUNT(*) FROM cache'
+        ).fetchone()
+        (page_count,) = connection.execute('PRAGMA page_count').fetchone()
+        (page_size,) = connection.execute('PRAGMA page_size').fetchone()
+        result['size_bytes'] = page_count * page_size
+        lookups = result['hits'] + result['misses']
+        result['hit_rate'] = (
+            round(result['hits'] / lookups, 4) if lookups else None
+        )
+        return result
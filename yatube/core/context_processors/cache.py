@@ -0,0 +1,7 @@
+from django.conf import settings
+
+
+def fragment_cache(request):
+    return {
+        'fragment_ttl': settings.FRAGMENT_CACHE_TTL
+    }
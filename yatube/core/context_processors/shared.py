@@ -0,0 +1,9 @@
+from django.contrib.auth.models import AnonymousUser
+
+
+def guest_user(request):
+    """На общих страницах (core.decorators.shared_page) шаблоны видят
+    гостя: request.user не читается, сессия не трогается."""
+    if getattr(request, 'shared_page', False):
+        return {'user': AnonymousUser()}
+    return {}
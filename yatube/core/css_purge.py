@@ -0,0 +1,120 @@
+"""Удаление из CSS правил, которые не используются в проекте.
+
+Из исходников (шаблонов, скриптов, модулей Python) собираются все
+слова; правило остаётся, если каждый класс и id его селектора
+встречается среди них. Селекторы без классов и id (теги, :root)
+остаются всегда, @keyframes и @font-face — как есть, @media и
+@supports чистятся рекурсивно. Лицензионный комментарий /*! */ в
+начале файла сохраняется.
+"""
+import os
+import re
+
+SOURCE_EXTENSIONS = ('.html', '.js', '.py', '.txt')
+# Правила внутри этих @-блоков — обычные селекторы.
+NESTED_AT_RULES = {'media', 'supports', 'document'}
+
+_WORD_RE = re.compile(r'[\w-]+')
+_HEADER_RE = re.compile(r'\s*/\*!.*?\*/\s*', re.S)
+_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+_AT_RULE_RE = re.compile(r'@(-?[\w-]+)')
+# Внутри :not() и [атрибут="..."] классы не обязательны для совпадения.
+_IGNORED_RE = re.compile(r':not\([^)]*\)|\[[^\]]*\]')
+_NAME_RE = re.compile(r'[.#](-?[_a-zA-Z][\w-]*)')
+
+
+def used_words(sources):
+    """Слова из файлов SOURCE_EXTENSIONS в каталогах sources (без тестов)."""
+    words = set()
+    for source in sources:
+        for dirpath, dirnames, filenames in os.walk(source):
+            # В тестах классы упоминаются, но на страницы не попадают.
+            dirnames[:] = [name for name in dirnames if name != 'tests']
+            for filename in filenames:
+                if not filename.endswith(SOURCE_EXTENSIONS):
+                    continue
+                with open(os.path.join(dirpath, filename),
+                          encoding='utf-8', errors='ignore') as file:
+                    words.update(_WORD_RE.findall(file.read()))
+    return words
+
+
+def _rules(css):
+    """(prelude, body) верхнего уровня; body None у @import и @charset."""
+    rules = []
+    depth = start = head_end = 0
+    quote = None
+    for position, char in enumerate(css):
+        if quote:
+            if char == quote and css[position - 1] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '{':
+            if depth == 0:
+                head_end = position
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append(
+                    (css[start:head_end].strip(), css[head_end + 1:position])
+                )
+                start = position + 1
+        elif char == ';' and depth == 0:
+            rules.append((css[start:position + 1].strip(), None))
+            start = position + 1
+    return rules
+
+
+def _selectors(prelude):
+    """Список селекторов: запятые внутри () и [] не разделяют."""
+    selectors = []
+    depth = start = 0
+    for position, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:position].strip())
+            start = position + 1
+    selectors.append(prelude[start:].strip())
+    return selectors
+
+
+def _is_used(selector, words):
+    names = _NAME_RE.findall(_IGNORED_RE.sub('', selector))
+    return all(name in words for name in names)
+
+
+def _purge_rules(css, words):
+    kept = []
+    for prelude, body in _rules(css):
+        if body is None:
+            kept.append(prelude)
+        elif prelude.startswith('@'):
+            name = _AT_RULE_RE.match(prelude).group(1).lower()
+            if name in NESTED_AT_RULES:
+                body = _purge_rules(body, words)
+                if body:
+                    kept.append(f'{prelude}{{{body}}}')
+            else:
+                kept.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [
+                selector for selector in _selectors(prelude)
+                if _is_used(selector, words)
+            ]
+            if selectors:
+                kept.append(f'{",".join(selectors)}{{{body}}}')
+    return ''.join(kept)
+
+
+def purge(css, words):
+    """CSS без правил, классы и id которых не встречаются в words."""
+    header = _HEADER_RE.match(css)
+    if header:
+        css = css[header.end():]
+    body = _purge_rules(_COMMENT_RE.sub('', css), words)
+    return (header.group().strip() + '\n' if header else '') + body
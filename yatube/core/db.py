@@ -0,0 +1,58 @@
+"""Настройка соединений с БД и маршрутизация чтений на реплики.
+
+configure_sqlite выполняет settings.SQLITE_PRAGMAS при открытии каждого
+соединения SQLite (режим WAL, synchronous и т. п.); при CONN_MAX_AGE
+соединение живёт между запросами, и прагмы не повторяются.
+
+PrimaryReplicaRouter отправляет чтения моделей REPLICA_APPS на реплики
+из DATABASE_REPLICAS, а записи — в default. После первой записи поток
+до конца HTTP-запроса читает из default, чтобы не увидеть отставание
+реплики от только что записанных данных.
+"""
+import random
+import threading
+
+from django.conf import settings
+
+PRIMARY = 'default'
+
+_local = threading.local()
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def unpin(**kwargs):
+    _local.pinned = False
+
+
+def pin():
+    """Читать из основной БД до конца текущего запроса."""
+    _local.pinned = True
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            return None
+        if (getattr(_local, 'pinned', False)
+                or model._meta.app_label not in settings.REPLICA_APPS):
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        pin()
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии default: объекты из любой БД связаны.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
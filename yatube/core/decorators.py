@@ -0,0 +1,36 @@
+"""Страницы, общие для всех посетителей.
+
+Представление с shared_page отдаёт одинаковую разметку любому
+посетителю: шаблоны видят гостя (core.context_processors.shared),
+сессия и CSRF не используются, поэтому в ответе нет Set-Cookie и
+Vary: Cookie, и кэширующий прокси может отдавать его всем. Личное —
+меню пользователя, подписку, форму комментария — страница подгружает
+с posts:personal.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+
+
+def shared_page(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.shared_page = True
+        response = view(request, *args, **kwargs)
+        if (
+            request.method in ('GET', 'HEAD')
+            and response.status_code == 200
+            and not response.cookies
+        ):
+            if settings.SESSION_COOKIE_NAME in request.COOKIES:
+                # Браузер вошедшего пользователя перепроверяет страницу,
+                # чтобы сразу увидеть свою новую запись.
+                patch_cache_control(response, private=True, max_age=0)
+            else:
+                patch_cache_control(
+                    response, public=True,
+                    max_age=settings.SHARED_PAGE_MAX_AGE,
+                )
+        return response
+    return wrapper
@@ -0,0 +1,38 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную БД SQLite в файлы реплик для чтения. '
+        'Копия снимается через backup API и согласована даже при '
+        'одновременной записи.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'targets', nargs='*',
+            help='Пути копий; по умолчанию — реплики из DATABASES.',
+        )
+
+    def handle(self, *args, **options):
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            raise CommandError('Основная БД — не SQLite.')
+        targets = options['targets'] or [
+            connections[alias].settings_dict['NAME']
+            for alias in connections
+            if alias != 'default' and connections[alias].vendor == 'sqlite'
+        ]
+        if not targets:
+            raise CommandError('Реплики SQLite не настроены.')
+        primary.ensure_connection()
+        for target in targets:
+            replica = sqlite3.connect(target)
+            try:
+                primary.connection.backup(replica)
+            finally:
+                replica.close()
+            self.stdout.write(f'{target}: скопировано')
@@ -0,0 +1,178 @@
+"""Метрики производительности запросов.
+
+RequestStats собирает замеры одного запроса: время SQL (через
+execute_wrapper), время рендера шаблонов и попадания в кэш (через
+обёртки, которые ставятся один раз на процесс). Registry копит
+гистограммы по представлениям и последние трассы медленных запросов.
+Данные живут в памяти процесса: у каждого воркера они свои.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+from django.template.base import Template
+
+# Верхние границы корзин гистограммы времени ответа, мс.
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf'))
+# Длина SQL в трассе: полные запросы с большими IN (...) раздувают память.
+SQL_LIMIT = 1000
+
+_local = threading.local()
+_MISSING = object()
+
+
+def current():
+    """RequestStats текущего запроса или None вне запроса."""
+    return getattr(_local, 'stats', None)
+
+
+class RequestStats:
+    def __init__(self, trace=False):
+        self.trace = trace
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.sql = []
+        self._template_depth = 0
+
+    def __enter__(self):
+        _local.stats = self
+        return self
+
+    def __exit__(self, *exc_info):
+        _local.stats = None
+
+    @property
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.queries += 1
+            self.db_ms += duration
+            if self.trace:
+                self.sql.append((sql[:SQL_LIMIT], round(duration, 3)))
+
+
+def _timed_render(render):
+    def wrapper(self, context):
+        stats = current()
+        # {% include %} рендерит вложенные шаблоны тем же методом —
+        # считаем только внешний вызов, иначе время сложится дважды.
+        if stats is None or stats._template_depth:
+            return render(self, context)
+        stats._template_depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            stats._template_depth -= 1
+            stats.template_ms += (time.perf_counter() - start) * 1000
+    wrapper.instrumented = True
+    return wrapper
+
+
+def instrument_templates():
+    if not getattr(Template.render, 'instrumented', False):
+        Template.render = _timed_render(Template.render)
+
+
+def instrument_cache(cache):
+    """Считает попадания get/get_many экземпляра кэша."""
+    if getattr(cache, 'instrumented', False):
+        return
+    get, get_many = cache.get, cache.get_many
+
+    def counted_get(key, default=None, version=None):
+        value = get(key, _MISSING, version=version)
+        stats = current()
+        if value is _MISSING:
+            if stats is not None:
+                stats.cache_misses += 1
+            return default
+        if stats is not None:
+            stats.cache_hits += 1
+        return value
+
+    def counted_get_many(keys, version=None):
+        keys = list(keys)
+        found = get_many(keys, version=version)
+        stats = current()
+        if stats is not None:
+            stats.cache_hits += len(found)
+            stats.cache_misses += len(keys) - len(found)
+        return found
+
+    cache.get = counted_get
+    cache.get_many = counted_get_many
+    cache.instrumented = True
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.count = 0
+        self.buckets = [0] * len(BUCKETS)
+        self.totals = dict.fromkeys(
+            ('total_ms', 'db_ms', 'template_ms', 'queries',
+             'cache_hits', 'cache_misses', 'bytes'), 0
+        )
+        self.max_ms = 0.0
+
+    def add(self, sample):
+        self.count += 1
+        self.buckets[bisect_left(BUCKETS, sample['total_ms'])] += 1
+        self.max_ms = max(self.max_ms, sample['total_ms'])
+        for name in self.totals:
+            self.totals[name] += sample[name]
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'max_ms': round(self.max_ms, 3),
+            'mean': {
+                name: round(total / self.count, 3)
+                for name, total in self.totals.items()
+            },
+            'histogram_ms': {
+                str(bound): hits for bound, hits in zip(BUCKETS, self.buckets)
+            },
+        }
+
+
+class Registry:
+    def __init__(self, trace_limit=50):
+        self._lock = threading.Lock()
+        self.views = {}
+        self.traces = deque(maxlen=trace_limit)
+
+    def record(self, view, sample, trace=None):
+        with self._lock:
+            self.views.setdefault(view, ViewMetrics()).add(sample)
+            if trace is not None:
+                self.traces.append(trace)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'views': {
+                    view: metrics.as_dict()
+                    for view, metrics in sorted(self.views.items())
+                },
+                'slow_traces': list(self.traces),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.views.clear()
+            self.traces.clear()
+
+
+registry = Registry()
@@ -0,0 +1,110 @@
+import os
+import random
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.utils import timezone
+
+from . import metrics, querywatch
+
+
+class PerformanceMiddleware:
+    """Замеряет время, SQL, шаблоны, кэш и размер каждого ответа.
+
+    Сводка по представлениям доступна персоналу на core:perf_stats.
+    Заголовок Server-Timing получают персонал и режим DEBUG, но не
+    ответы с Cache-Control: public — их прокси отдаёт всем. Для доли
+    PERF_TRACE_SAMPLE_RATE запросов записывается текст SQL; если такой
+    запрос дольше PERF_SLOW_REQUEST_MS, его трасса сохраняется.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        metrics.instrument_templates()
+
+    def __call__(self, request):
+        if not settings.PERF_METRICS_ENABLED:
+            return self.get_response(request)
+        for cache in caches.all():
+            metrics.instrument_cache(cache)
+        trace = random.random() < settings.PERF_TRACE_SAMPLE_RATE
+        with metrics.RequestStats(trace=trace) as stats, ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(stats.execute_wrapper)
+                )
+            response = self.get_response(request)
+            total_ms = stats.total_ms
+        self.record(request, response, stats, total_ms)
+        if self.show_timing(request, response):
+            response['Server-Timing'] = ', '.join((
+                f'db;dur={stats.db_ms:.1f}',
+                f'tpl;dur={stats.template_ms:.1f}',
+                f'total;dur={total_ms:.1f}',
+            ))
+        return response
+
+    @staticmethod
+    def show_timing(request, response):
+        if 'public' in response.get('Cache-Control', ''):
+            return False
+        user = getattr(request, 'user', None)
+        return settings.DEBUG or bool(user and user.is_staff)
+
+    def record(self, request, response, stats, total_ms):
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        sample = {
+            'total_ms': total_ms,
+            'db_ms': stats.db_ms,
+            'template_ms': stats.template_ms,
+            'queries': stats.queries,
+            'cache_hits': stats.cache_hits,
+            'cache_misses': stats.cache_misses,
+            # У потоковых ответов размер заранее неизвестен.
+            'bytes': 0 if response.streaming else len(response.content),
+        }
+        trace = None
+        if stats.trace and total_ms >= settings.PERF_SLOW_REQUEST_MS:
+            trace = {
+                'date': timezone.now().isoformat(),
+                'pid': os.getpid(),
+                'method': request.method,
+                'path': request.get_full_path(),
+                'view': view,
+                'status': response.status_code,
+                **{name: round(value, 3) for name, value in sample.items()},
+                'sql': stats.sql,
+            }
+        metrics.registry.record(view, sample, trace)
+
+
+class QueryWatchMiddleware:
+    """Журналирует медленные и повторяющиеся запросы каждого запроса.
+
+    Бюджеты по представлениям задаются в QUERY_BUDGETS; при
+    QUERYWATCH_RAISE превышение бюджета вызывает исключение (для
+    тестов и разработки), иначе пишется предупреждение в журнал.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERYWATCH_ENABLED:
+            return self.get_response(request)
+        with querywatch.QueryWatcher() as watcher:
+            response = self.get_response(request)
+        match = request.resolver_match
+        view = match.view_name if match else request.path
+        budget = settings.QUERY_BUDGETS.get(view)
+        over_budget = budget is not None and len(watcher) > budget
+        if over_budget and settings.QUERYWATCH_RAISE:
+            raise querywatch.QueryBudgetExceeded(
+                f'Бюджет {budget} превышен\n' + watcher.report(view)
+            )
+        if over_budget or watcher.slow or watcher.repeated:
+            querywatch.logger.warning(watcher.report(view))
+        return response
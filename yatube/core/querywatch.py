@@ -0,0 +1,171 @@
+"""Поиск медленных и повторяющихся SQL-запросов.
+
+QueryWatcher подключается к соединениям через execute_wrapper и для
+каждого запроса запоминает «отпечаток» (SQL без значений), время и
+место вызова: строку шаблона, если запрос сделан при рендере, иначе
+строку кода проекта. Одинаковые отпечатки внутри запроса — типичный
+признак N+1. Включается в core.middleware.QueryWatchMiddleware
+(QUERYWATCH_ENABLED) и в тестах через assert_query_budget.
+"""
+import logging
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+
+import django
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s|\?')
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+# site-packages и стандартная библиотека — не «код проекта», даже если
+# виртуальное окружение лежит внутри BASE_DIR.
+_LIBRARY_DIRS = tuple(
+    os.path.dirname(os.path.dirname(module.__file__))
+    for module in (django, os)
+)
+
+# Обёртки execute из этих модулей стоят в стеке каждого запроса.
+_INSTRUMENTATION = {__file__, metrics.__file__}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def fingerprint(sql):
+    """SQL без литералов и параметров: одинаков для запросов N+1."""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _PLACEHOLDER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('(...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def _is_project_file(filename):
+    return (
+        filename.startswith(str(settings.BASE_DIR))
+        and not filename.startswith(_LIBRARY_DIRS)
+        and filename not in _INSTRUMENTATION
+    )
+
+
+def origin():
+    """Строка шаблона или кода проекта, откуда сделан запрос."""
+    frame = sys._getframe(1)
+    code_line = None
+    while frame is not None:
+        node = frame.f_locals.get('self')
+        if frame.f_code.co_name == 'render_annotated' and getattr(
+                node, 'token', None) is not None and node.origin:
+            name = node.origin.template_name or node.origin.name
+            return f'{name}:{node.token.lineno}'
+        filename = frame.f_code.co_filename
+        if code_line is None and _is_project_file(filename):
+            relative = os.path.relpath(filename, settings.BASE_DIR)
+            code_line = f'{relative}:{frame.f_lineno}'
+        frame = frame.f_back
+    return code_line or 'unknown'
+
+
+class QueryWatcher:
+    """Записывает запросы, выполненные внутри блока with."""
+
+    def __init__(self, slow_ms=None, duplicates=None):
+        self.slow_ms = (
+            settings.QUERYWATCH_SLOW_MS if slow_ms is None else slow_ms
+        )
+        self.duplicates = (
+            settings.QUERYWATCH_DUPLICATES
+            if duplicates is None else duplicates
+        )
+        self.queries = []
+        self._stack = ExitStack()
+
+    def __enter__(self):
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'fingerprint': fingerprint(sql),
+                'ms': (time.perf_counter() - start) * 1000,
+                'origin': origin(),
+            })
+
+    def __len__(self):
+        return len(self.queries)
+
+    @property
+    def slow(self):
+        return [
+            query for query in self.queries if query['ms'] >= self.slow_ms
+        ]
+
+    @property
+    def repeated(self):
+        """Отпечатки, повторившиеся не меньше duplicates раз."""
+        groups = OrderedDict()
+        for query in self.queries:
+            group = groups.setdefault(query['fingerprint'], {
+                'fingerprint': query['fingerprint'],
+                'count': 0,
+                'ms': 0.0,
+                'origins': [],
+            })
+            group['count'] += 1
+            group['ms'] += query['ms']
+            if query['origin'] not in group['origins']:
+                group['origins'].append(query['origin'])
+        return [
+            group for group in groups.values()
+            if group['count'] >= self.duplicates
+        ]
+
+    def report(self, label=''):
+        lines = [f'{label}: {len(self)} запросов'.lstrip(': ')]
+        for query in self.slow:
+            lines.append(
+                f'  медленный {query["ms"]:.1f} мс ({query["origin"]}): '
+                f'{query["sql"]}'
+            )
+        for group in self.repeated:
+            lines.append(
+                f'  повтор {group["count"]}× ({", ".join(group["origins"])})'
+                f': {group["fingerprint"]}'
+            )
+        return '\n'.join(lines)
+
+
+@contextmanager
+def assert_query_budget(budget, label=''):
+    """Падает, если в блоке выполнено больше budget запросов.
+
+    В сообщении — повторяющиеся запросы с местом вызова, чтобы N+1
+    было видно сразу.
+    """
+    with QueryWatcher() as watcher:
+        yield watcher
+    if len(watcher) > budget:
+        raise QueryBudgetExceeded(
+            f'Бюджет {budget} превышен\n' + watcher.report(label)
+        )
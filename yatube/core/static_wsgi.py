@@ -0,0 +1,136 @@
+"""Раздача статики прямо из WSGI-приложения.
+
+StaticFilesApp оборачивает приложение Django и отдаёт файлы из
+STATIC_ROOT, не доходя до middleware и URL-роутинга. Список файлов,
+заголовки и сжатые варианты (.br, .gz от
+core.staticfiles.CompressedManifestStaticFilesStorage) собираются один
+раз при старте, поэтому после collectstatic воркеры перезапускают.
+Файлы с хэшем в имени (из staticfiles.json) кэшируются на год,
+остальные — на STATIC_MAX_AGE секунд.
+"""
+import json
+import mimetypes
+import os
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+from django.utils.http import http_date
+
+# Год: дольше браузеры всё равно не хранят.
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+BLOCK_SIZE = 64 * 1024
+MANIFEST_NAME = 'staticfiles.json'
+# Кодировки в порядке предпочтения и расширения их файлов.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _accepted(environ):
+    """Кодировки из Accept-Encoding, кроме явно запрещённых q=0."""
+    accepted = set()
+    for item in environ.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = item.strip().partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00'):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticFile:
+    def __init__(self, path, max_age):
+        self.content_type = (
+            mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+        if self.content_type.startswith('text/') or self.content_type in (
+                'application/javascript', 'image/svg+xml'):
+            self.content_type += '; charset=utf-8'
+        if max_age == IMMUTABLE_MAX_AGE:
+            self.cache_control = f'public, max-age={max_age}, immutable'
+        else:
+            self.cache_control = f'public, max-age={max_age}'
+        self.variants = {None: self._variant(path)}
+        for encoding, extension in ENCODINGS:
+            if os.path.exists(path + extension):
+                self.variants[encoding] = self._variant(path + extension)
+
+    def _variant(self, path):
+        stat = os.stat(path)
+        return {
+            'path': path,
+            'size': stat.st_size,
+            'etag': f'"{int(stat.st_mtime):x}-{stat.st_size:x}"',
+            'last_modified': http_date(stat.st_mtime),
+        }
+
+    def choose(self, environ):
+        """Вариант файла и его Content-Encoding."""
+        accepted = _accepted(environ)
+        for encoding, _ in ENCODINGS:
+            if encoding in self.variants and encoding in accepted:
+                return self.variants[encoding], encoding
+        return self.variants[None], None
+
+    def serve(self, environ, start_response):
+        variant, encoding = self.choose(environ)
+        headers = [
+            ('Cache-Control', self.cache_control),
+            ('ETag', variant['etag']),
+            ('Last-Modified', variant['last_modified']),
+        ]
+        if len(self.variants) > 1:
+            headers.append(('Vary', 'Accept-Encoding'))
+        if environ.get('HTTP_IF_NONE_MATCH') == variant['etag']:
+            start_response('304 Not Modified', headers)
+            return []
+        headers += [
+            ('Content-Type', self.content_type),
+            ('Content-Length', str(variant['size'])),
+        ]
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        start_response('200 OK', headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        file_wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+        return file_wrapper(open(variant['path'], 'rb'), BLOCK_SIZE)
+
+
+class StaticFilesApp:
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.root = root or settings.STATIC_ROOT
+        self.prefix = prefix or settings.STATIC_URL
+        self.files = self.scan()
+
+    def hashed_names(self):
+        try:
+            with open(os.path.join(self.root, MANIFEST_NAME)) as file:
+                return set(json.load(file)['paths'].values())
+        except (OSError, ValueError, KeyError):
+            return set()
+
+    def scan(self):
+        hashed = self.hashed_names()
+        compressed = tuple(extension for _, extension in ENCODINGS)
+        files = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, '/')
+                if filename.endswith(compressed) or name == MANIFEST_NAME:
+                    continue
+                max_age = (
+                    IMMUTABLE_MAX_AGE if name in hashed
+                    else settings.STATIC_MAX_AGE
+                )
+                files[self.prefix + name] = StaticFile(path, max_age)
+        return files
+
+    def __call__(self, environ, start_response):
+        static = self.files.get(environ.get('PATH_INFO', ''))
+        if static is None:
+            return self.application(environ, start_response)
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            start_response(
+                '405 Method Not Allowed', [('Allow', 'GET, HEAD')]
+            )
+            return []
+        return static.serve(environ, start_response)
@@ -0,0 +1,76 @@
+"""Хранилище статики для collectstatic в боевом режиме.
+
+К именам файлов добавляется хэш содержимого (ManifestStaticFilesStorage),
+поэтому их можно кэшировать навсегда. Перед хэшированием из файлов
+STATIC_PURGE_CSS удаляются неиспользуемые правила (core.css_purge),
+после — рядом с каждым сжимаемым файлом кладутся .gz и, если
+установлен пакет brotli, .br. Отдаёт всё это core.static_wsgi.
+"""
+import gzip
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+from . import css_purge
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Уже сжатые форматы: gzip их только увеличит.
+INCOMPRESSIBLE = (
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.ico', '.woff', '.woff2',
+    '.gz', '.br', '.zip',
+)
+# Сжатая копия не нужна, если экономит меньше 5%.
+MIN_RATIO = 0.95
+
+
+def compress(path):
+    """Создаёт path.gz и path.br; возвращает расширения созданных."""
+    with open(path, 'rb') as file:
+        data = file.read()
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data)
+    written = []
+    for extension, compressed in variants.items():
+        if len(compressed) < len(data) * MIN_RATIO:
+            with open(path + extension, 'wb') as file:
+                file.write(compressed)
+            written.append(extension)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run, **options)
+            return
+        paths = self.purge_css(paths)
+        names = set(paths)
+        for name, hashed_name, processed in super().post_process(
+                paths, dry_run, **options):
+            if hashed_name:
+                names.add(hashed_name)
+            yield name, hashed_name, processed
+        for name in sorted(names):
+            if not name.endswith(INCOMPRESSIBLE) and self.exists(name):
+                compress(self.path(name))
+
+    def purge_css(self, paths):
+        """Чистит собранные копии CSS; хэш считается уже по ним."""
+        paths = dict(paths)
+        words = css_purge.used_words(settings.STATIC_PURGE_SOURCES)
+        for name in settings.STATIC_PURGE_CSS:
+            if name not in paths or not self.exists(name):
+                continue
+            path = self.path(name)
+            with open(path, encoding='utf-8') as file:
+                css = file.read()
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(css_purge.purge(css, words))
+            # post_process читает файлы из исходного хранилища.
+            paths[name] = (self, name)
+        return paths
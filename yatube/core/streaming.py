@@ -0,0 +1,26 @@
+"""Потоковый рендер страниц со списками неограниченной длины.
+
+Шаблон страницы рендерится один раз с меткой на месте списка
+({{ stream }}); ответ отдаёт всё до метки сразу, затем куски списка по
+мере их готовности, затем остаток страницы. Время до первого байта и
+память не зависят от длины списка.
+"""
+from django.http import StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+MARKER = '<!-- stream -->'
+
+
+def stream_template(request, template_name, context, chunks):
+    html = render_to_string(
+        template_name, {**context, 'stream': mark_safe(MARKER)}, request
+    )
+    head, tail = html.split(MARKER, 1)
+
+    def content():
+        yield head
+        yield from chunks
+        yield tail
+
+    return StreamingHttpResponse(content())
@@ -0,0 +1,54 @@
+"""Помощники для тестов."""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+@contextmanager
+def on_commit_callbacks(using=DEFAULT_DB_ALIAS, execute=True):
+    """Колбэки transaction.on_commit, зарегистрированные в блоке.
+
+    TestCase не фиксирует транзакцию, и колбэки не вызываются; при
+    execute они выполняются по выходе из блока, как после COMMIT
+    (captureOnCommitCallbacks из Django 3.2).
+    """
+    connection = connections[using]
+    start = len(connection.run_on_commit)
+    callbacks = []
+    try:
+        yield callbacks
+    finally:
+        callbacks[:] = [
+            func for _, func in connection.run_on_commit[start:]
+        ]
+        if execute:
+            for callback in callbacks:
+                callback()
+
+
+def locmem_cache():
+    """override_settings с кэшем в памяти процесса на время тестов.
+
+    Тесты очищают кэш, а файловый SQLite-кэш общий с запущенным
+    сайтом. Включается TestRunner (manage.py test) и фикстурой
+    locmem_cache в conftest.py (pytest).
+    """
+    return override_settings(
+        CACHES={'default': settings.CACHE_BACKENDS['locmem']}
+    )
+
+
+class TestRunner(DiscoverRunner):
+    """Запуск тестов с кэшем в памяти процесса (locmem_cache)."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_settings = locmem_cache()
+        self.cache_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_settings.disable()
+        super().teardown_test_environment(**kwargs)
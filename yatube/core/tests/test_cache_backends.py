@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from core.cache_backends import SQLiteCache
+
+
+class TestCacheTest(SimpleTestCase):
+    def test_tests_do_not_use_shared_cache(self):
+        """cache.clear() в тестах не трогает кэш запущенного сайта."""
+        self.assertEqual(settings.CACHES['default'],
+                         settings.CACHE_BACKENDS['locmem'])
+        self.assertNotIsInstance(cache, SQLiteCache)
+
+
+class SQLiteCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = self.make_cache()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def make_cache(self, **options):
+        options.setdefault('CULL_EVERY', 1)
+        return SQLiteCache(
+            os.path.join(self.directory, 'cache.sqlite3'),
+            {'OPTIONS': options},
+        )
+
+    def test_set_get_delete(self):
+        """Значения сохраняются, читаются и удаляются."""
+        self.cache.set('key', {'value': 1})
+        self.cache.set_many({'a': 1, 'b': 2})
+
+        self.assertEqual(self.cache.get('key'), {'value': 1})
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c']),
+                         {'a': 1, 'b': 2})
+        self.cache.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_shared_between_instances(self):
+        """Второй экземпляр (другой процесс) видит те же данные."""
+        self.cache.set('key', 'value')
+
+        self.assertEqual(self.make_cache().get('key'), 'value')
+
+    def test_per_key_timeout(self):
+        """У каждой записи свой срок жизни."""
+        self.cache.set('short', 1, timeout=0.05)
+        self.cache.set('long', 2, timeout=60)
+        time.sleep(0.1)
+
+        self.assertIsNone(self.cache.get('short'))
+        self.assertEqual(self.cache.get('long'), 2)
+        self.assertTrue(self.cache.add('short', 3))
+        self.assertFalse(self.cache.add('long', 3))
+
+    def test_lru_eviction(self):
+        """При превышении MAX_ENTRIES вытесняются давно не читавшиеся."""
+        cache = self.make_cache(
+            MAX_ENTRIES=3, CULL_FREQUENCY=0, ACCESS_RESOLUTION=0
+        )
+        for key in ('a', 'b', 'c'):
+            cache.set(key, key)
+            time.sleep(0.01)
+        cache.get('a')
+        cache.set('d', 'd')
+
+        self.assertEqual(sorted(cache.get_many(['a', 'b', 'c', 'd'])),
+                         ['a', 'c', 'd'])
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_stats(self):
+        """stats() считает попадания и промахи."""
+        self.cache.set('key', 'value')
+        self.cache.get('key')
+        self.cache.get('missing')
+
+        stats = self.cache.stats()
+
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['entries'], 1)
@@ -0,0 +1,102 @@
+import importlib
+import os
+import sqlite3
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import (
+    SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+
+from core import db
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'], REPLICA_APPS=('posts',))
+class PrimaryReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        db.unpin()
+        self.router = db.PrimaryReplicaRouter()
+
+    def test_feed_reads_go_to_replica(self):
+        """Посты читаются с реплики, пользователи — с основной БД."""
+        self.assertEqual(self.router.db_for_read(Post), 'replica_1')
+        self.assertEqual(self.router.db_for_read(User), 'default')
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_reads_after_write_are_pinned_to_primary(self):
+        """После записи запрос читает из основной БД до своего конца."""
+        self.router.db_for_write(Post)
+
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+        db.unpin()
+        self.assertEqual(self.router.db_for_read(Post), 'replica_1')
+
+    def test_migrations_run_on_primary_only(self):
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica_1', 'posts'))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_router_is_inert(self):
+        self.assertIsNone(self.router.db_for_read(Post))
+
+
+class SQLiteTest(TestCase):
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -1234})
+    def test_pragmas_applied_to_connection(self):
+        """Прагмы из настроек выполняются для соединения SQLite."""
+        db.configure_sqlite(sender=None, connection=connection)
+
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -1234)
+
+
+class PostgresProfileTest(TestCase):
+    def test_postgres_profile_uses_like_search(self):
+        """Без таблицы FTS сохранение поста не обращается к ней."""
+        from yatube import settings_prod
+
+        self.addCleanup(importlib.reload, settings_prod)
+        with mock.patch.dict(os.environ, {'DATABASE_ENGINE': 'postgresql'}):
+            backend = importlib.reload(settings_prod).POSTS_SEARCH_BACKEND
+        author = User.objects.create_user(username='auth')
+
+        with override_settings(POSTS_SEARCH_BACKEND=backend), \
+                CaptureQueriesContext(connection) as queries:
+            post = Post.objects.create(author=author, text='Текст')
+            post.text = 'Новый текст'
+            post.save()
+
+        self.assertEqual(backend, 'posts.search.LikeBackend')
+        self.assertFalse([
+            query for query in queries if 'posts_post_fts' in query['sql']
+        ])
+
+
+class CopyReplicaTest(TransactionTestCase):
+    # backup не завершается, пока в исходной БД открыта транзакция
+    # записи, поэтому данные должны быть зафиксированы.
+    def test_copy_replica(self):
+        """copy_sqlite_replica снимает согласованную копию основной БД."""
+        User.objects.create_user(username='auth')
+        with tempfile.TemporaryDirectory() as directory:
+            target = os.path.join(directory, 'replica.sqlite3')
+
+            call_command('copy_sqlite_replica', target, stdout=StringIO())
+
+            replica = sqlite3.connect(target)
+            try:
+                usernames = replica.execute(
+                    f'SELECT username FROM {User._meta.db_table}'
+                ).fetchall()
+            finally:
+                replica.close()
+        self.assertEqual(usernames, [('auth',)])
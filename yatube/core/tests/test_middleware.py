@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.metrics import registry
+
+User = get_user_model()
+
+
+class PerformanceMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.guest_client = Client()
+        self.staff_client = Client()
+        self.staff_client.force_login(
+            User.objects.create_user(username='staff', is_staff=True)
+        )
+
+    def stats(self):
+        return self.staff_client.get(reverse('core:perf_stats')).json()
+
+    def test_request_is_measured(self):
+        """Время, запросы, шаблоны, кэш и размер попадают в сводку."""
+        response = self.guest_client.get(reverse('posts:index'))
+
+        self.assertNotIn('Server-Timing', response)
+        index = self.stats()['views']['posts:index']
+        self.assertEqual(index['count'], 1)
+        self.assertGreater(index['mean']['queries'], 0)
+        self.assertGreater(index['mean']['template_ms'], 0)
+        self.assertGreater(index['mean']['cache_misses'], 0)
+        self.assertEqual(index['mean']['bytes'], len(response.content))
+        self.assertEqual(sum(index['histogram_ms'].values()), 1)
+
+    @override_settings(PERF_SLOW_REQUEST_MS=0, PERF_TRACE_SAMPLE_RATE=1)
+    def test_slow_request_trace_has_sql(self):
+        """У медленного запроса из выборки сохраняется трасса SQL."""
+        self.guest_client.get(reverse('posts:index'))
+
+        trace = self.stats()['slow_traces'][0]
+        self.assertEqual(trace['view'], 'posts:index')
+        self.assertEqual(len(trace['sql']), trace['queries'])
+
+    @override_settings(PERF_TRACE_SAMPLE_RATE=0)
+    def test_unsampled_requests_have_no_trace(self):
+        """Запросы вне выборки трасс не пишут."""
+        self.guest_client.get(reverse('posts:index'))
+
+        self.assertEqual(self.stats()['slow_traces'], [])
+
+    def test_server_timing_only_for_staff(self):
+        """Server-Timing видят персонал и DEBUG, но не общий кэш."""
+        page = reverse('posts:group_index')
+        shared = reverse('posts:index')
+
+        self.assertIn(
+            'total;dur=', self.staff_client.get(page)['Server-Timing']
+        )
+        self.assertNotIn('Server-Timing', self.guest_client.get(page))
+        with self.settings(DEBUG=True):
+            self.assertIn('Server-Timing', self.guest_client.get(page))
+            self.assertNotIn('Server-Timing', self.guest_client.get(shared))
+
+    def test_stats_are_hidden_from_non_staff(self):
+        """Сводка недоступна обычным пользователям."""
+        response = self.guest_client.get(reverse('core:perf_stats'))
+
+        self.assertEqual(response.status_code, 404)
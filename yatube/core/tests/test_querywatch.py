@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.querywatch import (
+    QueryBudgetExceeded, QueryWatcher, assert_query_budget, fingerprint,
+)
+from posts.models import Post
+
+User = get_user_model()
+
+
+class QueryWatchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for number in range(3):
+            author = User.objects.create_user(username=f'author_{number}')
+            Post.objects.create(author=author, text='Текст')
+
+    def test_fingerprint_ignores_values(self):
+        """Запросы, отличающиеся только значениями, совпадают."""
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 1 AND name = 'a'"),
+            fingerprint("SELECT  * FROM t WHERE id = 25 AND name = 'b''c'"),
+        )
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+            'SELECT * FROM t WHERE id IN (...)',
+        )
+
+    def test_repeated_queries_point_to_code(self):
+        """N+1 в коде находится с номером строки вызова."""
+        with QueryWatcher(duplicates=3) as watcher:
+            for post in Post.objects.all():
+                post.author.username
+
+        repeated = watcher.repeated
+        self.assertEqual(len(repeated), 1)
+        self.assertEqual(repeated[0]['count'], 3)
+        self.assertRegex(
+            repeated[0]['origins'][0], r'core/tests/test_querywatch\.py:\d+'
+        )
+
+    def test_repeated_queries_point_to_template(self):
+        """N+1 при рендере указывает на строку шаблона."""
+        template = Template(
+            '{% for post in posts %}\n{{ post.author.username }}{% endfor %}'
+        )
+        with QueryWatcher(duplicates=3) as watcher:
+            template.render(Context({'posts': Post.objects.all()}))
+
+        self.assertTrue(watcher.repeated[0]['origins'][0].endswith(':2'))
+
+    def test_budget_failure_reports_repeats(self):
+        """Превышение бюджета падает с отчётом о повторах."""
+        with self.assertRaisesRegex(QueryBudgetExceeded, 'повтор 3×'):
+            with assert_query_budget(2):
+                for post in Post.objects.all():
+                    post.author.username
+
+    @override_settings(
+        QUERYWATCH_ENABLED=True,
+        QUERYWATCH_RAISE=True,
+        QUERY_BUDGETS={'posts:index': 0},
+    )
+    def test_middleware_enforces_view_budget(self):
+        """Middleware проверяет бюджет представления."""
+        cache.clear()
+        with self.assertRaises(QueryBudgetExceeded):
+            Client().get(reverse('posts:index'))
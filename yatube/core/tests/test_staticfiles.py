@@ -0,0 +1,161 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from core import staticfiles
+from core.css_purge import purge
+from core.static_wsgi import IMMUTABLE_MAX_AGE, StaticFilesApp
+
+CSS = (
+    '/*! license */.used{color:red}.unused{color:blue}'
+    '.used,.unused .used{margin:0}a:not(.unused){color:green}'
+    '@media (min-width:576px){.unused{top:0}.used{top:1px}}'
+    '@keyframes spin{from{top:0}to{top:1px}}'
+    '.btn[data-x="a,b"]{left:0}body{margin:0}/* comment */'
+)
+
+
+class CssPurgeTest(SimpleTestCase):
+    def test_keeps_only_used_selectors(self):
+        purged = purge(CSS, {'used', 'btn'})
+
+        self.assertEqual(
+            purged,
+            '/*! license */\n.used{color:red}.used{margin:0}'
+            'a:not(.unused){color:green}'
+            '@media (min-width:576px){.used{top:1px}}'
+            '@keyframes spin{from{top:0}to{top:1px}}'
+            '.btn[data-x="a,b"]{left:0}body{margin:0}',
+        )
+
+
+@override_settings(
+    STATICFILES_STORAGE=(
+        'core.staticfiles.CompressedManifestStaticFilesStorage'
+    ),
+)
+class CompressedManifestStorageTest(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def test_collectstatic(self):
+        """Хэш в имени, урезанный CSS и сжатая копия рядом."""
+        with self.settings(STATIC_ROOT=self.root):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            hashed = staticfiles_storage.stored_name('css/bootstrap.min.css')
+
+        path = os.path.join(self.root, hashed)
+        with open(path, encoding='utf-8') as file:
+            css = file.read()
+        source = os.path.join(
+            settings.STATICFILES_DIRS[0], 'css/bootstrap.min.css'
+        )
+        self.assertNotEqual(hashed, 'css/bootstrap.min.css')
+        self.assertLess(len(css), os.path.getsize(source) / 2)
+        self.assertIn('.nav-link', css)
+        self.assertNotIn('.carousel', css)
+        with gzip.open(path + '.gz', 'rt', encoding='utf-8') as file:
+            self.assertEqual(file.read(), css)
+        self.assertEqual(
+            os.path.exists(path + '.br'), staticfiles.brotli is not None
+        )
+        self.assertFalse(os.path.exists(
+            os.path.join(self.root, 'img/logo.png.gz')
+        ))
+
+
+class StaticFilesAppTest(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        files = {
+            'site.css': b'body{margin:0}' * 100,
+            'site.0123456789ab.css': b'body{margin:0}' * 100,
+            'site.0123456789ab.css.gz': b'gzipped',
+            'staticfiles.json': json.dumps({
+                'paths': {'site.css': 'site.0123456789ab.css'},
+            }).encode(),
+        }
+        for name, content in files.items():
+            with open(os.path.join(self.root, name), 'wb') as file:
+                file.write(content)
+        self.app = StaticFilesApp(
+            self.django_app, root=self.root, prefix='/static/'
+        )
+
+    def django_app(self, environ, start_response):
+        start_response('200 OK', [])
+        return [b'django']
+
+    def call(self, path, method='GET', **headers):
+        environ = {'PATH_INFO': path, 'REQUEST_METHOD': method, **headers}
+        response = {}
+
+        def start_response(status, headers):
+            response['status'] = status
+            response['headers'] = dict(headers)
+
+        body = b''.join(self.app(environ, start_response))
+        return response['status'], response['headers'], body
+
+    def test_hashed_file_is_immutable_and_compressed(self):
+        status, headers, body = self.call(
+            '/static/site.0123456789ab.css',
+            HTTP_ACCEPT_ENCODING='br, gzip;q=0.8',
+        )
+
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(body, b'gzipped')
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Content-Length'], '7')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(
+            headers['Cache-Control'],
+            f'public, max-age={IMMUTABLE_MAX_AGE}, immutable',
+        )
+        self.assertEqual(headers['Content-Type'], 'text/css; charset=utf-8')
+
+    @override_settings(STATIC_MAX_AGE=30)
+    def test_plain_file_and_rejected_encoding(self):
+        self.app = StaticFilesApp(
+            self.django_app, root=self.root, prefix='/static/'
+        )
+        status, headers, body = self.call(
+            '/static/site.css', HTTP_ACCEPT_ENCODING='gzip;q=0'
+        )
+
+        self.assertEqual(body, b'body{margin:0}' * 100)
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertEqual(headers['Cache-Control'], 'public, max-age=30')
+
+    def test_not_modified_and_head(self):
+        _, headers, _ = self.call('/static/site.css')
+
+        status, _, body = self.call(
+            '/static/site.css', HTTP_IF_NONE_MATCH=headers['ETag']
+        )
+        head_status, head_headers, head_body = self.call(
+            '/static/site.css', method='HEAD'
+        )
+
+        self.assertEqual(status, '304 Not Modified')
+        self.assertEqual(body, b'')
+        self.assertEqual(head_status, '200 OK')
+        self.assertEqual(head_headers['Content-Length'], '1400')
+        self.assertEqual(head_body, b'')
+
+    def test_other_paths_go_to_django(self):
+        for path in ('/', '/static/missing.css', '/static/staticfiles.json',
+                     '/static/site.0123456789ab.css.gz'):
+            with self.subTest(path=path):
+                self.assertEqual(self.call(path)[2], b'django')
+        status, headers, _ = self.call('/static/site.css', method='POST')
+        self.assertEqual(status, '405 Method Not Allowed')
@@ -0,0 +1,29 @@
+from django.test import RequestFactory, SimpleTestCase
+
+from core.streaming import stream_template
+
+
+class StreamTemplateTest(SimpleTestCase):
+    def test_head_is_sent_before_list_is_read(self):
+        """Начало страницы уходит до того, как прочитан список."""
+        consumed = []
+
+        def chunks():
+            for number in range(3):
+                consumed.append(number)
+                yield f'<p>{number}</p>'
+
+        response = stream_template(
+            RequestFactory().get('/'), 'posts/profile_archive.html',
+            {'author': {'username': 'auth'}}, chunks(),
+        )
+        parts = iter(response.streaming_content)
+        head = next(parts).decode()
+
+        self.assertIn('<title>', head)
+        self.assertEqual(consumed, [])
+        self.assertEqual(
+            b''.join(parts).decode().split('</p>')[-1].strip()[-7:],
+            '</html>',
+        )
+        self.assertEqual(consumed, [0, 1, 2])
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from core.template_cache import template_names, warm_up
+
+CACHED_TEMPLATES = [{
+    **settings.TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **settings.TEMPLATES[0]['OPTIONS'],
+        'loaders': [('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ])],
+    },
+}]
+
+
+class TemplateWarmUpTest(SimpleTestCase):
+    def test_names_are_relative_to_template_dirs(self):
+        names = template_names(settings.TEMPLATES[0]['DIRS'])
+
+        self.assertIn('base.html', names)
+        self.assertIn('includes/post_card.html', names)
+
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_warm_up_fills_cached_loader(self):
+        """После прогрева шаблоны берутся из кэша загрузчика."""
+        loaded = warm_up()
+
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertEqual(
+            loaded, len(template_names(settings.TEMPLATES[0]['DIRS']))
+        )
+        self.assertIn('posts/index.html', loader.get_template_cache)
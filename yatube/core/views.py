@@ -1,5 +1,10 @@
+import os
+
+from django.http import Http404, JsonResponse
 from django.shortcuts import render
 
+from .metrics import registry
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -15,3 +20,10 @@ def server_error(request):
 
 def permission_denied(request, exception):
     return render(request, 'core/403.html', status=403)
+
+
+def perf_stats(request):
+    """Сводка PerformanceMiddleware по текущему процессу (для персонала)."""
+    if not request.user.is_staff:
+        raise Http404
+    return JsonResponse({'pid': os.getpid(), **registry.snapshot()})
@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from .models import Comment, Follow, Group, Post
+from .models import (
+    Comment, Follow, Group, Post, TrendingScore, UserCounters,
+)
 
 
 @admin.register(Post)
@@ -16,3 +18,5 @@ class PostAdmin(admin.ModelAdmin):
 admin.site.register(Group)
 admin.site.register(Follow)
 admin.site.register(Comment)
+admin.site.register(UserCounters)
+admin.site.register(TrendingScore)
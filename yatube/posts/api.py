@@ -0,0 +1,156 @@
+"""JSON API лент только для чтения с условными GET-запросами.
+
+ETag и Last-Modified строятся из версий posts.fragments, поэтому
+ответ 304 отдаётся без выборки постов и без сериализации.
+"""
+import hashlib
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import condition, require_GET
+
+from . import fragments, groups
+from .models import Post, User
+from .utils import COMMENTS_PARAM, CURSOR_PARAM, KeysetPaginator
+
+
+def serialize_post(post):
+    return {
+        'id': post.pk,
+        'text': post.text,
+        'pub_date': post.pub_date.isoformat(),
+        'author': post.author.username,
+        'author_name': post.author.get_full_name(),
+        'group': post.group.slug if post.group else None,
+        'image': post.thumbnail.url if post.thumbnail else None,
+        'comments_count': post.comments_count,
+        'url': reverse('posts:post_detail', args=[post.pk]),
+    }
+
+
+def serialize_comment(comment):
+    return {
+        'id': comment.pk,
+        'author': comment.author.username,
+        'text': comment.text,
+        'created': comment.created.isoformat(),
+    }
+
+
+def _page_links(request, page, param):
+    def link(cursor):
+        if cursor is None:
+            return None
+        query = request.GET.copy()
+        query[param] = cursor
+        return f'{request.path}?{query.urlencode()}'
+    return {
+        'next': link(page.next_cursor),
+        'previous': link(page.previous_cursor),
+    }
+
+
+def _feed_response(request, queryset):
+    page = KeysetPaginator(queryset, settings.POST_PER_PAGE).get_page(
+        request.GET.get(CURSOR_PARAM)
+    )
+    return JsonResponse({
+        'results': [serialize_post(post) for post in page],
+        **_page_links(request, page, CURSOR_PARAM),
+    })
+
+
+def _group_id(slug):
+    return groups.get_by_slug(slug).pk
+
+
+def _user_id(username):
+    user_id = User.objects.filter(username=username).values_list(
+        'pk', flat=True
+    ).first()
+    if user_id is None:
+        raise Http404
+    return user_id
+
+
+def _post_id(post_id):
+    # Иначе versions() заведёт вечный ключ версии для чужого id.
+    if not Post.objects.filter(pk=post_id).exists():
+        raise Http404
+    return post_id
+
+
+def _versions(request, scopes, kwargs):
+    # etag_func и last_modified_func вызываются для одного запроса
+    # дважды — версии читаем из кэша один раз.
+    if not hasattr(request, '_api_versions'):
+        request._api_versions = fragments.versions(
+            *scopes(**kwargs), fragments.GROUPS
+        )
+    return request._api_versions
+
+
+def versioned(scopes):
+    """condition() с ETag и Last-Modified из версий фрагментов.
+
+    GROUPS увеличивается и при изменении пользователей, поэтому
+    покрывает названия групп и имена авторов в ответе.
+    """
+    def etag(request, **kwargs):
+        current = _versions(request, scopes, kwargs)
+        raw = f'{request.get_full_path()}|{sorted(current.items())}'
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def last_modified(request, **kwargs):
+        newest = max(_versions(request, scopes, kwargs).values())
+        return datetime.fromtimestamp(newest / 1000, tz=timezone.utc)
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+@require_GET
+@versioned(lambda: [fragments.INDEX])
+def feed(request):
+    return _feed_response(request, Post.objects.feed())
+
+
+@require_GET
+@versioned(lambda slug: [fragments.group_scope(_group_id(slug))])
+def group_feed(request, slug):
+    return _feed_response(
+        request, Post.objects.feed().filter(group_id=_group_id(slug))
+    )
+
+
+@require_GET
+@versioned(
+    lambda username: [fragments.profile_scope(_user_id(username))]
+)
+def profile_feed(request, username):
+    author = get_object_or_404(User, username=username)
+    return _feed_response(request, author.posts.feed())
+
+
+@require_GET
+@versioned(
+    lambda post_id: [fragments.post_scope(_post_id(post_id))]
+)
+def post_detail(request, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), pk=post_id
+    )
+    comments = KeysetPaginator(
+        post.comments.select_related('author'),
+        settings.COMMENTS_PER_PAGE,
+        key='created',
+    ).get_page(request.GET.get(COMMENTS_PARAM))
+    return JsonResponse({
+        **serialize_post(post),
+        'comments': {
+            'results': [serialize_comment(comment) for comment in comments],
+            **_page_links(request, comments, COMMENTS_PARAM),
+        },
+    })
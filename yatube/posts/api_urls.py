@@ -0,0 +1,24 @@
+from django.urls import path
+
+from . import api
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', api.feed, name='feed'),
+    path(
+        'group/<slug:slug>/',
+        api.group_feed,
+        name='group'
+    ),
+    path(
+        'profile/<str:username>/',
+        api.profile_feed,
+        name='profile'
+    ),
+    path(
+        'posts/<int:post_id>/',
+        api.post_detail,
+        name='post_detail'
+    ),
+]
@@ -0,0 +1,104 @@
+"""Карточки постов в лентах.
+
+Все ленты выводят посты тегом {% post_cards %}. Шаблон карточки
+загружается один раз на страницу и рендерится с общим контекстом;
+ссылки собираются подстановкой в заранее развёрнутые reverse(), а не
+тегом {% url %} в каждой карточке; готовые карточки читаются из кэша
+одним get_many по версиям posts.fragments.
+"""
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.template import Context
+from django.template.loader import get_template
+from django.urls import reverse
+from django.utils.http import RFC3986_SUBDELIMS
+from django.utils.safestring import mark_safe
+
+from . import fragments
+from .utils import batched
+
+TEMPLATE = 'includes/post_card.html'
+KEY_TEMPLATE = 'cards:{}:{}'
+SEPARATOR = '\n<hr>\n'
+# Отметка зависит от читателя, поэтому добавляется после кэша.
+FOLLOWED_BADGE = (
+    '<span class="badge bg-light text-dark">Вы подписаны на автора</span>'
+)
+# Подходит и к int, и к str, и к slug в шаблонах URL.
+_SENTINEL = '9' * 18
+# Так экранирует аргументы reverse().
+_SAFE = RFC3986_SUBDELIMS + '/~:@'
+
+
+class CardUrls:
+    """Ссылки карточек: reverse() по разу на страницу, а не на пост."""
+
+    NAMES = {
+        'profile': 'posts:profile',
+        'group': 'posts:group_list',
+        'detail': 'posts:post_detail',
+    }
+
+    def __init__(self):
+        self.patterns = {
+            key: reverse(name, args=[_SENTINEL]).split(_SENTINEL)
+            for key, name in self.NAMES.items()
+        }
+
+    def _url(self, key, value):
+        prefix, suffix = self.patterns[key]
+        return prefix + quote(str(value), safe=_SAFE) + suffix
+
+    def for_post(self, post):
+        urls = {
+            'profile': self._url('profile', post.author.username),
+            'detail': self._url('detail', post.pk),
+        }
+        if post.group_id:
+            urls['group'] = self._url('group', post.group.slug)
+        return urls
+
+
+def render(posts, show_group=True):
+    """HTML карточек постов, разделённых <hr>."""
+    posts = list(posts)
+    variant = 'group' if show_group else 'plain'
+    keys = [
+        KEY_TEMPLATE.format(variant, key)
+        for key in fragments.card_keys(posts)
+    ]
+    found = cache.get_many(keys)
+    rendered = {}
+    template = urls = context = None
+    parts = []
+    for post, key in zip(posts, keys):
+        html = found.get(key)
+        if html is None:
+            if template is None:
+                template = get_template(TEMPLATE).template
+                urls = CardUrls()
+                context = Context({'show_group': show_group})
+            with context.push(post=post, urls=urls.for_post(post)):
+                html = rendered[key] = template.render(context)
+        if getattr(post, 'author_followed', False):
+            html += FOLLOWED_BADGE
+        parts.append(html)
+    if rendered:
+        cache.set_many(rendered, settings.FRAGMENT_CACHE_TTL)
+    return mark_safe(SEPARATOR.join(parts))
+
+
+def render_stream(posts, batch_size, show_group=True):
+    """Карточки всех постов queryset кусками по batch_size.
+
+    Посты читаются через iterator(): prefetch_related с ним не
+    работает, поэтому копии картинок подгружаются на каждую пачку.
+    """
+    separator = ''
+    for batch in batched(posts.iterator(chunk_size=batch_size), batch_size):
+        prefetch_related_objects(batch, 'image_variants')
+        yield separator + render(batch, show_group)
+        separator = SEPARATOR
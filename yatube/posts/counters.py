@@ -0,0 +1,159 @@
+"""Поддержка денормализованных счётчиков постов, комментариев и подписок."""
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Greatest
+
+from .models import Follow, Group, Post, User, UserCounters
+
+USER_COUNTERS = ('posts_count', 'followers_count', 'following_count')
+
+
+def shifted(name, delta):
+    """F(name) + delta, но не меньше нуля.
+
+    Счётчики — PositiveIntegerField с CHECK >= 0: разошедшийся счётчик
+    не должен ломать удаление поста, комментария или подписки.
+    """
+    return Greatest(F(name) + delta, 0)
+
+
+def shift_user_counters(user_id, create=False, **deltas):
+    """Сдвигает счётчики пользователя на deltas одним UPDATE.
+
+    Если строки ещё нет и create=True, она создаётся пересчётом: так
+    новая запись уже учтена и сдвиг не нужен. При удалениях строку не
+    создаём — пользователь может удаляться вместе с ней.
+    """
+    updated = UserCounters.objects.filter(user_id=user_id).update(
+        **{name: shifted(name, delta) for name, delta in deltas.items()}
+    )
+    if not updated and create:
+        recount_user(user_id)
+
+
+def shift_comments_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=shifted('comments_count', delta)
+    )
+
+
+def shift_group_counters(group_id, delta):
+    """Сдвигает число постов группы и обновляет время последнего поста.
+
+    Последний пост берётся подзапросом по индексу (group, -pub_date),
+    поэтому удаление самого свежего поста тоже учитывается.
+    """
+    if group_id is None:
+        return
+    Group.objects.filter(pk=group_id).update(
+        posts_count=shifted('posts_count', delta),
+        last_activity=Subquery(
+            Post.objects.filter(group_id=OuterRef('pk'))
+            .order_by('-pub_date').values('pub_date')[:1]
+        ),
+    )
+
+
+def count_user(user_id):
+    return {
+        'posts_count': Post.objects.filter(author_id=user_id).count(),
+        'followers_count': Follow.objects.filter(author_id=user_id).count(),
+        'following_count': Follow.objects.filter(user_id=user_id).count(),
+    }
+
+
+def recount_user(user_id):
+    counters, _ = UserCounters.objects.update_or_create(
+        user_id=user_id, defaults=count_user(user_id)
+    )
+    return counters
+
+
+def _grouped_counts(queryset, field):
+    return dict(
+        queryset.values_list(field).annotate(total=Count('pk')).order_by()
+    )
+
+
+def _drifted_groups():
+    """Группы с неверными posts_count/last_activity, уже исправленные."""
+    stats = {
+        group_id: (total, last)
+        for group_id, total, last in Post.objects.filter(
+            group__isnull=False
+        ).values_list('group').annotate(
+            total=Count('pk'), last=Max('pub_date')
+        ).order_by()
+    }
+    drifted = []
+    for group in Group.objects.only('posts_count', 'last_activity'):
+        total, last = stats.get(group.pk, (0, None))
+        if (group.posts_count, group.last_activity) != (total, last):
+            group.posts_count, group.last_activity = total, last
+            drifted.append(group)
+    return drifted
+
+
+def reconcile(dry_run=False, batch_size=1000):
+    """Сверяет все счётчики с COUNT(*) и исправляет расхождения.
+
+    Возвращает число исправленных (или найденных при dry_run) строк
+    по каждому виду счётчиков.
+    """
+    actual = {
+        'posts_count': _grouped_counts(Post.objects.all(), 'author'),
+        'followers_count': _grouped_counts(Follow.objects.all(), 'author'),
+        'following_count': _grouped_counts(Follow.objects.all(), 'user'),
+    }
+    existing = {
+        counters.user_id: counters
+        for counters in UserCounters.objects.all()
+    }
+    user_ids = set(existing)
+    for counts in actual.values():
+        user_ids.update(counts)
+    user_ids &= set(User.objects.values_list('pk', flat=True))
+
+    missing, changed = [], []
+    for user_id in user_ids:
+        values = {
+            name: actual[name].get(user_id, 0) for name in USER_COUNTERS
+        }
+        counters = existing.get(user_id)
+        if counters is None:
+            if any(values.values()):
+                missing.append(UserCounters(user_id=user_id, **values))
+            continue
+        if any(getattr(counters, name) != values[name]
+               for name in USER_COUNTERS):
+            for name, value in values.items():
+                setattr(counters, name, value)
+            changed.append(counters)
+
+    drifted_posts = list(
+        Post.objects.annotate(actual=Count('comments'))
+        .exclude(comments_count=F('actual'))
+        .only('pk', 'comments_count')
+    )
+    for post in drifted_posts:
+        post.comments_count = post.actual
+
+    drifted_groups = _drifted_groups()
+
+    if not dry_run:
+        UserCounters.objects.bulk_create(missing)
+        UserCounters.objects.bulk_update(
+            changed, USER_COUNTERS, batch_size=batch_size
+        )
+        Post.objects.bulk_update(
+            drifted_posts, ('comments_count',), batch_size=batch_size
+        )
+        Group.objects.bulk_update(
+            drifted_groups, ('posts_count', 'last_activity'),
+            batch_size=batch_size,
+        )
+    return {
+        'users_created': len(missing),
+        'users_fixed': len(changed),
+        'posts_fixed': len(drifted_posts),
+        'groups_fixed': len(drifted_groups),
+    }
@@ -0,0 +1,109 @@
+"""RSS и Atom лент, отдаваемые потоком.
+
+Генераторы django.utils.feedgenerator пишут документ целиком из
+списка items. Здесь тот же XML собирается кусками: шапка канала, по
+куску на запись, хвост, — а записи берутся из итератора, поэтому длина
+ленты не влияет на память и время до первого байта.
+"""
+import io
+from itertools import chain
+
+from django.utils import feedgenerator
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from .cards import CardUrls
+
+
+class StreamingFeedMixin:
+    """Потоковая выдача для генератора feedgenerator.
+
+    Класс ленты определяет start(handler) — открывающие теги и данные
+    канала — и finish(handler) — закрывающие теги.
+    """
+
+    item_element = 'item'
+
+    def _normalized(self, items):
+        """Записи в том виде, в каком их хранит add_item."""
+        for item in items:
+            self.add_item(**item)
+            yield self.items.pop()
+
+    def stream(self, items):
+        """Куски документа; items — аргументы add_item, новые первыми."""
+        buffer = io.StringIO()
+
+        def flush():
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk
+
+        items = self._normalized(items)
+        first = next(items, None)
+        if first is not None:
+            items = chain([first], items)
+            # Дату обновления канала feedgenerator ищет в self.items —
+            # достаточно самой новой записи.
+            self.items = [first]
+        handler = SimplerXMLGenerator(buffer, 'utf-8')
+        handler.startDocument()
+        self.start(handler)
+        self.items = []
+        yield flush()
+        for item in items:
+            handler.startElement(
+                self.item_element, self.item_attributes(item)
+            )
+            self.add_item_elements(handler, item)
+            handler.endElement(self.item_element)
+            yield flush()
+        self.finish(handler)
+        yield flush()
+
+
+class RssFeed(StreamingFeedMixin, feedgenerator.Rss201rev2Feed):
+    def start(self, handler):
+        handler.startElement('rss', self.rss_attributes())
+        handler.startElement('channel', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def finish(self, handler):
+        self.endChannelElement(handler)
+        handler.endElement('rss')
+
+
+class AtomFeed(StreamingFeedMixin, feedgenerator.Atom1Feed):
+    item_element = 'entry'
+
+    def start(self, handler):
+        handler.startElement('feed', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def finish(self, handler):
+        handler.endElement('feed')
+
+
+FEED_TYPES = {'rss': RssFeed, 'atom': AtomFeed}
+
+
+def post_items(request, posts, chunk_size):
+    """Аргументы add_item для постов queryset, читаемого iterator()."""
+    urls = CardUrls()
+    for post in posts.iterator(chunk_size=chunk_size):
+        post_urls = urls.for_post(post)
+        link = request.build_absolute_uri(post_urls['detail'])
+        yield {
+            'title': post.text[:60],
+            'link': link,
+            'unique_id': link,
+            'description': post.text,
+            'pubdate': post.pub_date,
+            # Atom требует <updated> у каждой записи.
+            'updateddate': post.pub_date,
+            'author_name': (
+                post.author.get_full_name() or post.author.username
+            ),
+            'author_link': request.build_absolute_uri(post_urls['profile']),
+            'categories': [post.group.title] if post.group_id else (),
+        }
@@ -0,0 +1,116 @@
+"""Граф подписок с кэшированными множествами смежности.
+
+Для пользователя кэшируются множества id тех, на кого он подписан
+(following), и тех, кто подписан на него (followers). Сигналы Follow
+после фиксации транзакции сбрасывают оба затронутых множества, поэтому
+проверки подписки, взаимные подписки и подсказки «кого почитать»
+считаются в памяти.
+"""
+from collections import Counter, defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Follow, UserCounters
+
+FOLLOWING_KEY = 'follow_graph:following:{}'
+FOLLOWERS_KEY = 'follow_graph:followers:{}'
+# Сколько своих подписок просматривать для подсказок.
+SUGGESTION_SOURCES = 200
+
+
+def _load(template, field, other, user_ids):
+    """{user_id: frozenset} из кэша, недостающее — одним запросом."""
+    keys = {template.format(user_id): user_id for user_id in user_ids}
+    found = cache.get_many(keys)
+    result = {keys[key]: value for key, value in found.items()}
+    missing = [user_id for key, user_id in keys.items() if key not in found]
+    if missing:
+        loaded = defaultdict(set)
+        for user_id, other_id in Follow.objects.filter(
+                **{f'{field}__in': missing}).values_list(field, other):
+            loaded[user_id].add(other_id)
+        fresh = {user_id: frozenset(loaded[user_id]) for user_id in missing}
+        cache.set_many(
+            {template.format(user_id): ids for user_id, ids in fresh.items()},
+            settings.FOLLOW_GRAPH_TTL,
+        )
+        result.update(fresh)
+    return result
+
+
+def following_many(user_ids):
+    return _load(FOLLOWING_KEY, 'user_id', 'author_id', user_ids)
+
+
+def following(user_id):
+    """id авторов, на которых подписан пользователь."""
+    return following_many([user_id])[user_id]
+
+
+def followers(user_id):
+    """id подписчиков пользователя."""
+    return _load(FOLLOWERS_KEY, 'author_id', 'user_id', [user_id])[user_id]
+
+
+def is_following(user_id, author_id):
+    return author_id in following(user_id)
+
+
+def mutuals(user_id):
+    """id пользователей, подписанных на user_id взаимно."""
+    return following(user_id) & followers(user_id)
+
+
+def suggestions(user_id, limit=5):
+    """Кого почитать: на кого чаще всего подписаны мои подписки.
+
+    Новым пользователям без подписок предлагаются авторы с наибольшим
+    числом подписчиков.
+    """
+    mine = following(user_id)
+    sources = sorted(mine)[:SUGGESTION_SOURCES]
+    scores = Counter()
+    for authors in following_many(sources).values():
+        scores.update(authors)
+    excluded = mine | {user_id}
+    ranked = [
+        author_id for author_id, _ in scores.most_common()
+        if author_id not in excluded
+    ][:limit]
+    if len(ranked) < limit:
+        ranked.extend(
+            UserCounters.objects.exclude(
+                user_id__in=excluded | set(ranked)
+            ).filter(followers_count__gt=0).order_by(
+                '-followers_count'
+            ).values_list('user_id', flat=True)[:limit - len(ranked)]
+        )
+    return ranked
+
+
+def annotate(posts, user):
+    """Отмечает author_followed у постов страницы одним чтением кэша."""
+    if not user.is_authenticated:
+        return posts
+    followed = following(user.pk)
+    for post in posts:
+        post.author_followed = post.author_id in followed
+    return posts
+
+
+def invalidate(user_id, author_id):
+    cache.delete_many([
+        FOLLOWING_KEY.format(user_id), FOLLOWERS_KEY.format(author_id)
+    ])
+
+
+def invalidate_on_commit(user_id, author_id):
+    """invalidate после фиксации текущей транзакции.
+
+    Если сбросить раньше, параллельный запрос перечитает подписки без
+    этой записи и положит их в кэш на FOLLOW_GRAPH_TTL.
+    """
+    transaction.on_commit(partial(invalidate, user_id, author_id))
@@ -0,0 +1,96 @@
+"""Версии для кэша фрагментов страниц.
+
+Ключ фрагмента содержит версии «областей», от которых он зависит
+(лента, группа, профиль, пост). Сигналы моделей увеличивают версию
+области, и старые фрагменты больше не читаются — их вытеснит кэш.
+Версия — время изменения в миллисекундах, поэтому потерянный ключ
+версии не может вернуть устаревший фрагмент.
+"""
+import time
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+
+INDEX = 'index'
+GROUPS = 'groups'
+TRENDING = 'trending'
+KEY_TEMPLATE = 'fragments:version:{}'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def profile_scope(user_id):
+    return f'profile:{user_id}'
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def _now():
+    return int(time.time() * 1000)
+
+
+def versions(*scopes):
+    """Текущие версии областей: {scope: version}."""
+    keys = {KEY_TEMPLATE.format(scope): scope for scope in scopes}
+    found = cache.get_many(keys)
+    missing = {key: _now() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def version_key(*scopes):
+    """Строка версий для ключа фрагмента."""
+    current = versions(*scopes)
+    return '.'.join(str(current[scope]) for scope in scopes)
+
+
+def bump(*scopes):
+    """Инвалидирует все фрагменты, зависящие от scopes."""
+    keys = [KEY_TEMPLATE.format(scope) for scope in scopes if scope]
+    now = _now()
+    old = cache.get_many(keys)
+    cache.set_many(
+        {key: max(now, old.get(key, 0) + 1) for key in keys}, None
+    )
+
+
+def bump_on_commit(*scopes):
+    """bump после фиксации текущей транзакции.
+
+    Иначе параллельный запрос успеет отрендерить фрагмент по старым
+    данным и закэшировать его под новой версией.
+    """
+    transaction.on_commit(partial(bump, *scopes))
+
+
+def post_scopes(post, group_ids=()):
+    """Области, в которых выводится карточка поста."""
+    scopes = [INDEX, post_scope(post.pk), profile_scope(post.author_id)]
+    scopes.extend(
+        group_scope(group_id) for group_id in {post.group_id, *group_ids}
+        if group_id
+    )
+    return scopes
+
+
+def card_keys(posts):
+    """Ключи карточек постов: пост, его автор и названия групп.
+
+    Версии всех карточек страницы читаются одним get_many.
+    """
+    scopes = {GROUPS}
+    for post in posts:
+        scopes.update((post_scope(post.pk), profile_scope(post.author_id)))
+    current = versions(*scopes)
+    return [
+        f'{post.pk}:{current[post_scope(post.pk)]}.'
+        f'{current[profile_scope(post.author_id)]}.{current[GROUPS]}'
+        for post in posts
+    ]
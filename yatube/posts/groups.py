@@ -0,0 +1,43 @@
+"""Каталог групп и кэшированный поиск группы по slug.
+
+Страницы группы (HTML и API) берут группу из кэша и не обращаются к
+таблице групп; сигналы Group сбрасывают запись при изменении и
+удалении. posts_count и last_activity в закэшированном объекте могут
+отставать — они меняются UPDATE-ом без сигналов, и выводит их только
+каталог, который читает группы из БД.
+"""
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.shortcuts import get_object_or_404
+
+from .models import Group
+
+SLUG_KEY = 'groups:slug:{}'
+
+
+def _key(slug):
+    # В slug бывают пробелы и кириллица, недопустимые в ключах memcached.
+    return SLUG_KEY.format(quote(slug))
+
+
+def get_by_slug(slug):
+    """Группа по slug или Http404."""
+    group = cache.get(_key(slug))
+    if group is None:
+        group = get_object_or_404(Group, slug=slug)
+        cache.set(_key(slug), group, settings.GROUP_CACHE_TTL)
+    return group
+
+
+def invalidate(*slugs):
+    cache.delete_many([_key(slug) for slug in set(slugs) if slug])
+
+
+def directory():
+    """Группы каталога: сначала те, где писали недавно."""
+    return Group.objects.order_by(
+        F('last_activity').desc(nulls_last=True), 'title'
+    )
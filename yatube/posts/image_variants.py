@@ -0,0 +1,99 @@
+"""Адаптивные копии картинок постов (ширины из настроек, WebP и JPEG).
+
+render() работает только с байтами и не трогает БД, поэтому его можно
+запускать в отдельных процессах; сохраняет результат save().
+"""
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image
+
+from .models import PostImageVariant
+
+# Пропорции карточки поста, как у миниатюры 960x339.
+ASPECT_RATIO = 960 / 339
+PIL_FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG'}
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def _crop_to_ratio(image):
+    width, height = image.size
+    if width / height > ASPECT_RATIO:
+        new_width = round(height * ASPECT_RATIO)
+        left = (width - new_width) // 2
+        return image.crop((left, 0, left + new_width, height))
+    new_height = round(width / ASPECT_RATIO)
+    top = (height - new_height) // 2
+    return image.crop((0, top, width, top + new_height))
+
+
+def render(data, widths, formats, quality=80):
+    """Возвращает [(width, format, bytes)] для картинки data.
+
+    Ширины больше исходной не строятся (кроме самой маленькой), чтобы
+    не увеличивать картинку без пользы.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        source = _crop_to_ratio(source.convert('RGB'))
+        smallest = min(widths)
+        variants = []
+        for width in sorted(widths):
+            if width > source.width and width != smallest:
+                continue
+            height = max(1, round(width / ASPECT_RATIO))
+            resized = source.resize((width, height), Image.LANCZOS)
+            for name in formats:
+                buffer = io.BytesIO()
+                resized.save(
+                    buffer, PIL_FORMATS[name], quality=quality, optimize=True
+                )
+                variants.append((width, name, buffer.getvalue()))
+        return variants
+
+
+def read_source(post):
+    with post.image.open('rb') as image:
+        return image.read()
+
+
+@transaction.atomic
+def save(post, variants):
+    """Заменяет копии картинки поста на variants из render()."""
+    stem = os.path.splitext(os.path.basename(post.image.name))[0]
+    for old in post.image_variants.all():
+        old.image.delete(save=False)
+    post.image_variants.all().delete()
+    created = []
+    for width, name, content in variants:
+        variant = PostImageVariant(post=post, width=width, format=name)
+        variant.image.save(
+            f'{post.pk}/{stem}-{width}.{EXTENSIONS[name]}',
+            ContentFile(content),
+            save=False,
+        )
+        created.append(variant)
+    return PostImageVariant.objects.bulk_create(created)
+
+
+def build(post):
+    """Строит и сохраняет копии картинки поста в текущем процессе."""
+    if not post.image:
+        return []
+    variants = render(
+        read_source(post),
+        settings.POST_IMAGE_WIDTHS,
+        settings.POST_IMAGE_FORMATS,
+    )
+    return save(post, variants)
+
+
+def srcset(post, image_format):
+    """Значение srcset для копий поста в формате image_format."""
+    return ', '.join(
+        f'{variant.image.url} {variant.width}w'
+        for variant in post.image_variants.all()
+        if variant.format == image_format
+    )
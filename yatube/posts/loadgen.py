@@ -0,0 +1,172 @@
+"""Генератор правдоподобных данных для нагрузочных замеров.
+
+Распределения неравномерные, как в живом сообществе: несколько
+авторов пишут большую часть постов и собирают большинство подписчиков,
+а комментарии концентрируются в немногих «горячих» обсуждениях.
+Строки пишутся пачками bulk_create, в памяти держится одна пачка.
+"""
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+from faker import Faker
+
+from .models import Comment, Follow, Group, Post, User, UserCounters
+from .transfer import rebuild_derived
+from .utils import auto_now_add_disabled
+
+PREFIX = 'load'
+# Посты, между которыми распределяются комментарии.
+HOT_POSTS = 50000
+# Готовые фразы: Faker на каждый из миллионов постов слишком медленный.
+PHRASES = 500
+
+
+class Skewed:
+    """Выбор по закону Ципфа: элемент ранга k — с весом 1 / k ** alpha."""
+
+    def __init__(self, items, alpha, rng):
+        self.items = list(items)
+        self.cum_weights = list(accumulate(
+            1 / (rank + 1) ** alpha for rank in range(len(self.items))
+        ))
+        self.rng = rng
+
+    def __call__(self, k=1):
+        return self.rng.choices(self.items, cum_weights=self.cum_weights, k=k)
+
+    def one(self):
+        return self(1)[0]
+
+
+def _bulk(model, objects, batch_size):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == batch_size:
+            model.objects.bulk_create(batch)
+            batch = []
+    model.objects.bulk_create(batch)
+
+
+def _sample(iterable, size, rng):
+    """Равномерная выборка без загрузки всей последовательности."""
+    sample = []
+    for index, item in enumerate(iterable):
+        if index < size:
+            sample.append(item)
+            continue
+        position = rng.randrange(index + 1)
+        if position < size:
+            sample[position] = item
+    return sample
+
+
+def generate(users=1000, posts=20000, comments=20000, groups=20,
+             follows_per_user=20, alpha=1.1, seed=1, batch_size=5000):
+    """Создаёт набор данных и возвращает его описание."""
+    rng = random.Random(seed)
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed)
+    phrases = [fake.sentence(nb_words=10) for _ in range(PHRASES)]
+    now = timezone.now()
+
+    def text(sentences):
+        return ' '.join(rng.choices(phrases, k=sentences))
+
+    def date():
+        return now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+
+    # Хеш один на всех: make_password на каждого заметно медленнее.
+    password = make_password(None)
+    User.objects.bulk_create(
+        User(
+            username=f'{PREFIX}_{number}',
+            first_name=fake.first_name(),
+            last_name=fake.last_name(),
+            password=password,
+        )
+        for number in range(users)
+    )
+    user_ids = list(
+        User.objects.filter(username__startswith=f'{PREFIX}_').order_by(
+            'pk').values_list('pk', flat=True)
+    )
+    Group.objects.bulk_create(
+        Group(
+            title=fake.word().capitalize(),
+            slug=f'{PREFIX}-{number}',
+            description=text(2),
+        )
+        for number in range(groups)
+    )
+    group_ids = list(
+        Group.objects.filter(slug__startswith=f'{PREFIX}-').values_list(
+            'pk', flat=True
+        )
+    )
+    authors = Skewed(user_ids, alpha, rng)
+    group_choice = Skewed(group_ids, alpha, rng)
+    # Популярность не совпадает с плодовитостью: иначе почти каждый
+    # подписан на самого пишущего автора и ленты раздуваются нереально.
+    celebrities = Skewed(rng.sample(user_ids, len(user_ids)), alpha, rng)
+
+    with auto_now_add_disabled(Post, 'pub_date'):
+        _bulk(Post, (
+            Post(
+                author_id=authors.one(),
+                group_id=group_choice.one() if rng.random() < 0.7 else None,
+                text=text(rng.randint(1, 6)),
+                pub_date=date(),
+            )
+            for _ in range(posts)
+        ), batch_size)
+
+    def follows():
+        for user_id in user_ids:
+            wanted = rng.randint(0, follows_per_user * 2)
+            for author_id in set(celebrities(wanted)) - {user_id}:
+                yield Follow(user_id=user_id, author_id=author_id)
+    _bulk(Follow, follows(), batch_size)
+
+    post_ids = _sample(
+        Post.objects.filter(
+            author__username__startswith=f'{PREFIX}_'
+        ).values_list('pk', flat=True).iterator(),
+        HOT_POSTS, rng,
+    )
+    if post_ids:
+        threads = Skewed(post_ids, alpha, rng)
+        with auto_now_add_disabled(Comment, 'created'):
+            _bulk(Comment, (
+                Comment(
+                    post_id=threads.one(),
+                    author_id=authors.one(),
+                    text=text(rng.randint(1, 2)),
+                    created=date(),
+                )
+                for _ in range(comments)
+            ), batch_size)
+
+    rebuild_derived()
+    return {
+        'users': users,
+        'posts': posts,
+        'comments': comments,
+        'groups': groups,
+        'follows': Follow.objects.filter(
+            user__username__startswith=f'{PREFIX}_'
+        ).count(),
+        'seed': seed,
+    }
+
+
+def targets():
+    """Самые тяжёлые объекты набора: группа, автор, читатель и пост."""
+    group = Group.objects.order_by('-posts_count').first()
+    author = UserCounters.objects.order_by('-posts_count').first().user
+    reader = UserCounters.objects.order_by('-following_count').first().user
+    post = Post.objects.order_by('-comments_count').first()
+    return group, author, reader, post
@@ -0,0 +1,69 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import fragments, image_variants
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит адаптивные копии картинок существующих постов '
+        'в пуле процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count() or 1
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Перестроить копии и у постов, где они уже есть.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').only(
+            'image', 'author', 'group'
+        )
+        if not options['all']:
+            posts = posts.filter(image_variants__isnull=True)
+        processes = options['processes']
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            pending = {}
+            # Список заранее: запись копий меняет результат выборки.
+            for post in list(posts):
+                try:
+                    source = image_variants.read_source(post)
+                except Exception as error:
+                    # Файл картинки мог пропасть из хранилища.
+                    self.stderr.write(f'Пост {post.pk}: {error}')
+                    failed += 1
+                    continue
+                future = executor.submit(
+                    image_variants.render,
+                    source,
+                    settings.POST_IMAGE_WIDTHS,
+                    settings.POST_IMAGE_FORMATS,
+                )
+                pending[future] = post
+                # Не держим в памяти больше картинок, чем нужно пулу.
+                if len(pending) >= processes * 2:
+                    done, failed = self.collect(pending, done, failed)
+            while pending:
+                done, failed = self.collect(pending, done, failed)
+        self.stdout.write(f'Готово: {done}, ошибок: {failed}')
+
+    def collect(self, pending, done, failed):
+        future = next(as_completed(pending))
+        post = pending.pop(future)
+        try:
+            image_variants.save(post, future.result())
+        except Exception as error:
+            self.stderr.write(f'Пост {post.pk}: {error}')
+            return done, failed + 1
+        fragments.bump(*fragments.post_scopes(post))
+        return done + 1, failed
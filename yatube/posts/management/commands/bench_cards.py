@@ -0,0 +1,118 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.test import override_settings
+
+from core.benchmark import measure, rolled_back
+from posts import cards
+from posts.models import Group, Post
+
+User = get_user_model()
+
+# Прежняя карточка: {% include %} на каждый пост и {% url %} внутри.
+INCLUDE_CARD = '''{% load static post_tags %}
+<article>
+  {% include 'includes/post_image.html' %}
+  <ul>
+    <li>Автор:
+      <a href="{% url 'posts:profile' post.author %}">
+        {{ post.author.get_full_name|default:post.author.username }}
+      </a>
+    </li>
+    <li>Дата публикации: {{ post.pub_date|date:"d E Y" }}</li>
+    <li>Комментариев: {{ post.comments_count }}</li>
+  </ul>
+  <p>{{ post.text|linebreaksbr }}</p>
+  <a href="{% url 'posts:post_detail' post.id %}">подробная информация</a>
+  {% if post.group %}
+    <br>
+    <a href="{% url 'posts:group_list' post.group.slug %}">
+      все записи группы {{ post.group.title }}
+    </a>
+  {% endif %}
+</article>'''
+INCLUDE_PAGE = (
+    '{% for post in posts %}{% include card %}'
+    '{% if not forloop.last %}<hr>{% endif %}{% endfor %}'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает рендер страницы карточек через {% include %} и '
+        '{% url %} на каждый пост с тегом {% post_cards %}. Данные '
+        'создаются во временной транзакции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--json', action='store_true')
+
+    @override_settings(
+        CACHES={'default': settings.CACHE_BACKENDS['locmem']},
+        DEBUG=False,
+    )
+    def handle(self, *args, **options):
+        with rolled_back():
+            posts = self.populate(options['cards'])
+            results = self.run(posts, options['repeat'])
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for name, stats in results.items():
+            self.stdout.write(
+                f'{name:<18} page median {stats["median"]:>8.2f} ms  '
+                f'p95 {stats["p95"]:>8.2f} ms  '
+                f'per card {stats["per_card_ms"]:.4f} ms'
+            )
+
+    def populate(self, total):
+        group = Group.objects.create(
+            title='Замер карточек', slug='bench-cards', description='-'
+        )
+        authors = [
+            User.objects.create_user(username=f'bench_cards_{number}')
+            for number in range(10)
+        ]
+        Post.objects.bulk_create(
+            Post(
+                author=authors[number % len(authors)],
+                group=group if number % 2 else None,
+                text=f'Пост {number}\nвторая строка',
+            )
+            for number in range(total)
+        )
+        return list(Post.objects.feed().filter(
+            author__in=authors
+        )[:total])
+
+    def run(self, posts, repeat):
+        engine = engines['django']
+        card = engine.from_string(INCLUDE_CARD)
+        page = engine.from_string(INCLUDE_PAGE)
+
+        def include():
+            page.render({'posts': posts, 'card': card})
+
+        def post_cards():
+            cache.clear()
+            cards.render(posts)
+
+        def post_cards_cached():
+            cards.render(posts)
+
+        results = {}
+        for name, func in (
+            ('include_url', include),
+            ('post_cards', post_cards),
+            ('post_cards_cached', post_cards_cached),
+        ):
+            stats = measure(func, repeat)
+            stats['per_card_ms'] = round(stats['median'] / len(posts), 4)
+            results[name] = stats
+        return results
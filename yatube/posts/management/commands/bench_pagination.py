@@ -0,0 +1,80 @@
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.utils import timezone
+
+from core.benchmark import measure, rolled_back
+from posts.models import Post
+from posts.utils import NEXT, KeysetPaginator, auto_now_add_disabled
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает OFFSET- и keyset-пагинацию ленты на первой и глубокой '
+        'странице. Данные создаются во временной транзакции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        per_page = settings.POST_PER_PAGE
+        pages = options['pages']
+        with rolled_back():
+            self.populate(pages * per_page, options['batch_size'])
+            results = self.run(pages, per_page, options['repeat'])
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for name, stats in results.items():
+            self.stdout.write(
+                f'{name:<22} median {stats["median"]:>9.3f} ms  '
+                f'p95 {stats["p95"]:>9.3f} ms'
+            )
+
+    def populate(self, total, batch_size):
+        author = User.objects.create_user(username='bench_pagination')
+        start = timezone.now()
+        with auto_now_add_disabled(Post, 'pub_date'):
+            for offset in range(0, total, batch_size):
+                Post.objects.bulk_create(
+                    Post(
+                        author=author,
+                        text=f'Пост {number}',
+                        pub_date=start - timedelta(seconds=number),
+                    )
+                    for number in range(
+                        offset, min(offset + batch_size, total)
+                    )
+                )
+
+    def run(self, pages, per_page, repeat):
+        queryset = Post.objects.all()
+        keyset = KeysetPaginator(queryset, per_page)
+        # Курсор на последнюю страницу строим один раз, вне замера.
+        anchor = queryset.order_by('-pub_date', '-pk')[
+            (pages - 1) * per_page - 1
+        ]
+        deep_cursor = keyset.encode(anchor, NEXT)
+
+        def offset_page(number):
+            return lambda: list(Paginator(queryset, per_page).page(number))
+
+        def cursor_page(cursor):
+            return lambda: list(keyset.get_page(cursor))
+
+        return {
+            'offset page 1': measure(offset_page(1), repeat),
+            f'offset page {pages}': measure(offset_page(pages), repeat),
+            'cursor page 1': measure(cursor_page(None), repeat),
+            f'cursor page {pages}': measure(cursor_page(deep_cursor), repeat),
+        }
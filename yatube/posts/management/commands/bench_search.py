@@ -0,0 +1,88 @@
+import json
+import random
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from faker import Faker
+
+from core.benchmark import measure, rolled_back
+from posts.models import Group, Post
+from posts.search import LikeBackend, SQLiteFTSBackend
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск LIKE (как в админке) и индекс FTS5 на '
+        'сгенерированных постах. Данные создаются во временной транзакции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=50000)
+        parser.add_argument('--queries', type=int, default=5)
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        fake = Faker('ru_RU')
+        fake.seed_instance(options['seed'])
+        random.seed(options['seed'])
+        with rolled_back():
+            words = self.populate(fake, options['posts'])
+            SQLiteFTSBackend().rebuild()
+            queries = random.sample(words, options['queries'])
+            results = self.run(queries, options['repeat'])
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for name, stats in results.items():
+            self.stdout.write(
+                f'{name:<12} median {stats["median"]:>9.3f} ms  '
+                f'p95 {stats["p95"]:>9.3f} ms'
+            )
+
+    def populate(self, fake, total):
+        author = User.objects.create_user(username='bench_search')
+        groups = Group.objects.bulk_create(
+            Group(title=fake.word(), slug=f'bench-{number}', description='')
+            for number in range(20)
+        )
+        words = set()
+        batch = []
+        for _ in range(total):
+            text = fake.paragraph(nb_sentences=3)
+            words.update(word for word in text.split() if word.isalpha())
+            batch.append(Post(
+                author=author, text=text, group=random.choice(groups)
+            ))
+            if len(batch) == 5000:
+                Post.objects.bulk_create(batch)
+                batch = []
+        Post.objects.bulk_create(batch)
+        return sorted(words)
+
+    def run(self, queries, repeat):
+        per_page = settings.POST_PER_PAGE
+
+        def first_page(make_results):
+            def run_queries():
+                for query in queries:
+                    page = Paginator(make_results(query), per_page).page(1)
+                    list(page)
+            return run_queries
+
+        def admin_like(query):
+            # То же, что делает PostAdmin.search_fields = ('text',).
+            return Post.objects.filter(text__icontains=query)
+
+        return {
+            'admin LIKE': measure(first_page(admin_like), repeat),
+            'LikeBackend': measure(
+                first_page(LikeBackend().search), repeat
+            ),
+            'FTS5': measure(first_page(SQLiteFTSBackend().search), repeat),
+        }
@@ -0,0 +1,148 @@
+import json
+import re
+import time
+from copy import deepcopy
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.benchmark import rolled_back, summarize
+from core.template_cache import warm_up
+from posts import loadgen
+from posts.models import User
+
+LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+# Загрузчики шаблонов и нужна ли предварительная загрузка.
+PROFILES = {
+    'uncached': (LOADERS, False),
+    'cached': ([('django.template.loaders.cached.Loader', LOADERS)], False),
+    'cached_warm': (
+        [('django.template.loaders.cached.Loader', LOADERS)], True
+    ),
+}
+TEMPLATE_TIMING_RE = re.compile(r'tpl;dur=([\d.]+)')
+
+
+def templates_with(loaders):
+    templates = deepcopy(settings.TEMPLATES)
+    templates[0]['APP_DIRS'] = False
+    templates[0]['OPTIONS']['loaders'] = loaders
+    return templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время рендера шаблонов страниц лент без кэширующего '
+        'загрузчика, с ним и с предварительной загрузкой шаблонов. '
+        'Данные создаются во временной транзакции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--comments', type=int, default=2000)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--json', action='store_true')
+
+    # Кэш фрагментов отключён: иначе повторные запросы не рендерят
+    # ленту, и замер покажет только время чтения кэша. Время шаблонов
+    # берётся из заголовка Server-Timing (core.middleware).
+    @override_settings(
+        CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }},
+        DEBUG=False,
+        THUMBNAIL_ASYNC=False,
+        PERF_METRICS_ENABLED=True,
+    )
+    def handle(self, *args, **options):
+        with rolled_back():
+            loadgen.generate(
+                users=options['users'],
+                posts=options['posts'],
+                comments=options['comments'],
+                groups=options['groups'],
+                seed=options['seed'],
+            )
+            results = {
+                profile: self.run(loaders, warm, options['repeat'])
+                for profile, (loaders, warm) in PROFILES.items()
+            }
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for profile, result in results.items():
+            warm_up_ms = result['warm_up_ms']
+            self.stdout.write(profile + (
+                f' (загрузка шаблонов {warm_up_ms:.2f} ms)'
+                if warm_up_ms is not None else ''
+            ))
+            for name, stats in result['pages'].items():
+                self.stdout.write(
+                    f'  {name:<14} first {stats["first"]:>8.2f} ms  '
+                    f'median {stats["median"]:>8.2f} ms  '
+                    f'p95 {stats["p95"]:>8.2f} ms'
+                )
+
+    def pages(self):
+        group, author, reader, post = loadgen.targets()
+        # Server-Timing отдаётся только персоналу; общие страницы он
+        # видит как гость, а данные всё равно откатываются.
+        reader.is_staff = True
+        reader.save(update_fields=['is_staff'])
+        guest = Client()
+        guest.force_login(User.objects.get_or_create(
+            username='bench_staff', defaults={'is_staff': True}
+        )[0])
+        user = Client()
+        user.force_login(reader)
+        return {
+            'index': (guest, reverse('posts:index')),
+            'group_index': (guest, reverse('posts:group_index')),
+            'group_posts': (
+                guest, reverse('posts:group_list', args=[group.slug])
+            ),
+            'profile': (
+                guest, reverse('posts:profile', args=[author.username])
+            ),
+            'post_detail': (
+                guest, reverse('posts:post_detail', args=[post.pk])
+            ),
+            'trending': (guest, reverse('posts:trending')),
+            'follow_index': (user, reverse('posts:follow_index')),
+        }
+
+    def template_ms(self, client, url):
+        response = client.get(url)
+        if response.status_code >= 400:
+            raise CommandError(f'{url}: ответ {response.status_code}')
+        return float(
+            TEMPLATE_TIMING_RE.search(response['Server-Timing']).group(1)
+        )
+
+    def run(self, loaders, warm, repeat):
+        # Смена TEMPLATES пересоздаёт движок: каждый профиль начинает
+        # с пустого кэша шаблонов.
+        with override_settings(TEMPLATES=templates_with(loaders)):
+            warm_up_ms = None
+            if warm:
+                start = time.perf_counter()
+                warm_up()
+                warm_up_ms = round((time.perf_counter() - start) * 1000, 3)
+            pages = {}
+            for name, (client, url) in self.pages().items():
+                first = self.template_ms(client, url)
+                pages[name] = {
+                    'first': first,
+                    **summarize([
+                        self.template_ms(client, url) for _ in range(repeat)
+                    ]),
+                }
+        return {'warm_up_ms': warm_up_ms, 'pages': pages}
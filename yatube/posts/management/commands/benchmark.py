@@ -0,0 +1,161 @@
+import json
+import platform
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.benchmark import measure, rolled_back
+from posts import loadgen
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует набор данных заданного размера и замеряет для каждой '
+        'страницы задержку (холодный и тёплый кэш), число запросов и '
+        'пиковую память. Данные создаются во временной транзакции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--follows-per-user', type=int, default=20)
+        parser.add_argument(
+            '--alpha', type=float, default=1.1,
+            help='Перекос распределений (закон Ципфа).',
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--json', action='store_true')
+        parser.add_argument(
+            '--output', help='Сохранить результат в JSON-файл.'
+        )
+
+    # Отдельный кэш в памяти: замеры не трогают общий кэш и не зависят
+    # от того, что в нём осталось с прошлого запуска.
+    @override_settings(
+        CACHES={'default': settings.CACHE_BACKENDS['locmem']},
+        DEBUG=False,
+        THUMBNAIL_ASYNC=False,
+    )
+    def handle(self, *args, **options):
+        with rolled_back():
+            dataset = loadgen.generate(
+                users=options['users'],
+                posts=options['posts'],
+                comments=options['comments'],
+                groups=options['groups'],
+                follows_per_user=options['follows_per_user'],
+                alpha=options['alpha'],
+                seed=options['seed'],
+            )
+            views = self.run(options['repeat'])
+        report = {
+            'meta': {
+                'date': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'repeat': options['repeat'],
+            },
+            'dataset': dataset,
+            'views': views,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as stream:
+                json.dump(report, stream, indent=2)
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for name, result in views.items():
+            self.stdout.write(
+                f'{name:<14} cold p95 {result["cold"]["p95"]:>8.2f} ms  '
+                f'warm p95 {result["warm"]["p95"]:>8.2f} ms  '
+                f'queries {result["queries"]:>3}  '
+                f'peak {result["peak_kb"]:>8.1f} KiB'
+            )
+
+    def scenarios(self):
+        group, author, reader, post = loadgen.targets()
+        guest = Client()
+        user = Client()
+        user.force_login(reader)
+        writer = Client()
+        writer.force_login(author)
+
+        def get(client, url):
+            return lambda: client.get(url)
+
+        def follow_toggle():
+            user.post(reverse(
+                'posts:profile_follow', args=[author.username]
+            ))
+            return user.post(reverse(
+                'posts:profile_unfollow', args=[author.username]
+            ))
+
+        return {
+            'index': get(guest, reverse('posts:index')),
+            'group_index': get(guest, reverse('posts:group_index')),
+            'group_posts': get(
+                guest, reverse('posts:group_list', args=[group.slug])
+            ),
+            'profile': get(
+                guest, reverse('posts:profile', args=[author.username])
+            ),
+            'post_detail': get(
+                guest, reverse('posts:post_detail', args=[post.pk])
+            ),
+            'trending': get(guest, reverse('posts:trending')),
+            'follow_index': get(user, reverse('posts:follow_index')),
+            'post_create': lambda: writer.post(
+                reverse('posts:post_create'), {'text': 'Замер'}
+            ),
+            'add_comment': lambda: user.post(
+                reverse('posts:add_comment', args=[post.pk]),
+                {'text': 'Замер'},
+            ),
+            'follow': follow_toggle,
+        }
+
+    def run(self, repeat):
+        results = {}
+        for name, request in self.scenarios().items():
+            def checked():
+                response = request()
+                if response.status_code >= 400:
+                    raise CommandError(
+                        f'{name}: ответ {response.status_code}'
+                    )
+
+            def cold():
+                cache.clear()
+                checked()
+
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                checked()
+            # Считаем сразу: следующий запрос очистит журнал запросов
+            # (request_started → reset_queries).
+            query_count = len(queries)
+            cache.clear()
+            tracemalloc.start()
+            checked()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[name] = {
+                'cold': measure(cold, repeat),
+                'warm': measure(checked, repeat),
+                'queries': query_count,
+                'peak_kb': round(peak / 1024, 1),
+            }
+        return results
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts import trending
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рейтинги ленты «Популярное». Запускается '
+        'периодически (cron): учитываются только новые комментарии.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Пересчитать рейтинги заново, а не инкрементально.',
+        )
+
+    def handle(self, *args, **options):
+        result = trending.compute(rebuild=options['rebuild'])
+        for name, value in result.items():
+            self.stdout.write(f'{name}: {value}')
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from posts.transfer import DATASETS, FORMATS, write_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает группы, посты, комментарии или подписки в JSONL/CSV '
+        'потоком, не загружая таблицу в память.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=DATASETS)
+        parser.add_argument(
+            'output', nargs='?', default='-',
+            help='Файл для записи, по умолчанию stdout.',
+        )
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        output = options['output']
+        fmt = options['format'] or (
+            'csv' if output.endswith('.csv') else 'jsonl'
+        )
+        dataset = DATASETS[options['dataset']]
+        rows = dataset.export_rows(chunk_size=options['chunk_size'])
+        if output == '-':
+            write_records(self.stdout, rows, dataset.fields, fmt)
+            return
+        with open(output, 'w', encoding='utf-8', newline='') as stream:
+            total = write_records(stream, rows, dataset.fields, fmt)
+        self.stderr.write(f'Записей: {total}')
@@ -0,0 +1,58 @@
+# Generated by Django 2.2.6 on 2026-10-18 20:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Follow = apps.get_model('posts', 'Follow')
+    UserCounters = apps.get_model('posts', 'UserCounters')
+    counters = {}
+
+    def add(queryset, field, name):
+        rows = queryset.values_list(field).annotate(n=Count('pk')).order_by()
+        for user_id, total in rows:
+            counters.setdefault(user_id, {})[name] = total
+
+    add(Post.objects.all(), 'author', 'posts_count')
+    add(Follow.objects.all(), 'author', 'followers_count')
+    add(Follow.objects.all(), 'user', 'following_count')
+    UserCounters.objects.bulk_create(
+        UserCounters(user_id=user_id, **values)
+        for user_id, values in counters.items()
+    )
+    for post in Post.objects.annotate(n=Count('comments')).filter(n__gt=0):
+        Post.objects.filter(pk=post.pk).update(comments_count=post.n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0011_auto_20261018_2017'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCounters',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counters', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Постов')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='Подписчиков')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='Подписок')),
+            ],
+            options={
+                'verbose_name': 'user counters',
+                'verbose_name_plural': 'user counters',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Комментариев'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE posts_post_fts USING fts5("
+    "text, group_title, tokenize='unicode61 remove_diacritics 2')"
+)
+FILL_SQL = (
+    "INSERT INTO posts_post_fts (rowid, text, group_title) "
+    "SELECT post.id, post.text, COALESCE(grp.title, '') "
+    "FROM posts_post AS post "
+    "LEFT JOIN posts_group AS grp ON grp.id = post.group_id"
+)
+
+
+def create_fts(apps, schema_editor):
+    # Индекс FTS5 есть только в SQLite; другие СУБД используют свой
+    # бэкенд поиска (см. posts.search).
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SQL)
+    schema_editor.execute(FILL_SQL)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS posts_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_auto_20261018_2023'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 2.2.6 on 2026-10-18 20:59
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def fill_group_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Group = apps.get_model('posts', 'Group')
+    rows = Post.objects.filter(group__isnull=False).values_list(
+        'group'
+    ).annotate(n=Count('pk'), last=Max('pub_date')).order_by()
+    for group_id, total, last in rows:
+        Group.objects.filter(pk=group_id).update(
+            posts_count=total, last_activity=last
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_trendingscore'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='last_activity',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Последний пост'),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Постов'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-pub_date'], name='post_group_pub_date_idx'),
+        ),
+        migrations.RunPython(fill_group_counters, migrations.RunPython.noop),
+    ]
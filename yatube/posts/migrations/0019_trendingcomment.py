@@ -0,0 +1,24 @@
+# Generated by Django 2.2.6 on 2026-10-18 21:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_group_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingComment',
+            fields=[
+                ('comment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='posts.Comment')),
+            ],
+            options={
+                'verbose_name': 'trending comment',
+                'verbose_name_plural': 'trending comments',
+            },
+        ),
+    ]
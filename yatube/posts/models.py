@@ -1,9 +1,40 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import connections, models, router, transaction
 from django.db.models import UniqueConstraint
+from django.db.models.signals import post_delete, post_save
 
 User = get_user_model()
 
+# Поля, которые выводит карточка поста в лентах.
+FEED_FIELDS = (
+    'text',
+    'pub_date',
+    'image',
+    'thumbnail',
+    'author__username',
+    'author__first_name',
+    'author__last_name',
+    'group__slug',
+    'group__title',
+    'comments_count',
+)
+
+
+class PostQuerySet(models.QuerySet):
+    def feed(self, only=FEED_FIELDS, defer=()):
+        """Посты для лент: автор и группа выбираются одним JOIN-ом.
+
+        only/defer позволяют странице сузить или расширить набор колонок.
+        """
+        queryset = self.select_related('author', 'group').prefetch_related(
+            'image_variants'
+        )
+        if only:
+            queryset = queryset.only(*only)
+        if defer:
+            queryset = queryset.defer(*defer)
+        return queryset
+
 
 class Post(models.Model):
     text = models.TextField(
@@ -36,24 +67,72 @@ class Post(models.Model):
         blank=True,
         help_text='Загрузите фото'
     )
+    # Заполняется фоновой задачей posts.thumbnails после загрузки image.
+    thumbnail = models.ImageField(
+        'Миниатюра',
+        upload_to='cache/',
+        blank=True,
+        editable=False,
+    )
+    comments_count = models.PositiveIntegerField(
+        'Комментариев',
+        default=0,
+        editable=False,
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'post'
         verbose_name_plural = 'posts'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('group', '-pub_date'), name='post_group_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post = super().from_db(db, field_names, values)
+        # Группа до редактирования: её ленту тоже нужно инвалидировать.
+        post.loaded_group_id = post.__dict__.get('group_id')
+        return post
+
+    @transaction.atomic
+    def save(self, *args, **kwargs):
+        # Счётчики обновляются в той же транзакции, что и запись.
+        super().save(*args, **kwargs)
+        # Сигналы уже отработали со старой группой; повторное сохранение
+        # не должно снова переносить пост между счётчиками групп.
+        self.loaded_group_id = self.group_id
+
 
 class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    # Поддерживаются сигналами posts.signals, сверяются recount_counters.
+    posts_count = models.PositiveIntegerField(
+        'Постов', default=0, editable=False
+    )
+    last_activity = models.DateTimeField(
+        'Последний пост', null=True, blank=True, editable=False
+    )
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        group = super().from_db(db, field_names, values)
+        # Прежний slug: его запись в кэше тоже нужно сбросить.
+        group.loaded_slug = group.__dict__.get('slug')
+        return group
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -82,10 +161,86 @@ class Comment(models.Model):
         ordering = ('created',)
         verbose_name = 'comment'
         verbose_name_plural = 'comments'
+        indexes = (
+            models.Index(
+                fields=('post', 'created'), name='comment_post_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text
 
+    @transaction.atomic
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+
+class FollowQuerySet(models.QuerySet):
+    """Подписка и отписка одним SQL-запросом без гонок.
+
+    Уникальность пары (user, author) обеспечивает unique_followers:
+    повторная подписка не создаёт строку, повторная отписка ничего не
+    удаляет. Сигналы отправляются вручную и только при изменении, чтобы
+    счётчики, лента и граф подписок не сдвигались дважды.
+
+    RETURNING требует SQLite 3.35 и новее (Django 2.2 довольствуется
+    3.8.3) или PostgreSQL.
+    """
+
+    def _write_db(self):
+        # self.db у менеджера — база для чтения, то есть реплика.
+        return self._db or router.db_for_write(self.model)
+
+    def _execute(self, using, sql, params):
+        with connections[using].cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchone()
+
+    def follow(self, user_id, username):
+        """Новая подписка или None, если она уже была.
+
+        None же возвращается, если автора нет или это сам пользователь.
+        """
+        using = self._write_db()
+        with transaction.atomic(using=using):
+            row = self._execute(
+                using,
+                f'INSERT INTO {self.model._meta.db_table} '
+                f'(user_id, author_id) '
+                f'SELECT %s, id FROM {User._meta.db_table} '
+                f'WHERE username = %s AND id != %s '
+                f'ON CONFLICT DO NOTHING RETURNING id, author_id',
+                [user_id, username, user_id],
+            )
+            if row is None:
+                return None
+            follow = self.model(pk=row[0], user_id=user_id, author_id=row[1])
+            post_save.send(
+                sender=self.model, instance=follow, created=True,
+                update_fields=None, raw=False, using=using,
+            )
+        return follow
+
+    def unfollow(self, user_id, username):
+        """Удалённая подписка или None, если её не было."""
+        using = self._write_db()
+        with transaction.atomic(using=using):
+            row = self._execute(
+                using,
+                f'DELETE FROM {self.model._meta.db_table} '
+                f'WHERE user_id = %s AND author_id = ('
+                f'SELECT id FROM {User._meta.db_table} WHERE username = %s'
+                f') RETURNING id, author_id',
+                [user_id, username],
+            )
+            if row is None:
+                return None
+            follow = self.model(pk=row[0], user_id=user_id, author_id=row[1])
+            post_delete.send(
+                sender=self.model, instance=follow, using=using,
+            )
+        return follow
+
 
 class Follow(models.Model):
     user = models.ForeignKey(
@@ -100,6 +255,8 @@ class Follow(models.Model):
         verbose_name='автор'
     )
 
+    objects = FollowQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'follow'
         verbose_name_plural = 'followers'
@@ -108,3 +265,158 @@ class Follow(models.Model):
                 fields=('user', 'author'), name='unique_followers',
             ),
         )
+
+    @transaction.atomic
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+
+class UserCounters(models.Model):
+    """Денормализованные счётчики пользователя.
+
+    Поддерживаются сигналами posts.signals, сверяются командой
+    recount_counters.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='counters',
+    )
+    posts_count = models.PositiveIntegerField('Постов', default=0)
+    followers_count = models.PositiveIntegerField('Подписчиков', default=0)
+    following_count = models.PositiveIntegerField('Подписок', default=0)
+    # Посты автора лента подписок читает напрямую (posts.timeline).
+    fanout_on_read = models.BooleanField(
+        'Лента читает напрямую', default=False
+    )
+
+    class Meta:
+        verbose_name = 'user counters'
+        verbose_name_plural = 'user counters'
+
+    def __str__(self):
+        return f'{self.user_id}: {self.posts_count}'
+
+    @classmethod
+    def for_user(cls, user):
+        """Счётчики пользователя; нули, если он ещё ничего не делал."""
+        try:
+            return user.counters
+        except cls.DoesNotExist:
+            return cls(user=user)
+
+
+class TimelineEntry(models.Model):
+    """Пост в материализованной ленте подписок пользователя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    # Копия Post.pub_date: страница ленты читается по индексу записей.
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        verbose_name = 'timeline entry'
+        verbose_name_plural = 'timeline entries'
+        constraints = (
+            UniqueConstraint(
+                fields=('user', 'post'), name='unique_timeline_entry',
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', 'author'), name='timeline_user_author_idx'
+            ),
+            models.Index(
+                fields=('user', '-pub_date', '-post'),
+                name='timeline_user_date_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user_id}: {self.post_id}'
+
+
+class TrendingScore(models.Model):
+    """Рейтинг поста в ленте «Популярное».
+
+    Пересчитывается командой compute_trending (posts.trending).
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+    )
+    score = models.FloatField('Рейтинг', default=0)
+    computed = models.DateTimeField('Пересчитан')
+
+    class Meta:
+        verbose_name = 'trending score'
+        verbose_name_plural = 'trending scores'
+        indexes = (
+            models.Index(fields=('-score',), name='trending_score_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.post_id}: {self.score:.3f}'
+
+
+class TrendingComment(models.Model):
+    """Комментарий, уже учтённый в рейтинге «Популярное».
+
+    Хранятся только комментарии за последние TRENDING_LATE_MARGIN
+    секунд: пересчёт перечитывает этот запас, чтобы не пропустить
+    транзакции, зафиксированные после прошлого запуска.
+    """
+    comment = models.OneToOneField(
+        Comment,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+',
+    )
+
+    class Meta:
+        verbose_name = 'trending comment'
+        verbose_name_plural = 'trending comments'
+
+    def __str__(self):
+        return str(self.comment_id)
+
+
+class PostImageVariant(models.Model):
+    """Уменьшенная копия картинки поста для srcset."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_variants',
+    )
+    width = models.PositiveIntegerField('Ширина')
+    format = models.CharField('Формат', max_length=10)
+    image = models.ImageField('Картинка', upload_to='variants/')
+
+    class Meta:
+        verbose_name = 'image variant'
+        verbose_name_plural = 'image variants'
+        ordering = ('width',)
+        constraints = (
+            UniqueConstraint(
+                fields=('post', 'format', 'width'),
+                name='unique_image_variant',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.post_id}: {self.format} {self.width}w'
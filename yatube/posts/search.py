@@ -0,0 +1,161 @@
+"""Полнотекстовый поиск по постам.
+
+Бэкенд выбирается настройкой POSTS_SEARCH_BACKEND. SQLiteFTSBackend
+хранит инвертированный индекс в виртуальной таблице FTS5 и
+обновляется сигналами при сохранении и удалении постов и групп;
+LikeBackend ищет через LIKE и подходит для любой СУБД.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Group, Post
+
+FTS_TABLE = 'posts_post_fts'
+POST_TABLE = Post._meta.db_table
+GROUP_TABLE = Group._meta.db_table
+WORD_RE = re.compile(r'\w+')
+
+
+def get_backend(path=None):
+    return _load_backend(path or settings.POSTS_SEARCH_BACKEND)
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    return import_string(path)()
+
+
+class SearchBackend:
+    """Интерфейс бэкенда поиска.
+
+    Бэкенд определяет search(query, queryset=None) — результаты по
+    убыванию релевантности, поддерживающие len() и срезы. Обновление
+    индекса по умолчанию ничего не делает.
+    """
+
+    def index_post(self, post):
+        pass
+
+    def remove_post(self, post_id):
+        pass
+
+    def index_group(self, group):
+        pass
+
+    def remove_group(self, group_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class LikeBackend(SearchBackend):
+    """Поиск через LIKE '%…%' — полный просмотр таблицы, без индекса."""
+
+    def search(self, query, queryset=None):
+        queryset = Post.objects.feed() if queryset is None else queryset
+        words = WORD_RE.findall(query)
+        if not words:
+            return queryset.none()
+        for word in words:
+            queryset = queryset.filter(
+                Q(text__icontains=word) | Q(group__title__icontains=word)
+            )
+        return queryset
+
+
+class FTSResults:
+    """Ленивая выборка результатов FTS5 для Paginator."""
+
+    def __init__(self, match, queryset):
+        self.match = match
+        self.queryset = queryset
+
+    def count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s',
+                [self.match],
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        limit = -1 if key.stop is None else key.stop - start
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s ORDER BY rank '
+                f'LIMIT %s OFFSET %s',
+                [self.match, limit, start],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        posts = self.queryset.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """Инвертированный индекс SQLite FTS5, ранжирование по BM25."""
+
+    @staticmethod
+    def make_match(query):
+        # Каждое слово — отдельная фраза с поиском по префиксу, чтобы
+        # спецсимволы FTS5 из запроса не ломали синтаксис.
+        return ' '.join(f'"{word}"*' for word in WORD_RE.findall(query))
+
+    def search(self, query, queryset=None):
+        queryset = Post.objects.feed() if queryset is None else queryset
+        match = self.make_match(query)
+        if not match:
+            return []
+        return FTSResults(match, queryset)
+
+    def _execute(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def index_post(self, post):
+        self._execute(
+            f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, text, group_title) '
+            f'SELECT %s, %s, COALESCE(('
+            f'SELECT title FROM {GROUP_TABLE} WHERE id = %s), \'\')',
+            [post.pk, post.text, post.group_id],
+        )
+
+    def remove_post(self, post_id):
+        self._execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+        )
+
+    def _set_group_title(self, group_id, title):
+        self._execute(
+            f'UPDATE {FTS_TABLE} SET group_title = %s WHERE rowid IN ('
+            f'SELECT id FROM {POST_TABLE} WHERE group_id = %s)',
+            [title, group_id],
+        )
+
+    def index_group(self, group):
+        self._set_group_title(group.pk, group.title)
+
+    def remove_group(self, group_id):
+        self._set_group_title(group_id, '')
+
+    def rebuild(self):
+        self._execute(f'DELETE FROM {FTS_TABLE}')
+        self._execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, text, group_title) '
+            f'SELECT post.id, post.text, COALESCE(grp.title, \'\') '
+            f'FROM {POST_TABLE} AS post '
+            f'LEFT JOIN {GROUP_TABLE} AS grp ON grp.id = post.group_id'
+        )
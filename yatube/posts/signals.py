@@ -0,0 +1,134 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import follow_graph, fragments, groups, search, timeline
+from .counters import (
+    shift_comments_count, shift_group_counters, shift_user_counters,
+)
+from .models import Comment, Follow, Group, Post, User
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        shift_user_counters(instance.author_id, create=True, posts_count=1)
+        if timeline.is_enabled():
+            timeline.fan_out(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    shift_user_counters(instance.author_id, posts_count=-1)
+
+
+@receiver(post_save, sender=Post)
+def update_group_counters(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_group_id = getattr(instance, 'loaded_group_id', None)
+    if created or old_group_id != instance.group_id:
+        shift_group_counters(instance.group_id, 1)
+    if not created and old_group_id != instance.group_id:
+        shift_group_counters(old_group_id, -1)
+
+
+@receiver(post_delete, sender=Post)
+def post_removed_from_group(sender, instance, **kwargs):
+    shift_group_counters(instance.group_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        shift_comments_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    shift_comments_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        shift_user_counters(instance.user_id, create=True, following_count=1)
+        shift_user_counters(
+            instance.author_id, create=True, followers_count=1
+        )
+        if timeline.is_enabled():
+            timeline.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    shift_user_counters(instance.user_id, following_count=-1)
+    shift_user_counters(instance.author_id, followers_count=-1)
+    if timeline.is_enabled():
+        timeline.prune(instance.user_id, instance.author_id)
+
+
+@receiver([post_save, post_delete], sender=Follow)
+def invalidate_follow_graph(sender, instance, **kwargs):
+    follow_graph.invalidate_on_commit(instance.user_id, instance.author_id)
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_post_fragments(sender, instance, **kwargs):
+    fragments.bump_on_commit(*fragments.post_scopes(
+        instance, [getattr(instance, 'loaded_group_id', None)]
+    ))
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_comment_fragments(sender, instance, **kwargs):
+    # В карточках выводится число комментариев.
+    if Comment.post.is_cached(instance):
+        post = instance.post
+    else:
+        post = Post.objects.filter(pk=instance.post_id).only(
+            'author_id', 'group_id'
+        ).first()
+    if post is not None:
+        fragments.bump_on_commit(*fragments.post_scopes(post))
+
+
+@receiver([post_save, post_delete], sender=Group)
+def invalidate_group_fragments(sender, instance, **kwargs):
+    fragments.bump_on_commit(
+        fragments.GROUPS, fragments.group_scope(instance.pk)
+    )
+    groups.invalidate(instance.slug, getattr(instance, 'loaded_slug', None))
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_fragments(sender, instance, update_fields=None,
+                              **kwargs):
+    # Вход пользователя сохраняет только last_login — карточки не меняются.
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    fragments.bump_on_commit(
+        fragments.INDEX, fragments.GROUPS,
+        fragments.profile_scope(instance.pk),
+    )
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    search.get_backend().index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.get_backend().remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+def index_group(sender, instance, created, **kwargs):
+    if not created:
+        search.get_backend().index_group(instance)
+
+
+@receiver(pre_delete, sender=Group)
+def unindex_group(sender, instance, **kwargs):
+    # После удаления у постов уже не будет group_id.
+    search.get_backend().remove_group(instance.pk)
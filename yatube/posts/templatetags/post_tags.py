@@ -0,0 +1,17 @@
+from django import template
+
+from posts import cards, image_variants
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts, show_group=True):
+    """Карточки постов страницы (posts.cards)."""
+    return cards.render(posts, show_group)
+
+
+@register.filter
+def srcset(post, image_format):
+    """srcset из адаптивных копий картинки поста."""
+    return image_variants.srcset(post, image_format)
@@ -0,0 +1,121 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.testing import on_commit_callbacks
+
+from .. import fragments
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(POST_PER_PAGE=2)
+class ApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, text=f'Пост {number}', group=cls.group
+            )
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feeds_are_paginated_by_cursor(self):
+        """Ленты API отдают посты страницами по курсору."""
+        urls = [
+            reverse('api:feed'),
+            reverse('api:group', kwargs={'slug': self.group.slug}),
+            reverse('api:profile', kwargs={'username': self.author.username}),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.guest_client.get(url).json()
+                second = self.guest_client.get(first['next']).json()
+
+                self.assertEqual(
+                    [post['id'] for post in first['results']
+                     + second['results']],
+                    [post.pk for post in reversed(self.posts)],
+                )
+                self.assertIsNone(second['next'])
+
+    def test_post_detail_with_comments(self):
+        """Пост в API содержит автора, группу и комментарии."""
+        post = self.posts[0]
+        Comment.objects.create(post=post, author=self.author, text='Ком')
+
+        data = self.guest_client.get(
+            reverse('api:post_detail', kwargs={'post_id': post.pk})
+        ).json()
+
+        self.assertEqual(data['author'], self.author.username)
+        self.assertEqual(data['group'], self.group.slug)
+        self.assertEqual(data['comments_count'], 1)
+        self.assertEqual(
+            [comment['text'] for comment in data['comments']['results']],
+            ['Ком'],
+        )
+
+    def test_unchanged_feed_returns_304_without_queries(self):
+        """Неизменённая лента отвечает 304 без запросов к базе."""
+        url = reverse('api:feed')
+        response = self.guest_client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.guest_client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(len(queries), 0)
+
+    def test_changes_update_etag(self):
+        """Новый пост и комментарий меняют ETag затронутых ответов."""
+        feed_url = reverse('api:feed')
+        post_url = reverse(
+            'api:post_detail', kwargs={'post_id': self.posts[0].pk}
+        )
+        feed_etag = self.guest_client.get(feed_url)['ETag']
+        post_etag = self.guest_client.get(post_url)['ETag']
+
+        with on_commit_callbacks():
+            Comment.objects.create(
+                post=self.posts[0], author=self.author, text='Ком'
+            )
+            Post.objects.create(author=self.author, text='Новый пост')
+
+        for url, etag in ((feed_url, feed_etag), (post_url, post_etag)):
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_unknown_objects_return_404(self):
+        """Несуществующие группа, автор и пост отдают 404."""
+        urls = [
+            reverse('api:group', kwargs={'slug': 'missing'}),
+            reverse('api:profile', kwargs={'username': 'missing'}),
+            reverse('api:post_detail', kwargs={'post_id': 0}),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.guest_client.get(url).status_code, 404)
+        # Версия для несуществующего поста не заводится.
+        self.assertIsNone(cache.get(
+            fragments.KEY_TEMPLATE.format(fragments.post_scope(0))
+        ))
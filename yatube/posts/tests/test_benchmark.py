@@ -0,0 +1,84 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from .. import loadgen
+from ..models import Comment, Post, UserCounters
+
+
+class LoadGeneratorTest(TestCase):
+    def test_generate_builds_skewed_dataset(self):
+        """Генератор создаёт данные с перекосом и согласованными счётчиками."""
+        dataset = loadgen.generate(
+            users=30, posts=600, comments=300, groups=3, seed=2
+        )
+
+        self.assertEqual(Post.objects.count(), 600)
+        self.assertEqual(Comment.objects.count(), 300)
+        self.assertGreater(dataset['follows'], 0)
+        counts = sorted(
+            UserCounters.objects.values_list('posts_count', flat=True),
+            reverse=True,
+        )
+        self.assertGreater(counts[0], 5 * counts[len(counts) // 2])
+        post = Post.objects.order_by('-comments_count').first()
+        self.assertEqual(post.comments_count, post.comments.count())
+
+
+class BenchmarkCommandTest(TestCase):
+    def test_report_covers_every_view(self):
+        """Отчёт в JSON содержит задержки, запросы и память по страницам."""
+        output = StringIO()
+        call_command(
+            'benchmark', '--users', '20', '--posts', '200',
+            '--comments', '100', '--groups', '2', '--repeat', '1',
+            '--json', stdout=output,
+        )
+
+        views = json.loads(output.getvalue())['views']
+        self.assertEqual(set(views), {
+            'index', 'group_index', 'group_posts', 'profile', 'post_detail',
+            'trending', 'follow_index', 'post_create', 'add_comment', 'follow',
+        })
+        for name, result in views.items():
+            with self.subTest(view=name):
+                self.assertGreater(result['queries'], 0)
+                self.assertIn('p95', result['cold'])
+
+
+class BenchTemplatesCommandTest(TestCase):
+    def test_report_covers_profiles_and_pages(self):
+        """Отчёт содержит время рендера страниц для каждого профиля."""
+        output = StringIO()
+        call_command(
+            'bench_templates', '--users', '20', '--posts', '100',
+            '--comments', '50', '--groups', '2', '--repeat', '1',
+            '--json', stdout=output,
+        )
+
+        results = json.loads(output.getvalue())
+        self.assertEqual(
+            set(results), {'uncached', 'cached', 'cached_warm'}
+        )
+        self.assertIsNotNone(results['cached_warm']['warm_up_ms'])
+        for profile, result in results.items():
+            with self.subTest(profile=profile):
+                self.assertIn('follow_index', result['pages'])
+                self.assertGreater(result['pages']['index']['median'], 0)
+
+
+class BenchCardsCommandTest(TestCase):
+    def test_report_compares_rendering_paths(self):
+        output = StringIO()
+        call_command(
+            'bench_cards', '--cards', '10', '--repeat', '1', '--json',
+            stdout=output,
+        )
+
+        results = json.loads(output.getvalue())
+        self.assertEqual(
+            set(results), {'include_url', 'post_cards', 'post_cards_cached'}
+        )
+        self.assertGreater(results['post_cards']['per_card_ms'], 0)
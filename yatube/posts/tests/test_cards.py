@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from core.testing import on_commit_callbacks
+
+from .. import cards
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='auth.user', first_name='Имя', last_name='Фамилия'
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='group-1', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='Первая\nвторая', group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def posts(self):
+        return list(Post.objects.feed())
+
+    def test_urls_match_reverse(self):
+        """Ссылки карточки совпадают с reverse()."""
+        html = cards.render(self.posts())
+
+        for url in (
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:post_detail', args=[self.post.pk]),
+            reverse('posts:group_list', args=[self.group.slug]),
+        ):
+            with self.subTest(url=url):
+                self.assertIn(f'href="{url}"', html)
+        self.assertIn('Первая<br>вторая', html)
+
+    def test_group_link_can_be_hidden(self):
+        html = cards.render(self.posts(), show_group=False)
+
+        self.assertNotIn('все записи группы', html)
+
+    def test_cached_cards_skip_rendering(self):
+        """Повторная страница берётся из кэша без запросов к БД."""
+        posts = self.posts()
+        first = cards.render(posts)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(cards.render(posts), first)
+
+    def test_edit_invalidates_card(self):
+        """Правка поста меняет его карточку."""
+        cards.render(self.posts())
+        self.post.text = 'Новый текст'
+        with on_commit_callbacks() as callbacks:
+            self.post.save()
+            # До фиксации транзакции версии не меняются.
+            self.assertNotIn('Новый текст', cards.render(self.posts()))
+
+        self.assertTrue(callbacks)
+        self.assertIn('Новый текст', cards.render(self.posts()))
+
+    def test_followed_badge_is_not_cached(self):
+        """Отметка подписки добавляется поверх кэшированной карточки."""
+        post, = self.posts()
+        cards.render([post])
+        post.author_followed = True
+
+        self.assertIn('Вы подписаны на автора', cards.render([post]))
+        post.author_followed = False
+        self.assertNotIn('Вы подписаны на автора', cards.render([post]))
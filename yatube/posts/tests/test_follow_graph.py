@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.testing import on_commit_callbacks
+
+from .. import follow_graph
+from ..models import Follow, Post
+
+User = get_user_model()
+
+
+class FollowGraphTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.friend = User.objects.create_user(username='friend')
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+
+    def setUp(self):
+        cache.clear()
+
+    def follow(self, user, author):
+        return Follow.objects.create(user=user, author=author)
+
+    def test_is_following_is_cached_and_invalidated(self):
+        """Множество подписок читается из кэша и сбрасывается сигналами."""
+        follow_graph.is_following(self.user.pk, self.author.pk)
+        with self.assertNumQueries(0):
+            self.assertFalse(
+                follow_graph.is_following(self.user.pk, self.author.pk)
+            )
+
+        with on_commit_callbacks():
+            follow = self.follow(self.user, self.author)
+            # До фиксации транзакции кэш не сбрасывается.
+            self.assertFalse(
+                follow_graph.is_following(self.user.pk, self.author.pk)
+            )
+        self.assertTrue(
+            follow_graph.is_following(self.user.pk, self.author.pk)
+        )
+        self.assertEqual(
+            follow_graph.followers(self.author.pk), {self.user.pk}
+        )
+        with on_commit_callbacks():
+            follow.delete()
+        self.assertFalse(
+            follow_graph.is_following(self.user.pk, self.author.pk)
+        )
+        self.assertEqual(follow_graph.followers(self.author.pk), set())
+
+    def test_mutuals(self):
+        """Взаимные подписки — пересечение подписок и подписчиков."""
+        self.follow(self.user, self.friend)
+        self.follow(self.friend, self.user)
+        self.follow(self.user, self.author)
+
+        self.assertEqual(follow_graph.mutuals(self.user.pk), {self.friend.pk})
+
+    def test_suggestions_are_friends_of_friends(self):
+        """Подсказки — авторы, на которых подписаны мои подписки."""
+        self.follow(self.user, self.friend)
+        self.follow(self.friend, self.author)
+        self.follow(self.friend, self.user)
+        self.follow(self.other, self.other_author())
+
+        self.assertEqual(
+            follow_graph.suggestions(self.user.pk, limit=1), [self.author.pk]
+        )
+
+    def test_suggestions_fall_back_to_popular_authors(self):
+        """Без подписок предлагаются авторы с подписчиками."""
+        self.follow(self.other, self.author)
+
+        self.assertEqual(
+            follow_graph.suggestions(self.user.pk), [self.author.pk]
+        )
+
+    def test_annotate_marks_followed_authors(self):
+        """Посты страницы помечаются одним чтением подписок."""
+        self.follow(self.user, self.author)
+        posts = [
+            Post.objects.create(author=self.author, text='Текст'),
+            Post.objects.create(author=self.other, text='Текст'),
+        ]
+        follow_graph.following(self.user.pk)
+
+        with self.assertNumQueries(0):
+            follow_graph.annotate(posts, self.user)
+        self.assertEqual(
+            [post.author_followed for post in posts], [True, False]
+        )
+
+    def test_profile_shows_mutual_follow(self):
+        """Блок подписки в профиле сообщает о взаимной подписке."""
+        self.follow(self.user, self.author)
+        self.follow(self.author, self.user)
+        client = Client()
+        client.force_login(self.user)
+
+        response = client.get(
+            reverse('posts:personal'),
+            {'names': 'follow', 'profile': 'author'},
+        )
+
+        self.assertTrue(response.context['mutual'])
+        self.assertIn(
+            'Вы подписаны друг на друга',
+            response.json()['fragments']['follow'],
+        )
+
+    def other_author(self):
+        return User.objects.create_user(username='other_author')
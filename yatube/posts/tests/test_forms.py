@@ -96,6 +96,30 @@ class PostFormsTest(TestCase):
             ).exists()
         )
 
+    @override_settings(THUMBNAIL_ASYNC=False)
+    def test_post_create_builds_thumbnail(self):
+        """После загрузки картинки строится миниатюра."""
+        uploaded = SimpleUploadedFile(
+            name='thumb.gif',
+            content=(
+                b'\x47\x49\x46\x38\x39\x61\x02\x00'
+                b'\x01\x00\x80\x00\x00\x00\x00\x00'
+                b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+                b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+                b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+                b'\x0A\x00\x3B'
+            ),
+            content_type='image/gif'
+        )
+
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Пост с картинкой', 'image': uploaded},
+        )
+
+        post = Post.objects.get(text='Пост с картинкой')
+        self.assertTrue(post.thumbnail.name.startswith('cache/'))
+
     def test_valid_form_post_edit(self):
         """Тестирование отредактированного поста """
         posts_count = Post.objects.count()
@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import groups
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class GroupsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.quiet = Group.objects.create(
+            title='Тихая', slug='quiet', description='Описание'
+        )
+        cls.busy = Group.objects.create(
+            title='Активная', slug='busy', description='Описание'
+        )
+        Post.objects.create(author=cls.author, text='Пост', group=cls.busy)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_lookup_is_cached(self):
+        """Повторный поиск группы по slug не обращается к БД."""
+        groups.get_by_slug('busy')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(groups.get_by_slug('busy'), self.busy)
+
+    def test_lookup_is_invalidated_on_slug_change(self):
+        """Изменение slug сбрасывает кэш для старого и нового значения."""
+        groups.get_by_slug('quiet')
+        group = Group.objects.get(pk=self.quiet.pk)
+
+        group.slug = 'renamed'
+        group.save()
+
+        with self.assertRaises(Http404):
+            groups.get_by_slug('quiet')
+        self.assertEqual(groups.get_by_slug('renamed').pk, group.pk)
+
+    def test_directory_lists_recent_groups_first(self):
+        """Каталог выводит группы с постами раньше пустых."""
+        response = self.client.get(reverse('posts:group_index'))
+
+        page = list(response.context['page_obj'])
+        self.assertEqual(page, [self.busy, self.quiet])
+        self.assertEqual(page[0].posts_count, 1)
+        self.assertContains(response, 'Постов: 1')
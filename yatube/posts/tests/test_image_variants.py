@@ -0,0 +1,102 @@
+import io
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from .. import image_variants
+from ..models import Post, PostImageVariant
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+User = get_user_model()
+
+
+def make_png(width, height):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), 'red').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+    POST_IMAGE_WIDTHS=(320, 640, 1920),
+    POST_IMAGE_FORMATS=('webp', 'jpeg'),
+)
+class ImageVariantsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_render_widths_and_formats(self):
+        """Копии строятся по ширинам без увеличения исходника."""
+        variants = image_variants.render(
+            make_png(1000, 500), (320, 640, 1920), ('webp', 'jpeg')
+        )
+
+        self.assertEqual(
+            [(width, name) for width, name, _ in variants],
+            [(320, 'webp'), (320, 'jpeg'), (640, 'webp'), (640, 'jpeg')]
+        )
+        with Image.open(io.BytesIO(variants[0][2])) as image:
+            self.assertEqual(image.format, 'WEBP')
+            self.assertEqual(image.size, (320, 113))
+
+    def test_backfill_command(self):
+        """Команда строит копии для старых постов и попадает в srcset."""
+        post = Post.objects.create(
+            author=self.author,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile('red.png', make_png(800, 400)),
+        )
+
+        call_command(
+            'backfill_image_variants', processes=1,
+            stdout=StringIO(), stderr=StringIO(),
+        )
+
+        self.assertEqual(
+            PostImageVariant.objects.filter(post=post).count(), 4
+        )
+        srcset = image_variants.srcset(post, 'webp')
+        self.assertIn('320w', srcset)
+        self.assertIn('.webp 640w', srcset)
+
+    def test_backfill_skips_missing_source(self):
+        """Пропавший файл картинки — ошибка поста, а не всей команды."""
+        lost = Post.objects.create(
+            author=self.author,
+            text='Картинка пропала',
+            image=SimpleUploadedFile('lost.png', make_png(800, 400)),
+        )
+        lost.image.storage.delete(lost.image.name)
+        post = Post.objects.create(
+            author=self.author,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile('red.png', make_png(800, 400)),
+        )
+        stdout, stderr = StringIO(), StringIO()
+
+        call_command(
+            'backfill_image_variants', processes=1,
+            stdout=stdout, stderr=stderr,
+        )
+
+        self.assertIn('Готово: 1, ошибок: 1', stdout.getvalue())
+        self.assertIn(f'Пост {lost.pk}:', stderr.getvalue())
+        self.assertFalse(lost.image_variants.exists())
+        self.assertEqual(
+            PostImageVariant.objects.filter(post=post).count(), 4
+        )
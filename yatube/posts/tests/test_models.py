@@ -1,7 +1,12 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core import db
 
-from ..models import Group, Post
+from ..models import Comment, Follow, Group, Post, UserCounters
 
 User = get_user_model()
 
@@ -48,3 +53,170 @@ class PostModelTest(TestCase):
                     post._meta.get_field(field).verbose_name,
                     expected_name
                 )
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def counters(self, user):
+        return UserCounters.objects.get(user=user)
+
+    def test_post_counter(self):
+        """Счётчик постов растёт при создании и падает при удалении."""
+        post = Post.objects.create(author=self.author, text='Текст')
+        Post.objects.create(author=self.author, text='Ещё текст')
+
+        self.assertEqual(self.counters(self.author).posts_count, 2)
+        post.delete()
+        self.assertEqual(self.counters(self.author).posts_count, 1)
+
+    def test_comment_counter(self):
+        """Счётчик комментариев поста следует за комментариями."""
+        post = Post.objects.create(author=self.author, text='Текст')
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='Комментарий'
+        )
+
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_follow_counters(self):
+        """Подписка меняет счётчики обоих пользователей."""
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+
+        self.assertEqual(self.counters(self.author).followers_count, 1)
+        self.assertEqual(self.counters(self.reader).following_count, 1)
+        follow.delete()
+        self.assertEqual(self.counters(self.author).followers_count, 0)
+        self.assertEqual(self.counters(self.reader).following_count, 0)
+
+    def test_drifted_counters_do_not_break_deletes(self):
+        """Удаление при обнулённых счётчиках оставляет их нулями."""
+        post = Post.objects.create(author=self.author, text='Текст')
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='Комментарий'
+        )
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        UserCounters.objects.update(
+            posts_count=0, followers_count=0, following_count=0
+        )
+        Post.objects.filter(pk=post.pk).update(comments_count=0)
+
+        comment.delete()
+        follow.delete()
+        post.delete()
+
+        self.assertEqual(self.counters(self.author).posts_count, 0)
+        self.assertEqual(self.counters(self.author).followers_count, 0)
+        self.assertEqual(self.counters(self.reader).following_count, 0)
+
+    def test_recount_command_repairs_drift(self):
+        """recount_counters исправляет разошедшиеся счётчики."""
+        post = Post.objects.create(author=self.author, text='Текст')
+        Comment.objects.create(post=post, author=self.reader, text='Текст')
+        UserCounters.objects.filter(user=self.author).update(posts_count=7)
+        Post.objects.filter(pk=post.pk).update(comments_count=0)
+
+        call_command('recount_counters', stdout=StringIO())
+
+        post.refresh_from_db()
+        self.assertEqual(self.counters(self.author).posts_count, 1)
+        self.assertEqual(post.comments_count, 1)
+
+
+class GroupCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.first = Group.objects.create(
+            title='Первая', slug='first', description='Описание'
+        )
+        cls.second = Group.objects.create(
+            title='Вторая', slug='second', description='Описание'
+        )
+
+    def stats(self, group):
+        group.refresh_from_db()
+        return group.posts_count, group.last_activity
+
+    def test_counters_follow_posts(self):
+        """Число постов и последний пост группы следуют за постами."""
+        old = Post.objects.create(
+            author=self.author, text='Старый', group=self.first
+        )
+        new = Post.objects.create(
+            author=self.author, text='Новый', group=self.first
+        )
+
+        self.assertEqual(self.stats(self.first), (2, new.pub_date))
+        new.delete()
+        self.assertEqual(self.stats(self.first), (1, old.pub_date))
+        old.delete()
+        self.assertEqual(self.stats(self.first), (0, None))
+
+    def test_group_change_moves_post(self):
+        """Смена группы переносит пост между счётчиками один раз."""
+        post = Post.objects.create(
+            author=self.author, text='Текст', group=self.first
+        )
+        post = Post.objects.get(pk=post.pk)
+
+        post.group = self.second
+        post.save()
+        post.save()
+
+        self.assertEqual(self.stats(self.first), (0, None))
+        self.assertEqual(self.stats(self.second), (1, post.pub_date))
+
+    def test_drifted_group_counter_does_not_break_delete(self):
+        """Удаление поста при обнулённом счётчике группы."""
+        post = Post.objects.create(
+            author=self.author, text='Текст', group=self.first
+        )
+        Group.objects.filter(pk=self.first.pk).update(posts_count=0)
+
+        post.delete()
+
+        self.assertEqual(self.stats(self.first), (0, None))
+
+    def test_recount_command_repairs_group_drift(self):
+        """recount_counters исправляет счётчики групп."""
+        post = Post.objects.create(
+            author=self.author, text='Текст', group=self.first
+        )
+        Group.objects.filter(pk=self.first.pk).update(
+            posts_count=5, last_activity=None
+        )
+
+        call_command('recount_counters', stdout=StringIO())
+
+        self.assertEqual(self.stats(self.first), (1, post.pub_date))
+
+
+@override_settings(
+    DATABASE_ROUTERS=['core.db.PrimaryReplicaRouter'],
+    DATABASE_REPLICAS=['replica_1'],
+    REPLICA_APPS=('posts',),
+)
+class FollowWriteRoutingTest(TestCase):
+    def test_follow_and_unfollow_write_to_primary(self):
+        """Подписка пишет в default, хотя чтения Follow идут на реплику."""
+        reader = User.objects.create_user(username='reader')
+        User.objects.create_user(username='author')
+        db.unpin()
+        self.assertEqual(Follow.objects.all().db, 'replica_1')
+
+        follow = Follow.objects.follow(reader.pk, 'author')
+
+        self.assertIsNotNone(follow)
+        self.assertTrue(db._local.pinned)
+        self.assertIsNotNone(Follow.objects.unfollow(reader.pk, 'author'))
+        self.assertFalse(Follow.objects.using('default').exists())
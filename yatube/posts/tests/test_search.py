@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post
+from ..search import LikeBackend, SQLiteFTSBackend
+
+User = get_user_model()
+
+
+class SearchBackendsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Котики',
+            slug='cats',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='Полосатый кот спит', group=cls.group
+        )
+        cls.other = Post.objects.create(
+            author=cls.author, text='Рыжий пёс лает'
+        )
+
+    def search(self, query, backend=None):
+        return list((backend or SQLiteFTSBackend()).search(query)[:10])
+
+    def test_new_posts_are_indexed(self):
+        """Посты попадают в индекс при сохранении."""
+        self.assertEqual(self.search('полосат'), [self.post])
+        self.assertEqual(self.search('пёс'), [self.other])
+
+    def test_group_title_is_searchable(self):
+        """Поиск учитывает название группы и его изменения."""
+        self.assertEqual(self.search('котики'), [self.post])
+        self.group.title = 'Кошки'
+        self.group.save()
+
+        self.assertEqual(self.search('котики'), [])
+        self.assertEqual(self.search('кошки'), [self.post])
+
+    def test_edit_and_delete_update_index(self):
+        """Правка и удаление поста обновляют индекс."""
+        post = Post.objects.create(author=self.author, text='Черновик')
+        post.text = 'Чистовик'
+        post.save()
+
+        self.assertEqual(self.search('черновик'), [])
+        self.assertEqual(self.search('чистовик'), [post])
+        post.delete()
+        self.assertEqual(self.search('чистовик'), [])
+
+    def test_fts_syntax_in_query_is_ignored(self):
+        """Спецсимволы FTS5 в запросе не приводят к ошибке."""
+        self.assertEqual(self.search('"кот" (спит* -'), [self.post])
+
+    def test_like_backend(self):
+        """Запасной бэкенд LIKE находит те же посты."""
+        self.assertEqual(self.search('кот', LikeBackend()), [self.post])
+
+
+@override_settings(POST_PER_PAGE=1)
+class SearchViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        for number in range(2):
+            Post.objects.create(author=cls.author, text=f'Поиск {number}')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_search_page_is_paginated(self):
+        """Результаты поиска разбиты на страницы с сохранением запроса."""
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': 'поиск'}
+        )
+
+        self.assertEqual(response.context['page_obj'].paginator.count, 2)
+        self.assertContains(response, '?q=%D0%BF%D0%BE%D0%B8%D1%81%D0%BA'
+                                      '&amp;page=2')
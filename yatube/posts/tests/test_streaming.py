@@ -0,0 +1,138 @@
+import csv
+import json
+from datetime import timedelta
+from io import StringIO
+from xml.etree import ElementTree
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Group, Post
+
+User = get_user_model()
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+
+def content(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@override_settings(STREAM_BATCH_SIZE=2, FEED_ITEMS=4)
+class StreamingViewsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='auth', first_name='Имя', last_name='Фамилия'
+        )
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug'
+        )
+        now = timezone.now()
+        cls.posts = []
+        for number in range(5):
+            post = Post.objects.create(
+                author=cls.author, text=f'Пост {number}', group=cls.group
+            )
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=now - timedelta(hours=number)
+            )
+            cls.posts.append(post)
+        Post.objects.create(author=cls.other, text='Чужой пост')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_profile_archive_streams_all_posts(self):
+        """Архив выводит все посты автора пачками, без пагинации."""
+        response = self.client.get(
+            reverse('posts:profile_archive', kwargs={'username': 'auth'})
+        )
+        html = content(response)
+
+        self.assertTrue(response.streaming)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertEqual(html.count('<article'), 5)
+        self.assertEqual(html.count('<hr>'), 4)
+        self.assertNotIn('Чужой пост', html)
+        self.assertLess(html.index('Архив записей'), html.index('Пост 0'))
+        self.assertLess(html.index('Пост 0'), html.index('Пост 4'))
+        self.assertLess(html.index('Пост 4'), html.index('</html>'))
+
+    def test_rss_feed(self):
+        response = self.client.get(reverse('posts:feed', args=['rss']))
+        channel = ElementTree.fromstring(content(response)).find('channel')
+        items = channel.findall('item')
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            response['Content-Type'], 'application/rss+xml; charset=utf-8'
+        )
+        self.assertEqual(len(items), 4)
+        self.assertEqual(items[0].find('title').text, 'Чужой пост')
+        self.assertEqual(
+            items[1].find('link').text,
+            'http://testserver' + reverse(
+                'posts:post_detail', args=[self.posts[0].pk]
+            ),
+        )
+        self.assertEqual(items[1].find('category').text, 'Тестовая группа')
+        self.assertIsNotNone(channel.find('lastBuildDate'))
+
+    def test_profile_atom_feed(self):
+        response = self.client.get(
+            reverse('posts:profile_feed', args=['auth', 'atom'])
+        )
+        feed = ElementTree.fromstring(content(response))
+        entries = feed.findall(f'{ATOM}entry')
+
+        self.assertIn('Имя Фамилия', feed.find(f'{ATOM}title').text)
+        self.assertEqual(
+            [entry.find(f'{ATOM}title').text for entry in entries],
+            ['Пост 0', 'Пост 1', 'Пост 2', 'Пост 3'],
+        )
+        self.assertEqual(
+            feed.find(f'{ATOM}updated').text,
+            entries[0].find(f'{ATOM}updated').text,
+        )
+
+    def test_empty_and_unknown_feeds(self):
+        User.objects.create_user(username='silent')
+
+        empty = self.client.get(
+            reverse('posts:profile_feed', args=['silent', 'rss'])
+        )
+        unknown = self.client.get(reverse('posts:feed', args=['json']))
+
+        channel = ElementTree.fromstring(content(empty)).find('channel')
+        self.assertEqual(channel.findall('item'), [])
+        self.assertEqual(unknown.status_code, 404)
+
+    def test_export_for_staff_only(self):
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        staff_client = Client()
+        staff_client.force_login(staff)
+        reader_client = Client()
+        reader_client.force_login(self.other)
+        address = reverse('posts:export', args=['posts'])
+
+        response = staff_client.get(address, {'format': 'csv'})
+        rows = list(csv.DictReader(StringIO(content(response))))
+        jsonl = content(staff_client.get(address)).splitlines()
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename="posts.csv"',
+        )
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]['author'], 'auth')
+        self.assertEqual(json.loads(jsonl[-1])['text'], 'Чужой пост')
+        self.assertEqual(reader_client.get(address).status_code, 404)
+        self.assertEqual(
+            staff_client.get(address, {'format': 'xml'}).status_code, 404
+        )
@@ -0,0 +1,126 @@
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import timeline
+from ..models import Follow, Post, TimelineEntry, UserCounters
+
+User = get_user_model()
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        """Новый пост попадает в ленты подписчиков при публикации."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Текст')
+
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertIn(post, timeline.feed(self.reader))
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        """Подписка добавляет старые посты, отписка их убирает."""
+        post = Post.objects.create(author=self.author, text='Текст')
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+
+        self.assertIn(post, timeline.feed(self.reader))
+        follow.delete()
+        self.assertFalse(TimelineEntry.objects.filter(user=self.reader))
+        self.assertNotIn(post, timeline.feed(self.reader))
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_author_is_read_on_request(self):
+        """Посты популярных авторов не раскладываются, но видны в ленте."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        TimelineEntry.objects.all().delete()
+        post = Post.objects.create(author=self.author, text='Текст')
+
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertIn(post, timeline.feed(self.reader))
+
+    def test_rebuild_restores_entries(self):
+        """rebuild восстанавливает ленту по подпискам."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Текст')
+        TimelineEntry.objects.all().delete()
+
+        timeline.rebuild()
+
+        self.assertEqual(list(timeline.feed(self.reader)), [post])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_author_is_not_materialized(self):
+        """Подписка и пересборка не раскладывают посты популярных авторов."""
+        post = Post.objects.create(author=self.author, text='Текст')
+        Follow.objects.create(user=self.reader, author=self.author)
+        timeline.rebuild()
+
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertIn(post, timeline.feed(self.reader))
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_author_below_limit_keeps_posts_in_feed(self):
+        """Отписка, вернувшая автора под лимит, не прячет его посты."""
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=self.reader, author=self.author)
+        first = Post.objects.create(author=self.author, text='x')
+        follow = Follow.objects.create(user=other, author=self.author)
+        second = Post.objects.create(author=self.author, text='y')
+
+        follow.delete()
+
+        self.assertEqual(list(timeline.feed(self.reader)), [second, first])
+        timeline.rebuild()
+        self.assertFalse(
+            UserCounters.objects.get(user=self.author).fanout_on_read
+        )
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 2
+        )
+
+    @override_settings(POST_PER_PAGE=2)
+    def test_page_is_read_by_timeline_index(self):
+        """Страница ленты читается по индексу записей, без сортировки."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        posts = [
+            Post.objects.create(author=self.author, text=f'Пост {number}')
+            for number in range(3)
+        ]
+        # Одинаковое время: порядок задаёт второе поле ключа.
+        Post.objects.update(pub_date=posts[0].pub_date)
+        timeline.rebuild()
+        client = Client()
+        client.force_login(self.reader)
+
+        first = client.get(reverse('posts:follow_index')).context['page_obj']
+        second = client.get(
+            reverse('posts:follow_index'), {'cursor': first.next_cursor}
+        ).context['page_obj']
+
+        self.assertEqual(list(first), [posts[2], posts[1]])
+        self.assertEqual(list(second), [posts[0]])
+
+    @skipUnless(connection.vendor == 'sqlite', 'план запроса SQLite')
+    def test_entries_query_plan(self):
+        queryset = timeline.entries(self.reader).filter(
+            pub_date__lt=timezone.now() - timedelta(days=1)
+        )[:10]
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+
+        self.assertIn('timeline_user_date_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
@@ -0,0 +1,150 @@
+import json
+import os
+from io import StringIO
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from .. import timeline
+from ..models import (
+    Comment, Follow, Group, Post, TimelineEntry, UserCounters,
+)
+from ..transfer import DATASETS, load, rebuild_derived
+
+User = get_user_model()
+PUB_DATE = datetime(2020, 5, 17, 12, 30, tzinfo=timezone.utc)
+
+
+class TransferTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.author = User.objects.create_user(username='auth')
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        self.post = Post.objects.create(
+            author=self.author, text='Старый пост', group=self.group
+        )
+        Post.objects.filter(pk=self.post.pk).update(pub_date=PUB_DATE)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий'
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_round_trip_preserves_dates_and_relations(self):
+        """Экспорт и импорт сохраняют даты, авторов, группы и счётчики."""
+        datasets = (
+            ('groups', 'jsonl'), ('posts', 'csv'),
+            ('comments', 'jsonl'), ('follows', 'csv'),
+        )
+        for name, fmt in datasets:
+            call_command(
+                'export_data', name, self.path(f'{name}.{fmt}'),
+                stderr=StringIO(),
+            )
+        Group.objects.all().delete()
+        User.objects.all().delete()
+
+        for name, fmt in datasets:
+            call_command(
+                'import_data', name, self.path(f'{name}.{fmt}'),
+                stdout=StringIO(),
+            )
+
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.pub_date, PUB_DATE)
+        self.assertEqual(post.author.username, 'auth')
+        self.assertEqual(post.group.slug, 'test-slug')
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(post.comments.get().author.username, 'reader')
+        self.assertTrue(Follow.objects.filter(
+            user__username='reader', author__username='auth'
+        ).exists())
+        self.assertEqual(
+            UserCounters.objects.get(user=post.author).followers_count, 1
+        )
+
+    def test_import_resumes_from_checkpoint(self):
+        """Импорт продолжается с позиции из файла точки продолжения."""
+        source = self.path('posts.jsonl')
+        with open(source, 'w') as stream:
+            for number in range(5):
+                stream.write(json.dumps(
+                    {'author': 'auth', 'text': f'Пост {number}'}
+                ) + '\n')
+        checkpoint = self.path('posts.checkpoint')
+        with open(checkpoint, 'w') as stream:
+            json.dump(
+                {'input': os.path.abspath(source), 'position': 3}, stream
+            )
+
+        call_command(
+            'import_data', 'posts', source, '--checkpoint', checkpoint,
+            '--chunk-size', '1', stdout=StringIO(),
+        )
+
+        self.assertEqual(
+            list(Post.objects.filter(text__startswith='Пост ').order_by(
+                'text').values_list('text', flat=True)),
+            ['Пост 3', 'Пост 4'],
+        )
+        self.assertFalse(os.path.exists(checkpoint))
+
+    def test_load_skips_dangling_rows(self):
+        """Комментарии к несуществующим постам пропускаются."""
+        records = [
+            {'post': self.post.pk, 'author': 'reader', 'text': 'Новый'},
+            {'post': 0, 'author': 'reader', 'text': 'Потерянный'},
+        ]
+        positions = []
+
+        stats = load(
+            DATASETS['comments'], iter(records), batch_size=1,
+            on_chunk=positions.append,
+        )
+
+        self.assertEqual(stats, {'imported': 1, 'skipped': 1})
+        self.assertEqual(positions, [2])
+        self.assertEqual(self.post.comments.count(), 2)
+
+    def test_load_counts_existing_rows_as_skipped(self):
+        """Уже существующие строки и повторы не считаются загруженными."""
+        records = [
+            {'user': 'reader', 'author': 'auth'},
+            {'user': 'auth', 'author': 'reader'},
+            {'user': 'auth', 'author': 'reader'},
+            {'user': 'auth', 'author': 'auth'},
+        ]
+
+        stats = load(DATASETS['follows'], iter(records))
+        again = load(DATASETS['follows'], iter(records))
+
+        self.assertEqual(stats, {'imported': 1, 'skipped': 3})
+        self.assertEqual(again, {'imported': 0, 'skipped': 4})
+        self.assertEqual(Follow.objects.count(), 2)
+
+    def test_failed_rebuild_keeps_timelines(self):
+        """Сбой пересборки не оставляет ленты пустыми."""
+        entries = TimelineEntry.objects.count()
+
+        with mock.patch.object(
+                timeline, '_store', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                rebuild_derived()
+
+        self.assertGreater(entries, 0)
+        self.assertEqual(TimelineEntry.objects.count(), entries)
@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import trending
+from ..models import Comment, Post, TrendingScore
+from ..utils import auto_now_add_disabled
+
+User = get_user_model()
+
+HOUR = 60 * 60
+
+
+@override_settings(TRENDING_HALF_LIFE=HOUR, TRENDING_MIN_SCORE=0.1)
+class TrendingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.hot = Post.objects.create(author=cls.user, text='Обсуждают')
+        cls.warm = Post.objects.create(author=cls.user, text='Обсуждали')
+        cls.quiet = Post.objects.create(author=cls.user, text='Тишина')
+
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+
+    def comment(self, post, hours_ago):
+        with auto_now_add_disabled(Comment, 'created'):
+            Comment.objects.create(
+                post=post, author=self.user, text='Комментарий',
+                created=self.now - timedelta(hours=hours_ago),
+            )
+
+    def scores(self):
+        return dict(TrendingScore.objects.values_list('post_id', 'score'))
+
+    def test_recent_comments_weigh_more(self):
+        """Свежий комментарий весит больше старых, очень старые не в счёт."""
+        self.comment(self.hot, 0)
+        self.comment(self.warm, 1)
+        self.comment(self.warm, 2)
+        self.comment(self.quiet, 10)
+
+        trending.compute(now=self.now)
+
+        scores = self.scores()
+        self.assertAlmostEqual(scores[self.hot.pk], 1.0)
+        self.assertAlmostEqual(scores[self.warm.pk], 0.75)
+        self.assertNotIn(self.quiet.pk, scores)
+        self.assertEqual(
+            list(trending.feed()), [self.hot, self.warm]
+        )
+
+    def test_incremental_matches_rebuild(self):
+        """Инкрементальный пересчёт даёт те же рейтинги, что и полный."""
+        self.comment(self.hot, 3)
+        self.comment(self.warm, 2)
+        trending.compute(now=self.now - timedelta(hours=1))
+        self.comment(self.hot, 0.5)
+        self.comment(self.quiet, 0)
+
+        result = trending.compute(now=self.now)
+        incremental = self.scores()
+        trending.compute(now=self.now, rebuild=True)
+
+        self.assertTrue(result['incremental'])
+        self.assertEqual(result['comments'], 2)
+        self.assertEqual(incremental.keys(), self.scores().keys())
+        for post_id, score in self.scores().items():
+            self.assertAlmostEqual(incremental[post_id], score)
+
+    def test_late_commits_are_counted_once(self):
+        """Комментарий, зафиксированный после пересчёта, не теряется."""
+        last = self.now - timedelta(hours=1)
+        self.comment(self.hot, 1.02)
+        trending.compute(now=last)
+        # created раньше прошлого пересчёта, но виден только после него.
+        self.comment(self.warm, 1.01)
+
+        result = trending.compute(now=self.now)
+        incremental = self.scores()
+        trending.compute(now=self.now, rebuild=True)
+
+        self.assertEqual(result['comments'], 1)
+        self.assertEqual(incremental.keys(), self.scores().keys())
+        for post_id, score in self.scores().items():
+            self.assertAlmostEqual(incremental[post_id], score)
+
+    def test_decayed_posts_are_pruned(self):
+        """Посты, которые давно не обсуждают, удаляются из рейтинга."""
+        self.comment(self.hot, 0)
+        trending.compute(now=self.now)
+
+        result = trending.compute(now=self.now + timedelta(hours=5))
+
+        self.assertEqual(result['pruned'], 1)
+        self.assertFalse(TrendingScore.objects.exists())
+
+    def test_page_lists_ranked_posts(self):
+        """Страница «Популярное» выводит посты по рейтингу."""
+        self.comment(self.warm, 0)
+        self.comment(self.hot, 0)
+        self.comment(self.hot, 0)
+        trending.compute()
+
+        response = self.client.get(reverse('posts:trending'))
+
+        self.assertEqual(
+            list(response.context['page_obj']), [self.hot, self.warm]
+        )
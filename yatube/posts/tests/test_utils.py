@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post
+from ..utils import KeysetPaginator
+
+User = get_user_model()
+
+
+class KeysetPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        for number in range(7):
+            Post.objects.create(author=cls.author, text=f'Текст {number}')
+        cls.expected = list(Post.objects.order_by('-pub_date', '-pk'))
+
+    def setUp(self):
+        self.paginator = KeysetPaginator(Post.objects.all(), 3)
+
+    def test_walk_forward_and_back(self):
+        """Курсоры next/prev обходят ленту без пропусков и повторов."""
+        first = self.paginator.get_page()
+        second = self.paginator.get_page(first.next_cursor)
+        third = self.paginator.get_page(second.next_cursor)
+
+        self.assertEqual(list(first), self.expected[:3])
+        self.assertEqual(list(second), self.expected[3:6])
+        self.assertEqual(list(third), self.expected[6:])
+        self.assertFalse(first.has_previous())
+        self.assertFalse(third.has_next())
+        self.assertEqual(
+            list(self.paginator.get_page(third.previous_cursor)),
+            self.expected[3:6]
+        )
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Повреждённый курсор отдаёт первую страницу."""
+        page = self.paginator.get_page('не-курсор')
+
+        self.assertEqual(list(page), self.expected[:3])
+
+    def test_no_count_query(self):
+        """Страница выбирается одним запросом, без COUNT(*)."""
+        page = self.paginator.get_page()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(len(page), 3)
+            self.assertTrue(page.has_next())
+
+
+@override_settings(PAGINATION_MODE='cursor', POST_PER_PAGE=3)
+class CursorFeedViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+        for number in range(5):
+            Post.objects.create(author=cls.author, text=f'Текст {number}')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_index_renders_cursor_links(self):
+        """Лента отдаёт ссылку на следующую страницу по курсору."""
+        response = self.client.get(reverse('posts:index'))
+        page = response.context['page_obj']
+
+        self.assertContains(response, f'?cursor={page.next_cursor}')
+        response = self.client.get(
+            reverse('posts:index'), {'cursor': page.next_cursor}
+        )
+        self.assertEqual(len(response.context['page_obj']), 2)
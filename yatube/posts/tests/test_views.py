@@ -7,10 +7,14 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from posts.models import Comment, Follow, Group, Post
+from core.testing import on_commit_callbacks
+from posts import thumbnails, trending
+from posts.models import Comment, Follow, Group, Post, UserCounters
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
@@ -84,28 +88,66 @@ class PostViewsTest(TestCase):
         cache.clear()
 
     def test_cache(self):
-        """Проверяем работу кэша"""
+        """Лента кэшируется и обновляется при изменении поста."""
         post = Post.objects.create(
             author=self.user,
-            text='Тестовый пост',
+            text='Пост для кэша',
             group=self.group,
             image='posts/small.gif',
         )
-        content_before_delete = self.authorized_client.get(
+        content_before_update = self.authorized_client.get(
             reverse(self.endpoint_posts_index)).content
-        post.delete()
-        content_after_delete = self.authorized_client.get(
+        # update() не вызывает сигналы — страница отдаётся из кэша.
+        Post.objects.filter(pk=post.pk).update(text='Текст без сигналов')
+        content_after_update = self.authorized_client.get(
             reverse(self.endpoint_posts_index)).content
-        cache.clear()
-        content_after_cache_clear = self.authorized_client.get(
+        with on_commit_callbacks():
+            post.delete()
+        content_after_delete = self.authorized_client.get(
             reverse(self.endpoint_posts_index)).content
 
-        self.assertEqual(
-            content_before_delete, content_after_delete
+        self.assertEqual(content_before_update, content_after_update)
+        self.assertIn('Пост для кэша'.encode(), content_before_update)
+        self.assertNotIn('Пост для кэша'.encode(), content_after_delete)
+        self.assertNotIn(
+            'Текст без сигналов'.encode(), content_after_delete
+        )
+
+    def test_group_change_invalidates_both_groups(self):
+        """Перенос поста в другую группу обновляет обе ленты групп."""
+        old_group_url = reverse(self.endpoint_posts_group_list,
+                                kwargs={'slug': self.group.slug})
+        new_group_url = reverse(self.endpoint_posts_group_list,
+                                kwargs={'slug': self.new_group.slug})
+        self.guest_client.get(old_group_url)
+        self.guest_client.get(new_group_url)
+
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = self.new_group
+        with on_commit_callbacks():
+            post.save()
+
+        self.assertNotContains(
+            self.guest_client.get(old_group_url), self.post.text
         )
-        self.assertNotEqual(
-            content_before_delete, content_after_cache_clear
+        self.assertContains(
+            self.guest_client.get(new_group_url), self.post.text
+        )
+
+    def test_thumbnail_placeholder_until_generated(self):
+        """Пока миниатюра не готова, вместо неё выводится заглушка."""
+        address = reverse(self.endpoint_posts_index)
+
+        self.assertContains(
+            self.guest_client.get(address), 'thumbnail-placeholder.svg'
         )
+        thumbnails.generate(self.post.pk)
+        post = Post.objects.get(pk=self.post.pk)
+        response = self.guest_client.get(address)
+
+        self.assertTrue(post.thumbnail)
+        self.assertContains(response, post.thumbnail.url)
+        self.assertNotContains(response, 'thumbnail-placeholder.svg')
 
     def test_pages_uses_correct_template(self):
         """URL-адрес использует соответствующий шаблон."""
@@ -399,7 +441,47 @@ class FollowCommentsTeste(TestCase):
         )
         comments = response.context.get('comments')
 
-        self.assertIn(comment.pk, comments.values_list('id', flat=True))
+        self.assertIn(comment, comments)
+
+    def test_post_detail_shows_only_own_comments(self):
+        """На странице поста только его комментарии."""
+        other_post = Post.objects.create(author=self.user, text='Другой')
+        foreign = Comment.objects.create(
+            text='Чужой', post=other_post, author=self.user_2
+        )
+        own = Comment.objects.create(
+            text='Свой', post=self.post, author=self.user_2
+        )
+
+        response = self.guest_client.get(
+            reverse(self.endpoint_posts_post_detail,
+                    kwargs={'post_id': self.post.id})
+        )
+        comments = response.context.get('comments')
+
+        self.assertIn(own, comments)
+        self.assertNotIn(foreign, comments)
+
+    @override_settings(COMMENTS_PER_PAGE=2)
+    def test_comments_are_paginated(self):
+        """Комментарии отдаются порциями по COMMENTS_PER_PAGE."""
+        for number in range(3):
+            Comment.objects.create(
+                text=f'Комментарий {number}',
+                post=self.post,
+                author=self.user_2,
+            )
+        address = reverse(self.endpoint_posts_post_detail,
+                          kwargs={'post_id': self.post.id})
+
+        first = self.guest_client.get(address).context['comments']
+        second = self.guest_client.get(
+            address, {'comments': first.next_cursor}
+        ).context['comments']
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse(second.has_next())
 
     def test_comment_only_authorized_user(self):
         """Оставить комент может только авторизованный user"""
@@ -412,7 +494,7 @@ class FollowCommentsTeste(TestCase):
 
     def test_follow_only_authorized_user(self):
         """Подписаться может только авторизованный пользователь"""
-        self.authorized_client.get(
+        self.authorized_client.post(
             reverse(self.endpoint_posts_profile_follow,
                     kwargs={'username': self.user}),
             follow=True
@@ -432,7 +514,7 @@ class FollowCommentsTeste(TestCase):
         Follow.objects.create(user=self.user_2,
                               author=self.user)
 
-        response = self.authorized_client.get(
+        response = self.authorized_client.post(
             reverse(self.endpoint_posts_profile_unfollow,
                     kwargs={'username': self.user}),
             follow=True
@@ -441,6 +523,101 @@ class FollowCommentsTeste(TestCase):
         self.assertEqual(response.status_code, HTTPStatus.OK)
         self.assertEqual(Follow.objects.count(), followers_count)
 
+    def test_follow_and_unfollow_are_idempotent(self):
+        """Повторные подписка и отписка ничего не меняют"""
+        follow = reverse(self.endpoint_posts_profile_follow,
+                         kwargs={'username': self.user})
+        unfollow = reverse(self.endpoint_posts_profile_unfollow,
+                           kwargs={'username': self.user})
+        ajax = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+        responses = [
+            self.authorized_client.post(url, **ajax).json()
+            for url in (follow, follow)
+        ]
+        self.assertEqual(
+            UserCounters.objects.get(user=self.user).followers_count, 1
+        )
+        responses += [
+            self.authorized_client.post(url, **ajax).json()
+            for url in (unfollow, unfollow)
+        ]
+
+        self.assertEqual(
+            [(data['following'], data['changed']) for data in responses],
+            [(True, True), (True, False), (False, True), (False, False)],
+        )
+        self.assertFalse(Follow.objects.exists())
+
+    def test_follow_is_single_statement(self):
+        """Подписка выполняется одним INSERT без предварительных SELECT"""
+        with CaptureQueriesContext(connection) as queries:
+            Follow.objects.follow(self.user_2.pk, self.user.username)
+        statements = [
+            query['sql'] for query in queries.captured_queries
+            if 'SAVEPOINT' not in query['sql']
+        ]
+
+        self.assertTrue(statements[0].startswith('INSERT'))
+        self.assertTrue(Follow.objects.filter(
+            user=self.user_2, author=self.user).exists())
+
+    def test_follow_self_or_missing_author(self):
+        """На себя подписаться нельзя, на несуществующего автора — 404"""
+        self_follow = self.authorized_client.post(
+            reverse(self.endpoint_posts_profile_follow,
+                    kwargs={'username': self.user_2}),
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        missing = self.authorized_client.post(
+            reverse(self.endpoint_posts_profile_follow,
+                    kwargs={'username': 'nobody'})
+        )
+
+        self.assertFalse(self_follow.json()['following'])
+        self.assertEqual(missing.status_code, HTTPStatus.NOT_FOUND)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_write_endpoints_reject_get(self):
+        """Подписка, отписка и комментарии принимают только POST"""
+        urls = (
+            reverse(self.endpoint_posts_profile_follow,
+                    kwargs={'username': self.user}),
+            reverse(self.endpoint_posts_profile_unfollow,
+                    kwargs={'username': self.user}),
+            reverse(self.endpoint_posts_add_comment,
+                    kwargs={'post_id': self.post.id}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertEqual(
+                    response.status_code, HTTPStatus.METHOD_NOT_ALLOWED
+                )
+
+    def test_ajax_comment_returns_rendered_comment(self):
+        """AJAX-комментарий возвращает разметку и новое число комментариев"""
+        response = self.authorized_client.post(
+            reverse(self.endpoint_posts_add_comment,
+                    kwargs={'post_id': self.post.id}),
+            {'text': 'Комментарий через AJAX'},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        invalid = self.authorized_client.post(
+            reverse(self.endpoint_posts_add_comment,
+                    kwargs={'post_id': self.post.id}),
+            {'text': ''},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertIn('Комментарий через AJAX', response.json()['html'])
+        self.assertEqual(response.json()['comments_count'], 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+        self.assertEqual(invalid.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn('text', invalid.json()['errors'])
+
     def test__new_post_appears_only_to_his_subscribers(self):
         """Новая запись появляется в ленте только у его подписчиков"""
         post = Post.objects.create(
@@ -470,3 +647,208 @@ class FollowCommentsTeste(TestCase):
 
         response_first_objects = response.context['page_obj']
         self.assertNotIn(post, response_first_objects)
+
+
+class FeedQueryBudgetTest(TestCase):
+    """Число запросов ленты не зависит от размера страницы."""
+
+    PAGE_SIZES = (2, 5, 10)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for number in range(12):
+            author = User.objects.create_user(
+                username=f'author_{number}',
+                first_name='Имя',
+                last_name=f'Фамилия {number}',
+            )
+            Follow.objects.create(user=cls.reader, author=author)
+            Post.objects.create(
+                author=author, text=f'Текст {number}', group=cls.group
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def assertQueryBudget(self, client, address):
+        """Одинаковое число запросов для всех PAGE_SIZES."""
+        counts = set()
+        for page_size in self.PAGE_SIZES:
+            with self.subTest(address=address, page_size=page_size):
+                with override_settings(POST_PER_PAGE=page_size):
+                    cache.clear()
+                    with CaptureQueriesContext(connection) as queries:
+                        response = client.get(address)
+                self.assertEqual(len(response.context['page_obj']),
+                                 page_size)
+                counts.add(len(queries))
+        self.assertEqual(len(counts), 1, f'{address}: {sorted(counts)}')
+
+    def test_guest_feeds_query_budget(self):
+        """Ленты для гостя не делают запросов на каждый пост."""
+        pages = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+        )
+        for address in pages:
+            self.assertQueryBudget(self.guest_client, address)
+
+    def test_follow_feed_query_budget(self):
+        """Лента подписок не делает запросов на каждый пост."""
+        self.assertQueryBudget(
+            self.authorized_client, reverse('posts:follow_index')
+        )
+
+    @override_settings(QUERYWATCH_ENABLED=True, QUERYWATCH_RAISE=True)
+    def test_views_within_configured_budgets(self):
+        """Страницы укладываются в settings.QUERY_BUDGETS."""
+        post = Post.objects.first()
+        for number in range(5):
+            Comment.objects.create(
+                post=post, author=self.reader, text=f'Комментарий {number}'
+            )
+        pages = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'author_0'}),
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+            reverse('posts:search') + '?q=Текст',
+            reverse('posts:trending'),
+            reverse('posts:group_index'),
+            reverse('posts:personal') + (
+                '?names=nav,follow,post_actions,comment_form'
+                f'&profile=author_0&post={post.pk}&authors=1,2,3'
+            ),
+        )
+        trending.compute()
+        clients = (self.guest_client, self.authorized_client)
+        for client in clients:
+            for address in pages:
+                with self.subTest(address=address):
+                    cache.clear()
+                    client.get(address)
+        cache.clear()
+        self.authorized_client.get(reverse('posts:follow_index'))
+
+
+class SharedPagesTest(TestCase):
+    """Общие страницы кэшируются прокси, личное отдаёт posts:personal."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='Тестовый пост', group=cls.group
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.pages = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+
+    def personal(self, client, **params):
+        return client.get(reverse('posts:personal'), params)
+
+    @override_settings(SHARED_PAGE_MAX_AGE=120)
+    def test_guest_pages_are_public(self):
+        """Гостю страницы отдаются без cookie и с Cache-Control: public."""
+        for address in self.pages:
+            with self.subTest(address=address):
+                response = self.guest_client.get(address)
+
+                self.assertEqual(
+                    response['Cache-Control'], 'public, max-age=120'
+                )
+                self.assertNotIn('Cookie', response.get('Vary', ''))
+                self.assertFalse(response.cookies)
+                self.assertContains(response, 'data-personal="nav"')
+
+    def test_pages_are_same_for_logged_in_user(self):
+        """Вошедший получает ту же разметку, но с private-кэшем."""
+        for address in self.pages:
+            with self.subTest(address=address):
+                guest = self.guest_client.get(address)
+                response = self.reader_client.get(address)
+
+                self.assertIn('private', response['Cache-Control'])
+                self.assertNotIn('Cookie', response.get('Vary', ''))
+                self.assertNotContains(response, 'Пользователь: reader')
+                self.assertEqual(response.content, guest.content)
+
+    def test_personal_fragments(self):
+        """posts:personal отдаёт блоки вошедшего пользователя."""
+        response = self.personal(
+            self.reader_client,
+            names='nav,switcher,follow,comment_form,post_actions,unknown',
+            profile='author',
+            post=self.post.pk,
+            authors=f'{self.author.pk},{self.reader.pk},x',
+        )
+        data = response.json()
+
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertEqual(set(data['fragments']), {
+            'nav', 'switcher', 'follow', 'comment_form', 'post_actions'
+        })
+        self.assertIn('Пользователь: reader', data['fragments']['nav'])
+        self.assertIn('Отписаться', data['fragments']['follow'])
+        self.assertIn('csrfmiddlewaretoken', data['fragments']['comment_form'])
+        self.assertEqual(data['fragments']['post_actions'].strip(), '')
+        self.assertEqual(data['followed'], [self.author.pk])
+
+    def test_personal_fragments_for_author_and_guest(self):
+        """Автору — ссылка на редактирование, гостю — вход."""
+        author_client = Client()
+        author_client.force_login(self.author)
+        params = {'names': 'nav,post_actions,comment_form,follow',
+                  'profile': 'reader', 'post': self.post.pk,
+                  'authors': str(self.author.pk)}
+
+        author = self.personal(author_client, **params).json()
+        guest = self.personal(self.guest_client, **params).json()
+
+        self.assertIn(
+            'редактировать запись', author['fragments']['post_actions']
+        )
+        self.assertIn('Войти', guest['fragments']['nav'])
+        self.assertIn(reverse('users:login'), guest['fragments']['follow'])
+        self.assertEqual(guest['fragments']['comment_form'].strip(), '')
+        self.assertEqual(guest['followed'], [])
+
+    def test_personal_unknown_objects(self):
+        """Несуществующие профиль и пост — 404."""
+        cases = (
+            {'names': 'follow', 'profile': 'nobody'},
+            {'names': 'comment_form', 'post': 'abc'},
+            {'names': 'post_actions', 'post': self.post.pk + 100},
+        )
+        for params in cases:
+            with self.subTest(params=params):
+                response = self.personal(self.reader_client, **params)
+
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
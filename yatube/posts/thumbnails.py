@@ -0,0 +1,74 @@
+"""Фоновая генерация миниатюр постов.
+
+Миниатюра и адаптивные копии (posts.image_variants) строятся пулом
+потоков после фиксации транзакции, в которой загружено изображение;
+до этого шаблоны показывают заглушку.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from sorl.thumbnail import get_thumbnail
+
+from . import fragments, image_variants
+from .models import Post
+
+GEOMETRY = '960x339'
+OPTIONS = {'crop': 'center', 'upscale': True}
+
+logger = logging.getLogger(__name__)
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails',
+            )
+    return _executor
+
+
+def generate(post_id):
+    """Строит миниатюру и копии картинки поста."""
+    post = Post.objects.filter(pk=post_id).only(
+        'image', 'author', 'group'
+    ).first()
+    if post is None or not post.image:
+        return None
+    thumbnail = get_thumbnail(post.image, GEOMETRY, **OPTIONS)
+    image_variants.build(post)
+    # Если картинку успели заменить, миниатюра уже не нужна.
+    updated = Post.objects.filter(pk=post_id, image=post.image.name).update(
+        thumbnail=thumbnail.name
+    )
+    if updated:
+        fragments.bump(*fragments.post_scopes(post))
+    return thumbnail.name
+
+
+def _run(post_id):
+    try:
+        generate(post_id)
+    except Exception:
+        logger.exception('Не удалось построить миниатюру поста %s', post_id)
+    finally:
+        close_old_connections()
+
+
+def schedule(post):
+    """Ставит построение миниатюры в очередь.
+
+    При THUMBNAIL_ASYNC = False миниатюра строится сразу.
+    """
+    if not post.image:
+        return
+    if not settings.THUMBNAIL_ASYNC:
+        generate(post.pk)
+        return
+    transaction.on_commit(lambda: _get_executor().submit(_run, post.pk))
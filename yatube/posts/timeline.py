@@ -0,0 +1,166 @@
+"""Материализованная лента подписок (fan-out-on-write).
+
+Новый пост раскладывается по лентам подписчиков автора вместе с датой
+публикации, и страница ленты читается по индексу (user, -pub_date,
+-post) записей, без сортировки. Когда подписчиков у автора становится
+больше settings.TIMELINE_FANOUT_LIMIT, ему ставится флаг
+UserCounters.fanout_on_read: его посты больше не раскладываются, а
+ленты его подписчиков выбираются из Post напрямую (с сортировкой).
+Флаг снимает только rebuild(): новым подписчикам за это время записи
+не добавлялись.
+"""
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from .models import FEED_FIELDS, Follow, Post, TimelineEntry, UserCounters
+from .utils import paginator
+
+
+def is_enabled():
+    return settings.TIMELINE_ENABLED
+
+
+ENTRY_TABLE = TimelineEntry._meta.db_table
+FOLLOW_TABLE = Follow._meta.db_table
+POST_TABLE = Post._meta.db_table
+COUNTERS_TABLE = UserCounters._meta.db_table
+
+
+def _store(select, params):
+    """Записи ленты одним INSERT … SELECT, без выборки строк в Python.
+
+    SELECT возвращает user_id, post_id, author_id и pub_date. У него
+    всегда должен быть WHERE: иначе SQLite путает ON CONFLICT с
+    условием JOIN.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {ENTRY_TABLE} '
+            f'(user_id, post_id, author_id, pub_date) '
+            f'{select} ON CONFLICT DO NOTHING',
+            params,
+        )
+
+
+def _is_popular(author_id):
+    """Посты автора читаются при запросе ленты, а не раскладываются."""
+    return UserCounters.objects.filter(
+        user_id=author_id, fanout_on_read=True
+    ).exists()
+
+
+def _mark_popular(author_id):
+    """Ставит флаг, если подписчиков стало больше лимита."""
+    UserCounters.objects.filter(
+        user_id=author_id,
+        followers_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+        fanout_on_read=False,
+    ).update(fanout_on_read=True)
+
+
+def fan_out(post):
+    """Добавляет пост в ленты подписчиков автора."""
+    if _is_popular(post.author_id):
+        return
+    _store(
+        f'SELECT follow.user_id, post.id, post.author_id, post.pub_date '
+        f'FROM {FOLLOW_TABLE} AS follow '
+        f'JOIN {POST_TABLE} AS post ON post.author_id = follow.author_id '
+        f'WHERE post.id = %s',
+        [post.pk],
+    )
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту пользователя уже написанные посты автора."""
+    _mark_popular(author_id)
+    if _is_popular(author_id):
+        return
+    _store(
+        f'SELECT %s, id, author_id, pub_date FROM {POST_TABLE} '
+        f'WHERE author_id = %s',
+        [user_id, author_id],
+    )
+
+
+def prune(user_id, author_id):
+    """Убирает из ленты пользователя посты автора после отписки."""
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def rebuild(user_ids=None):
+    """Пересобирает ленты (все или указанных пользователей).
+
+    Полная пересборка заново ставит флаги fanout_on_read по текущему
+    числу подписчиков.
+    """
+    entries = TimelineEntry.objects.all()
+    condition = 'COALESCE(counters.fanout_on_read, %s) = %s'
+    params = [False, False]
+    if user_ids is None:
+        UserCounters.objects.update(fanout_on_read=False)
+        UserCounters.objects.filter(
+            followers_count__gt=settings.TIMELINE_FANOUT_LIMIT
+        ).update(fanout_on_read=True)
+    else:
+        user_ids = list(user_ids)
+        entries = entries.filter(user_id__in=user_ids)
+        condition += ' AND follow.user_id IN ({})'.format(
+            ', '.join(['%s'] * len(user_ids))
+        )
+        params.extend(user_ids)
+    entries.delete()
+    _store(
+        f'SELECT follow.user_id, post.id, post.author_id, post.pub_date '
+        f'FROM {FOLLOW_TABLE} AS follow '
+        f'JOIN {POST_TABLE} AS post ON post.author_id = follow.author_id '
+        f'LEFT JOIN {COUNTERS_TABLE} AS counters '
+        f'ON counters.user_id = follow.author_id '
+        f'WHERE {condition}',
+        params,
+    )
+
+
+def _popular_authors(user):
+    return Follow.objects.filter(
+        user=user, author__counters__fanout_on_read=True
+    ).values('author_id')
+
+
+def feed(user, queryset=None):
+    """Посты ленты подписок пользователя одним запросом к Post.
+
+    Посты авторов с флагом fanout_on_read выбираются напрямую
+    (fan-out-on-read), остальные — по записям ленты.
+    """
+    queryset = Post.objects.feed() if queryset is None else queryset
+    if not is_enabled():
+        return queryset.filter(author__following__user=user)
+    return queryset.filter(
+        Q(pk__in=TimelineEntry.objects.filter(user=user).values('post_id'))
+        | Q(author_id__in=_popular_authors(user))
+    )
+
+
+def entries(user):
+    """Записи ленты пользователя вместе с постами для карточек."""
+    return TimelineEntry.objects.filter(user=user).select_related(
+        'post__author', 'post__group'
+    ).prefetch_related('post__image_variants').only(
+        'user_id', 'pub_date', *[f'post__{name}' for name in FEED_FIELDS]
+    ).order_by('-pub_date', '-post_id')
+
+
+def page(request):
+    """Страница ленты подписок текущего пользователя.
+
+    Если среди подписок нет авторов с флагом, страница читается по
+    индексу записей ленты, иначе — общим запросом feed().
+    """
+    user = request.user
+    if not is_enabled() or _popular_authors(user).exists():
+        return paginator(feed(user), request)
+    page_obj = paginator(entries(user), request, tiebreak='post_id')
+    page_obj.object_list = [entry.post for entry in page_obj]
+    return page_obj
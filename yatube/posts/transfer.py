@@ -0,0 +1,327 @@
+"""Потоковый экспорт и импорт групп, постов, комментариев и подписок.
+
+Записи читаются и пишутся по одной (JSONL или CSV), в памяти держится
+только текущая пачка. Связи переносятся по естественным ключам:
+автор — username, группа — slug, пост — id. Импорт пишет bulk_create
+пачками внутри транзакций-чанков и пропускает уже существующие строки,
+поэтому повторный запуск с того же места безопасен.
+"""
+import csv
+import json
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import (
+    counters, follow_graph, fragments, search, timeline, trending,
+)
+from .models import Comment, Follow, Group, Post, User
+from .utils import auto_now_add_disabled, batched
+
+FORMATS = ('jsonl', 'csv')
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def parse_date(value):
+    if not value:
+        return timezone.now()
+    date = parse_datetime(value)
+    if date is None:
+        raise ValueError(f'Неверная дата: {value!r}')
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date)
+    return date
+
+
+def resolve_users(usernames):
+    """{username: id}; недостающие авторы создаются без пароля."""
+    usernames = set(filter(None, usernames))
+    found = dict(
+        User.objects.filter(username__in=usernames).values_list(
+            'username', 'pk'
+        )
+    )
+    missing = usernames - set(found)
+    if missing:
+        User.objects.bulk_create(
+            User(username=username, password=make_password(None))
+            for username in missing
+        )
+        found.update(
+            User.objects.filter(username__in=missing).values_list(
+                'username', 'pk'
+            )
+        )
+    return found
+
+
+class Dataset:
+    """Описание переносимой модели.
+
+    Набор определяет build(records): по пачке записей возвращает
+    объекты для bulk_create, число пропущенных записей и области кэша
+    (posts.fragments), которые нужно сбросить.
+    """
+
+    model = None
+    fields = ()
+    columns = ()
+    date_fields = ()
+    # Уникальный ключ строки: по нему импорт узнаёт уже существующие.
+    key_fields = ('id',)
+
+    def export_rows(self, chunk_size=1000):
+        columns = dict(zip(self.fields, self.columns))
+        for row in self.model.objects.order_by('pk').values(
+                *columns.values()).iterator(chunk_size=chunk_size):
+            yield {
+                name: self.dump_value(row[column])
+                for name, column in columns.items()
+            }
+
+    @staticmethod
+    def dump_value(value):
+        if value is None:
+            return ''
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+
+    def new_objects(self, objects):
+        """Объекты, ключей которых ещё нет ни в таблице, ни в пачке.
+
+        Объекты без ключа (пост без id) новые всегда.
+        """
+        keys = [
+            tuple(getattr(obj, field) for field in self.key_fields)
+            for obj in objects
+        ]
+        lookup = {
+            f'{field}__in': {key[index] for key in keys}
+            for index, field in enumerate(self.key_fields)
+        }
+        seen = set(
+            self.model.objects.filter(**lookup).values_list(*self.key_fields)
+        )
+        fresh = []
+        for obj, key in zip(objects, keys):
+            if None in key:
+                fresh.append(obj)
+            elif key not in seen:
+                seen.add(key)
+                fresh.append(obj)
+        return fresh
+
+
+class GroupDataset(Dataset):
+    model = Group
+    fields = columns = ('slug', 'title', 'description')
+    key_fields = ('slug',)
+
+    def build(self, records):
+        groups = [
+            Group(
+                slug=record['slug'],
+                title=record['title'],
+                description=record.get('description', ''),
+            )
+            for record in records
+        ]
+        return groups, 0, {fragments.GROUPS}
+
+
+class PostDataset(Dataset):
+    model = Post
+    fields = ('id', 'author', 'group', 'text', 'pub_date', 'image')
+    columns = (
+        'pk', 'author__username', 'group__slug', 'text', 'pub_date', 'image'
+    )
+    date_fields = ('pub_date',)
+
+    def build(self, records):
+        authors = resolve_users(record['author'] for record in records)
+        slugs = {record['group'] for record in records if record.get('group')}
+        groups = dict(
+            Group.objects.filter(slug__in=slugs).values_list('slug', 'pk')
+        )
+        posts, skipped, scopes = [], 0, set()
+        for record in records:
+            slug = record.get('group')
+            if slug and slug not in groups:
+                skipped += 1
+                continue
+            post = Post(
+                pk=record.get('id') or None,
+                author_id=authors[record['author']],
+                group_id=groups.get(slug),
+                text=record['text'],
+                pub_date=parse_date(record.get('pub_date')),
+                image=record.get('image', ''),
+            )
+            posts.append(post)
+            scopes.update(fragments.post_scopes(post))
+        return posts, skipped, scopes
+
+
+class CommentDataset(Dataset):
+    model = Comment
+    fields = ('id', 'post', 'author', 'text', 'created')
+    columns = ('pk', 'post_id', 'author__username', 'text', 'created')
+    date_fields = ('created',)
+
+    def build(self, records):
+        authors = resolve_users(record['author'] for record in records)
+        post_ids = set(
+            Post.objects.filter(
+                pk__in={int(record['post']) for record in records}
+            ).values_list('pk', flat=True)
+        )
+        comments, skipped, scopes = [], 0, set()
+        for record in records:
+            post_id = int(record['post'])
+            if post_id not in post_ids:
+                skipped += 1
+                continue
+            comments.append(Comment(
+                pk=record.get('id') or None,
+                post_id=post_id,
+                author_id=authors[record['author']],
+                text=record['text'],
+                created=parse_date(record.get('created')),
+            ))
+            scopes.add(fragments.post_scope(post_id))
+        return comments, skipped, scopes
+
+
+class FollowDataset(Dataset):
+    model = Follow
+    fields = ('user', 'author')
+    columns = ('user__username', 'author__username')
+    key_fields = ('user_id', 'author_id')
+
+    def build(self, records):
+        users = resolve_users(
+            name for record in records
+            for name in (record['user'], record['author'])
+        )
+        follows, skipped, scopes = [], 0, set()
+        for record in records:
+            if record['user'] == record['author']:
+                skipped += 1
+                continue
+            follow = Follow(
+                user_id=users[record['user']],
+                author_id=users[record['author']],
+            )
+            follows.append(follow)
+            # bulk_create не вызывает сигналы Follow.
+            follow_graph.invalidate_on_commit(
+                follow.user_id, follow.author_id
+            )
+            scopes.add(fragments.profile_scope(follow.user_id))
+            scopes.add(fragments.profile_scope(follow.author_id))
+        return follows, skipped, scopes
+
+
+# Порядок важен при полном переносе: связи ссылаются на предыдущие.
+DATASETS = {
+    'groups': GroupDataset(),
+    'posts': PostDataset(),
+    'comments': CommentDataset(),
+    'follows': FollowDataset(),
+}
+
+
+class _Echo:
+    """«Файл» для csv.writer: writerow возвращает готовую строку."""
+
+    def write(self, value):
+        return value
+
+
+def iter_records(rows, fields, fmt):
+    """Строки JSONL или CSV по записи; у CSV первой идёт шапка."""
+    if fmt == 'csv':
+        writer = csv.DictWriter(_Echo(), fieldnames=fields)
+        yield writer.writeheader()
+        for row in rows:
+            yield writer.writerow(row)
+        return
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def write_records(stream, rows, fields, fmt):
+    """Пишет записи в поток, возвращает их число."""
+    lines = iter_records(rows, fields, fmt)
+    if fmt == 'csv':
+        stream.write(next(lines))
+    total = 0
+    for total, line in enumerate(lines, start=1):
+        stream.write(line)
+    return total
+
+
+def read_records(stream, fmt):
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def load(dataset, records, batch_size=1000, chunk_size=10000, start=0,
+         on_chunk=None):
+    """Импортирует записи, начиная с позиции start.
+
+    Каждый чанк — отдельная транзакция; после её фиксации вызывается
+    on_chunk(позиция), чтобы сохранить точку продолжения.
+    """
+    stats = {'imported': 0, 'skipped': 0}
+    position = start
+    for chunk in batched(islice(records, start, None), chunk_size):
+        scopes = set()
+        with transaction.atomic(), auto_now_add_disabled(
+                dataset.model, *dataset.date_fields):
+            for batch in batched(chunk, batch_size):
+                objects, skipped, batch_scopes = dataset.build(batch)
+                fresh = dataset.new_objects(objects)
+                # ignore_conflicts — на случай параллельной записи.
+                dataset.model.objects.bulk_create(
+                    fresh, ignore_conflicts=True
+                )
+                stats['imported'] += len(fresh)
+                stats['skipped'] += skipped + len(objects) - len(fresh)
+                scopes |= batch_scopes
+        position += len(chunk)
+        fragments.bump(*scopes)
+        if on_chunk is not None:
+            on_chunk(position)
+    return stats
+
+
+def rebuild_derived():
+    """Пересчитывает счётчики, ленты, поисковый индекс и рейтинги.
+
+    bulk_create не вызывает сигналы, поэтому после массовой загрузки
+    производные данные обновляются один раз целиком. Каждая таблица
+    пересобирается в своей транзакции: читатели до фиксации видят
+    старые ленты и индекс, а сбой не оставляет их пустыми. Пересборка
+    идёт по всей базе, поэтому для небольших и дозагружаемых файлов
+    её откладывают (import_data --skip-rebuild) до последнего.
+    """
+    with transaction.atomic():
+        counters.reconcile()
+    if timeline.is_enabled():
+        with transaction.atomic():
+            timeline.rebuild()
+    with transaction.atomic():
+        search.get_backend().rebuild()
+    trending.compute(rebuild=True)
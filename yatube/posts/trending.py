@@ -0,0 +1,104 @@
+"""Лента «Популярное»: посты, которые активно комментируют сейчас.
+
+Каждый комментарий приносит посту балл, который затухает вдвое за
+settings.TRENDING_HALF_LIFE. Рейтинги хранятся в TrendingScore и
+пересчитываются инкрементально (команда compute_trending): накопленные
+баллы умножаются на общий множитель затухания одним UPDATE, к ним
+прибавляются только комментарии, написанные после прошлого запуска
+(с запасом TRENDING_LATE_MARGIN на поздние транзакции; уже учтённые
+из запаса помнит TrendingComment).
+Посты с рейтингом ниже TRENDING_MIN_SCORE удаляются, поэтому таблица
+остаётся маленькой, а страница читается по индексу рейтинга.
+"""
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from . import fragments
+from .models import Comment, Post, TrendingComment, TrendingScore
+
+
+def _decay(seconds):
+    return 0.5 ** (seconds / settings.TRENDING_HALF_LIFE)
+
+
+def window():
+    """Возраст, после которого комментарий весит меньше порога."""
+    return timedelta(seconds=settings.TRENDING_HALF_LIFE * math.log2(
+        1 / settings.TRENDING_MIN_SCORE
+    ))
+
+
+def compute(now=None, rebuild=False):
+    """Обновляет рейтинги и возвращает сводку пересчёта.
+
+    Время прошлого запуска хранится в самих строках (computed). Если
+    таблица пуста или rebuild=True, рейтинги считаются заново по
+    комментариям за window().
+    """
+    now = now or timezone.now()
+    margin = timedelta(seconds=settings.TRENDING_LATE_MARGIN)
+    with transaction.atomic():
+        last = None if rebuild else TrendingScore.objects.aggregate(
+            last=Max('computed')
+        )['last']
+        if last is None:
+            TrendingScore.objects.all().delete()
+            TrendingComment.objects.all().delete()
+            since = now - window()
+        else:
+            TrendingScore.objects.update(
+                score=F('score') * _decay((now - last).total_seconds()),
+                computed=now,
+            )
+            # created ставится до фиксации: комментарий старше прошлого
+            # запуска мог стать виден только после него.
+            since = last - margin
+        deltas = defaultdict(float)
+        processed = 0
+        recent = []
+        comments = Comment.objects.filter(
+            created__gt=since, created__lte=now
+        ).exclude(
+            pk__in=TrendingComment.objects.values('pk')
+        ).values_list('pk', 'post_id', 'created')
+        for pk, post_id, created in comments.iterator():
+            deltas[post_id] += _decay((now - created).total_seconds())
+            processed += 1
+            if created > now - margin:
+                recent.append(TrendingComment(comment_id=pk))
+        scores = TrendingScore.objects.in_bulk(list(deltas))
+        for score in scores.values():
+            score.score += deltas[score.pk]
+        TrendingScore.objects.bulk_update(scores.values(), ['score'])
+        TrendingScore.objects.bulk_create(
+            TrendingScore(post_id=post_id, score=delta, computed=now)
+            for post_id, delta in deltas.items() if post_id not in scores
+        )
+        pruned, _ = TrendingScore.objects.filter(
+            score__lt=settings.TRENDING_MIN_SCORE
+        ).delete()
+        TrendingComment.objects.filter(
+            comment__created__lte=now - margin
+        ).delete()
+        TrendingComment.objects.bulk_create(recent)
+    fragments.bump(fragments.TRENDING)
+    return {
+        'comments': processed,
+        'posts': TrendingScore.objects.count(),
+        'pruned': pruned,
+        'incremental': last is not None,
+    }
+
+
+def feed(queryset=None):
+    """Посты по убыванию рейтинга; страница читается по индексу."""
+    queryset = Post.objects.feed() if queryset is None else queryset
+    return queryset.filter(trending__isnull=False).order_by(
+        '-trending__score', '-pk'
+    )
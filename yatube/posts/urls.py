@@ -6,6 +6,11 @@ app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path(
+        'group/',
+        views.group_index,
+        name='group_index'
+    ),
     path(
         'group/<slug:slug>/',
         views.group_posts,
@@ -16,11 +21,46 @@ urlpatterns = [
         views.profile,
         name='profile'
     ),
+    path(
+        'profile/<str:username>/archive/',
+        views.profile_archive,
+        name='profile_archive'
+    ),
+    path(
+        'profile/<str:username>/feed/<str:kind>/',
+        views.posts_feed,
+        name='profile_feed'
+    ),
+    path(
+        'feed/<str:kind>/',
+        views.posts_feed,
+        name='feed'
+    ),
+    path(
+        'export/<str:dataset>/',
+        views.export_dataset,
+        name='export'
+    ),
     path(
         'posts/<int:post_id>/',
         views.post_detail,
         name='post_detail'
     ),
+    path(
+        'trending/',
+        views.trending_posts,
+        name='trending'
+    ),
+    path(
+        'personal/',
+        views.personal,
+        name='personal'
+    ),
+    path(
+        'search/',
+        views.post_search,
+        name='search'
+    ),
     path(
         'create/',
         views.post_create,
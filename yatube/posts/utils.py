@@ -1,9 +1,200 @@
+import base64
+import binascii
+import json
+from contextlib import contextmanager
+from itertools import islice
+
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+PAGE_PARAM = 'page'
+CURSOR_PARAM = 'cursor'
+COMMENTS_PARAM = 'comments'
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(ValueError):
+    """Курсор повреждён или выпущен для другой сортировки."""
+
+
+class KeysetPaginator:
+    """Пагинация по ключу (поле, tiebreak — обычно pk) без COUNT(*) и OFFSET.
+
+    Время получения страницы не зависит от её «глубины»: запрос
+    идёт по индексу поля сортировки, а позиция передаётся курсором.
+    """
+
+    def __init__(self, queryset, per_page, key='-pub_date', tiebreak='pk'):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.descending = key.startswith('-')
+        self.field = queryset.model._meta.get_field(key.lstrip('-'))
+        # Второе поле ключа: уникальное вместе с полем сортировки.
+        self.tiebreak = tiebreak
+
+    def encode(self, obj, direction):
+        raw = json.dumps(
+            [direction, self.field.value_to_string(obj),
+             getattr(obj, self.tiebreak)]
+        )
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode(self, cursor):
+        padded = cursor + '=' * (-len(cursor) % 4)
+        try:
+            direction, value, pk = json.loads(
+                base64.urlsafe_b64decode(padded.encode())
+            )
+            value = self.field.to_python(value)
+            pk = int(pk)
+        except (ValueError, TypeError, binascii.Error, ValidationError):
+            raise InvalidCursor(cursor)
+        if direction not in (NEXT, PREVIOUS) or value is None:
+            raise InvalidCursor(cursor)
+        return direction, value, pk
+
+    def get_page(self, cursor=None):
+        """Как Paginator.get_page: при плохом курсоре — первая страница."""
+        try:
+            position = self.decode(cursor) if cursor else None
+        except InvalidCursor:
+            position = None
+        return CursorPage(self, position)
+
+    def fetch(self, position):
+        forward = position is None or position[0] == NEXT
+        descending = self.descending == forward
+        name = self.field.name
+        queryset = self.queryset
+        if position is not None:
+            _, value, pk = position
+            lookup = 'lt' if descending else 'gt'
+            # Условие по диапазону отдельно, чтобы СУБД взяла индекс поля.
+            queryset = queryset.filter(
+                Q(**{f'{name}__{lookup}e': value}),
+                Q(**{f'{name}__{lookup}': value})
+                | Q(**{f'{self.tiebreak}__{lookup}': pk}),
+            )
+        prefix = '-' if descending else ''
+        rows = list(
+            queryset.order_by(prefix + name, prefix + self.tiebreak)[
+                :self.per_page + 1
+            ]
+        )
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+        return rows, has_more
+
+
+class CursorPage:
+    """Страница KeysetPaginator; строки выбираются при первом обращении."""
+
+    is_cursor = True
+
+    def __init__(self, paginator, position):
+        self.paginator = paginator
+        self.position = position
+        self._object_list = None
+
+    @cached_property
+    def _result(self):
+        rows, has_more = self.paginator.fetch(self.position)
+        if not rows and self.position is not None:
+            self.position = None
+            rows, has_more = self.paginator.fetch(None)
+        if self.position is None:
+            return rows, has_more, False
+        if self.position[0] == NEXT:
+            return rows, has_more, True
+        return rows, True, has_more
 
+    @property
+    def object_list(self):
+        if self._object_list is None:
+            return self._result[0]
+        return self._object_list
 
-def paginator(queryset, request):
-    paginator = Paginator(queryset, settings.POST_PER_PAGE)
-    page_number = request.GET.get('page')
+    @object_list.setter
+    def object_list(self, rows):
+        # Как у Page, строки страницы можно заменить (записи ленты —
+        # постами); курсоры по-прежнему строятся по исходным строкам.
+        self._object_list = rows
+
+    def has_next(self):
+        return self._result[1]
+
+    def has_previous(self):
+        return self._result[2]
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if self.has_next():
+            return self.paginator.encode(self._result[0][-1], NEXT)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous():
+            return self.paginator.encode(self._result[0][0], PREVIOUS)
+        return None
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __repr__(self):
+        return f'<Cursor page {self.position!r}>'
+
+
+def paginator(queryset, request, per_page=None, key='-pub_date',
+              tiebreak='pk'):
+    """Страница ленты в режиме settings.PAGINATION_MODE.
+
+    В режиме 'cursor' старые ссылки вида ?page=N продолжают работать
+    через обычный Paginator.
+    """
+    per_page = per_page or settings.POST_PER_PAGE
+    page_number = request.GET.get(PAGE_PARAM)
+    if settings.PAGINATION_MODE == 'cursor' and page_number is None:
+        return KeysetPaginator(queryset, per_page, key, tiebreak).get_page(
+            request.GET.get(CURSOR_PARAM)
+        )
+    paginator = Paginator(queryset, per_page)
 
     return paginator.get_page(page_number)
+
+
+@contextmanager
+def auto_now_add_disabled(model, *field_names):
+    """Позволяет сохранить явно заданные даты (импорт, замеры)."""
+    fields = [model._meta.get_field(name) for name in field_names]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
@@ -1,53 +1,167 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_POST
 
+from core.decorators import shared_page
+from core.streaming import stream_template
+
+from . import (
+    cards, feeds, follow_graph, fragments, groups, search, thumbnails,
+    timeline, transfer, trending,
+)
 from .forms import CommentForm, PostForm
-from .models import Comment, Follow, Group, Post, User
-from .utils import paginator
+from .models import Follow, Post, User, UserCounters
+from .utils import COMMENTS_PARAM, KeysetPaginator, paginator
+
+# Блоки data-personal общих страниц и их шаблоны.
+PERSONAL_TEMPLATES = {
+    'nav': 'includes/nav_user.html',
+    'switcher': 'includes/switcher.html',
+    'follow': 'includes/follow_button.html',
+    'post_actions': 'includes/post_actions.html',
+    'comment_form': 'includes/comment_form.html',
+}
 
 
-@cache_page(20, key_prefix="index_page")
+@shared_page
 def index(request):
-    posts = Post.objects.all()
+    posts = Post.objects.feed()
     context = {
         'page_obj': paginator(posts, request),
+        'feed_version': fragments.version_key(
+            fragments.INDEX, fragments.GROUPS
+        ),
     }
     return render(request, 'posts/index.html', context)
 
 
+def group_index(request):
+    """Каталог групп с числом постов и временем последнего поста"""
+    page_obj = Paginator(
+        groups.directory(), settings.GROUPS_PER_PAGE
+    ).get_page(request.GET.get('page'))
+    context = {
+        'page_obj': page_obj,
+        'feed_version': fragments.version_key(
+            fragments.GROUPS, fragments.INDEX
+        ),
+    }
+    return render(request, 'posts/group_index.html', context)
+
+
+@shared_page
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    group = groups.get_by_slug(slug)
+    posts = group.posts.feed()
     context = {
         'group': group,
         'page_obj': paginator(posts, request),
+        'feed_version': fragments.version_key(
+            fragments.group_scope(group.pk), fragments.GROUPS
+        ),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@shared_page
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.select_related('group', 'author')
-    following = request.user.is_authenticated and (
-        Follow.objects.filter(user=request.user, author=author)).exists()
-    posts_count = posts.count()
+    author = get_object_or_404(
+        User.objects.select_related('counters'), username=username
+    )
+    posts = author.posts.feed()
+    counters = UserCounters.for_user(author)
     context = {
         'page_obj': paginator(posts, request),
-        'posts_count': posts_count,
+        'posts_count': counters.posts_count,
+        'counters': counters,
         'author': author,
-        'following': following,
+        'feed_version': fragments.version_key(
+            fragments.profile_scope(author.pk), fragments.GROUPS
+        ),
     }
     return render(request, 'posts/profile.html', context)
 
 
+@shared_page
+def profile_archive(request, username):
+    """Все посты автора одной страницей; HTML отдаётся потоком"""
+    author = get_object_or_404(User, username=username)
+    return stream_template(
+        request, 'posts/profile_archive.html', {'author': author},
+        cards.render_stream(author.posts.feed(), settings.STREAM_BATCH_SIZE),
+    )
+
+
+@shared_page
+def posts_feed(request, kind, username=None):
+    """RSS или Atom последних постов сайта или автора, потоком"""
+    feed_class = feeds.FEED_TYPES.get(kind)
+    if feed_class is None:
+        raise Http404
+    posts = Post.objects.feed()
+    title = 'Yatube: последние записи'
+    link = reverse('posts:index')
+    if username is not None:
+        author = get_object_or_404(User, username=username)
+        posts = posts.filter(author=author)
+        title = (
+            f'Yatube: записи {author.get_full_name() or author.username}'
+        )
+        link = reverse('posts:profile', args=[author.username])
+    feed = feed_class(
+        title=title,
+        link=request.build_absolute_uri(link),
+        description=title,
+        language=settings.LANGUAGE_CODE,
+        feed_url=request.build_absolute_uri(),
+    )
+    items = feeds.post_items(
+        request, posts[:settings.FEED_ITEMS], settings.STREAM_BATCH_SIZE
+    )
+    return StreamingHttpResponse(
+        feed.stream(items), content_type=feed.content_type
+    )
+
+
+def export_dataset(request, dataset):
+    """Выгрузка posts.transfer в JSONL или CSV потоком (для персонала)"""
+    fmt = request.GET.get('format', 'jsonl')
+    if (not request.user.is_staff or dataset not in transfer.DATASETS
+            or fmt not in transfer.FORMATS):
+        raise Http404
+    source = transfer.DATASETS[dataset]
+    rows = source.export_rows(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    response = StreamingHttpResponse(
+        transfer.iter_records(rows, source.fields, fmt),
+        content_type=transfer.CONTENT_TYPES[fmt],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{dataset}.{fmt}"'
+    )
+    return response
+
+
+@shared_page
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    posts_count = post.author.posts.count()
-    comments = Comment.objects.select_related(
-        'author',
-        'post'
+    post = get_object_or_404(
+        Post.objects.select_related(
+            'author__counters', 'group'
+        ).prefetch_related('image_variants'),
+        pk=post_id,
     )
+    posts_count = UserCounters.for_user(post.author).posts_count
+    comments = KeysetPaginator(
+        post.comments.select_related('author'),
+        settings.COMMENTS_PER_PAGE,
+        key='created',
+    ).get_page(request.GET.get(COMMENTS_PARAM))
     form = CommentForm()
     context = {
         'post': post,
@@ -58,6 +172,89 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+def _personal_context(request, names):
+    context = {}
+    user = request.user
+    if 'follow' in names:
+        context['author'] = author = get_object_or_404(
+            User.objects.only('username'),
+            username=request.GET.get('profile', ''),
+        )
+        if user.is_authenticated:
+            following = follow_graph.is_following(user.pk, author.pk)
+            context['following'] = following
+            context['mutual'] = following and follow_graph.is_following(
+                author.pk, user.pk
+            )
+    if names & {'post_actions', 'comment_form'}:
+        post_id = request.GET.get('post', '')
+        if not post_id.isdigit():
+            raise Http404
+        context['post'] = get_object_or_404(
+            Post.objects.only('author_id'), pk=post_id
+        )
+        context['form'] = CommentForm()
+    return context
+
+
+@never_cache
+def personal(request):
+    """Личные блоки общих страниц и авторы, на которых подписан читатель"""
+    names = set(request.GET.get('names', '').split(',')) & set(
+        PERSONAL_TEMPLATES
+    )
+    context = _personal_context(request, names)
+    followed = []
+    if request.user.is_authenticated:
+        authors = {
+            int(author_id)
+            for author_id in request.GET.get('authors', '').split(',')
+            if author_id.isdigit()
+        }
+        followed = sorted(authors & follow_graph.following(request.user.pk))
+    return JsonResponse({
+        'fragments': {
+            name: render_to_string(
+                PERSONAL_TEMPLATES[name], context, request=request
+            )
+            for name in names
+        },
+        'followed': followed,
+    })
+
+
+def trending_posts(request):
+    """Популярное: посты по рейтингу, посчитанному compute_trending"""
+    page_obj = Paginator(trending.feed(), settings.POST_PER_PAGE).get_page(
+        request.GET.get('page')
+    )
+    context = {
+        'page_obj': page_obj,
+        'feed_version': fragments.version_key(
+            fragments.TRENDING, fragments.INDEX, fragments.GROUPS
+        ),
+    }
+    return render(request, 'posts/trending.html', context)
+
+
+def post_search(request):
+    """Поиск по текстам постов и названиям групп"""
+    query = request.GET.get('q', '').strip()
+    results = search.get_backend().search(query) if query else []
+    page_obj = Paginator(results, settings.POST_PER_PAGE).get_page(
+        request.GET.get('page')
+    )
+    page_obj.object_list = follow_graph.annotate(
+        list(page_obj.object_list), request.user
+    )
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'query_prefix': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def post_create(request):
     '''Страница для публикации постов'''
@@ -69,6 +266,7 @@ def post_create(request):
         post = form.save(False)
         post.author = request.user
         post.save()
+        thumbnails.schedule(post)
         return redirect('posts:profile', username=post.author)
 
     return render(request, 'posts/create_post.html', {'form': form})
@@ -86,7 +284,12 @@ def post_edit(request, post_id):
         instance=post
     )
     if form.is_valid():
-        form.save()
+        post = form.save(False)
+        if 'image' in form.changed_data:
+            post.thumbnail = ''
+        post.save()
+        if 'image' in form.changed_data:
+            thumbnails.schedule(post)
         return redirect('posts:post_detail', post_id=post_id)
     context = {
         'form': form,
@@ -97,44 +300,77 @@ def post_edit(request, post_id):
 
 
 @login_required
+@require_POST
 def add_comment(request, post_id):
-    """Страница добавления комментария"""
-    post = get_object_or_404(Post, pk=post_id)
-    form = CommentForm(request.POST or None)
+    """Добавление комментария; для AJAX — JSON с готовой разметкой."""
+    post = get_object_or_404(
+        Post.objects.only('author_id', 'group_id', 'comments_count'),
+        pk=post_id,
+    )
+    form = CommentForm(request.POST)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
         comment.save()
+        if request.is_ajax():
+            return JsonResponse({
+                'comments_count': post.comments_count + 1,
+                'html': render_to_string(
+                    'includes/comment_item.html', {'comment': comment},
+                    request=request,
+                ),
+            }, status=201)
+    elif request.is_ajax():
+        return JsonResponse({'errors': form.errors}, status=400)
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
 def follow_index(request):
     """Все посты автора на которого подписан текущий пользователь"""
-    posts = Post.objects.filter(author__following__user=request.user)
+    suggested = follow_graph.suggestions(request.user.pk)
+    authors = User.objects.select_related('counters').in_bulk(suggested)
     context = {
-        'page_obj': paginator(posts, request),
+        'page_obj': timeline.page(request),
+        'suggestions': [authors[pk] for pk in suggested if pk in authors],
     }
     return render(request, 'posts/follow.html', context)
 
 
+def _follow_response(request, username, following, changed):
+    if request.is_ajax():
+        return JsonResponse({
+            'username': username,
+            'following': following,
+            'changed': changed,
+        })
+    return redirect('posts:profile', username=username)
+
+
 @login_required
+@require_POST
 def profile_follow(request, username):
-    """Функция для подписки на автора"""
-    author = get_object_or_404(User, username=username)
-    currently_user = request.user
-    follower = Follow.objects.filter(user=currently_user, author=author)
-    if currently_user != author and not follower.exists():
-        Follow.objects.create(user=currently_user, author=author)
-    return redirect('posts:profile', username=username)
+    """Подписка на автора; повторный запрос ничего не меняет."""
+    if Follow.objects.follow(request.user.pk, username) is not None:
+        return _follow_response(request, username, True, True)
+    # Ничего не вставлено: уже подписан, автора нет или это он сам.
+    author_id = User.objects.filter(username=username).values_list(
+        'pk', flat=True
+    ).first()
+    if author_id is None:
+        raise Http404
+    return _follow_response(
+        request, username, author_id != request.user.pk, False
+    )
 
 
 @login_required
+@require_POST
 def profile_unfollow(request, username):
-    author = get_object_or_404(User, username=username)
-    currently_user = request.user
-    follower = Follow.objects.filter(user=currently_user, author=author)
-    if follower.exists():
-        follower.delete()
-    return redirect('posts:profile', username=username)
+    """Отписка от автора; повторный запрос ничего не меняет."""
+    if Follow.objects.unfollow(request.user.pk, username) is not None:
+        return _follow_response(request, username, False, True)
+    if not User.objects.filter(username=username).exists():
+        raise Http404
+    return _follow_response(request, username, False, False)
@@ -0,0 +1,55 @@
+// Отправка форм подписки и комментариев без перезагрузки страницы.
+// Без JavaScript формы работают как обычно: POST и редирект.
+(function () {
+  'use strict';
+
+  function send(form) {
+    return fetch(form.action, {
+      method: 'POST',
+      body: new FormData(form),
+      credentials: 'same-origin',
+      headers: {'X-Requested-With': 'XMLHttpRequest'},
+    }).then(function (response) {
+      return response.json().then(function (data) {
+        return {ok: response.ok, data: data};
+      });
+    });
+  }
+
+  var handlers = {
+    follow: function (form, data) {
+      var button = form.querySelector('button');
+      form.action = data.following
+        ? form.dataset.unfollowUrl
+        : form.dataset.followUrl;
+      button.textContent = data.following ? 'Отписаться' : 'Подписаться';
+      button.classList.toggle('btn-light', data.following);
+      button.classList.toggle('btn-primary', !data.following);
+    },
+    comment: function (form, data) {
+      document.getElementById('comment-list')
+        .insertAdjacentHTML('beforeend', data.html);
+      var counter = document.getElementById('comments-count');
+      if (counter) {
+        counter.textContent = data.comments_count;
+      }
+      form.reset();
+    },
+  };
+
+  document.addEventListener('submit', function (event) {
+    var form = event.target;
+    var handler = handlers[form.dataset.ajax];
+    if (!handler || !window.fetch) {
+      return;
+    }
+    event.preventDefault();
+    send(form).then(function (result) {
+      if (result.ok) {
+        handler(form, result.data);
+      }
+    }).catch(function () {
+      form.submit();
+    });
+  });
+})();
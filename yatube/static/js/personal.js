@@ -0,0 +1,60 @@
+// Личные части общих страниц: меню пользователя, подписка, форма
+// комментария. Страница отдаётся всем одинаковой (её кэширует прокси),
+// а блоки data-personal заменяются ответом posts:personal.
+// Без JavaScript остаётся вариант для гостя.
+(function () {
+  'use strict';
+
+  var BADGE = 'Вы подписаны на автора';
+
+  var script = document.getElementById('personal');
+  var blocks = document.querySelectorAll('[data-personal]');
+  if (!script || !window.fetch) {
+    return;
+  }
+  var params = new URLSearchParams();
+  var names = [];
+  blocks.forEach(function (block) {
+    names.push(block.dataset.personal);
+    Object.keys(block.dataset).forEach(function (key) {
+      if (key !== 'personal') {
+        params.set(key, block.dataset[key]);
+      }
+    });
+  });
+  var authors = {};
+  document.querySelectorAll('article[data-author]').forEach(function (card) {
+    authors[card.dataset.author] = true;
+  });
+  params.set('names', names.join(','));
+  params.set('authors', Object.keys(authors).join(','));
+
+  fetch(script.dataset.url + '?' + params.toString(), {
+    credentials: 'same-origin',
+    headers: {'X-Requested-With': 'XMLHttpRequest'},
+  }).then(function (response) {
+    return response.ok ? response.json() : null;
+  }).then(function (data) {
+    if (!data) {
+      return;
+    }
+    blocks.forEach(function (block) {
+      var html = data.fragments[block.dataset.personal];
+      if (html !== undefined) {
+        block.innerHTML = html;
+      }
+    });
+    var followed = {};
+    data.followed.forEach(function (id) {
+      followed[id] = true;
+    });
+    document.querySelectorAll('article[data-author]').forEach(function (card) {
+      if (followed[card.dataset.author]) {
+        var badge = document.createElement('span');
+        badge.className = 'badge bg-light text-dark';
+        badge.textContent = BADGE;
+        card.after(badge);
+      }
+    });
+  });
+})();
@@ -30,6 +30,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
+    'core.middleware.QueryWatchMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -55,11 +57,17 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'core.context_processors.cache.fragment_cache',
+                'core.context_processors.shared.guest_user',
             ],
         },
     },
 ]
 
+# Загружать все шаблоны при старте WSGI-воркера (core.template_cache);
+# имеет смысл только с кэширующим загрузчиком, см. settings_prod.
+TEMPLATE_WARMUP = False
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 
@@ -70,6 +78,17 @@ DATABASES = {
     }
 }
 
+# Прагмы SQLite для каждого нового соединения (core.db.configure_sqlite).
+# Режим WAL и остальная настройка — в yatube.settings_prod.
+SQLITE_PRAGMAS = {}
+
+# Алиасы реплик в DATABASES для чтения; используются, если в
+# DATABASE_ROUTERS подключён core.db.PrimaryReplicaRouter. С реплик
+# читаются только модели приложений REPLICA_APPS (ленты), сессии и
+# пользователи — всегда с основной БД.
+DATABASE_REPLICAS = []
+REPLICA_APPS = ('posts',)
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -105,8 +124,67 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# Отдавать STATIC_ROOT из WSGI-приложения (core.static_wsgi) — в
+# settings_prod; файлы без хэша в имени кэшируются на STATIC_MAX_AGE.
+STATIC_WSGI = False
+STATIC_MAX_AGE = 60
+
+# При collectstatic из этих файлов удаляются правила с классами и id,
+# которых нет в исходниках STATIC_PURGE_SOURCES (core.css_purge).
+STATIC_PURGE_CSS = ['css/bootstrap.min.css']
+STATIC_PURGE_SOURCES = [
+    os.path.join(BASE_DIR, name)
+    for name in ('templates', 'static/js', 'posts', 'core', 'users', 'about')
+]
+
 POST_PER_PAGE = 10
 
+# 'cursor' — keyset-пагинация лент, 'page' — Paginator с OFFSET.
+PAGINATION_MODE = 'cursor'
+
+COMMENTS_PER_PAGE = 20
+
+GROUPS_PER_PAGE = 30
+
+# Потоковые ответы (core.streaming): архив автора выводится пачками по
+# STREAM_BATCH_SIZE карточек, в RSS/Atom — FEED_ITEMS последних постов,
+# выгрузка posts:export читает таблицы по EXPORT_CHUNK_SIZE строк.
+STREAM_BATCH_SIZE = 100
+FEED_ITEMS = 50
+EXPORT_CHUNK_SIZE = 2000
+
+# Время жизни группы в кэше поиска по slug (posts.groups); при
+# изменении группы запись сбрасывается сигналом.
+GROUP_CACHE_TTL = 60 * 60
+
+# Материализованная лента подписок: посты раскладываются по лентам
+# подписчиков при публикации. Авторов, у которых подписчиков больше
+# TIMELINE_FANOUT_LIMIT, лента читает напрямую, пока их не вернёт
+# команда rebuild_timelines.
+TIMELINE_ENABLED = True
+TIMELINE_FANOUT_LIMIT = 1000
+
+# Время жизни кэшированных множеств подписок (posts.follow_graph);
+# при подписке и отписке они сбрасываются сигналами.
+FOLLOW_GRAPH_TTL = 60 * 60
+
+# Лента «Популярное» (posts.trending): комментарий даёт посту балл,
+# который затухает вдвое за TRENDING_HALF_LIFE секунд. Посты с
+# рейтингом ниже TRENDING_MIN_SCORE в таблицу рейтинга не попадают.
+TRENDING_HALF_LIFE = 6 * 60 * 60
+TRENDING_MIN_SCORE = 0.05
+# Пересчёт перечитывает комментарии за столько секунд до прошлого
+# запуска: транзакция могла зафиксироваться позже, чем он прошёл.
+TRENDING_LATE_MARGIN = 5 * 60
+
+# Общие страницы (index, group_list, profile, post_detail) анонимным
+# посетителям отдаются с Cache-Control: public на столько секунд.
+# Прокси не должен отдавать кэш запросам с cookie сессии
+# (в nginx: proxy_cache_bypass $cookie_sessionid).
+SHARED_PAGE_MAX_AGE = 60
+
 LOGIN_URL = 'users:login'
 
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -116,8 +194,70 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
-CACHES = {
-    'default': {
+# Бэкенд поиска по постам: SQLiteFTSBackend (FTS5) или LikeBackend.
+POSTS_SEARCH_BACKEND = 'posts.search.SQLiteFTSBackend'
+
+# Миниатюры постов строятся в фоне пулом из THUMBNAIL_WORKERS потоков.
+THUMBNAIL_ASYNC = True
+THUMBNAIL_WORKERS = 2
+
+# Ширины и форматы адаптивных копий картинок постов (srcset).
+POST_IMAGE_WIDTHS = (320, 640, 960)
+POST_IMAGE_FORMATS = ('webp', 'jpeg')
+
+# 'sqlite' — общий для всех процессов кэш в файле (core.cache_backends),
+# 'locmem' — кэш в памяти процесса.
+CACHE_BACKENDS = {
+    'sqlite': {
+        'BACKEND': 'core.cache_backends.SQLiteCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'cache.sqlite3'),
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+            'CULL_FREQUENCY': 10,
+        },
+    },
+    'locmem': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[os.environ.get('CACHE_BACKEND', 'sqlite')],
+}
+
+# Тесты работают с CACHE_BACKENDS['locmem'], см. core.testing.TestRunner.
+TEST_RUNNER = 'core.testing.TestRunner'
+
+# Время жизни кэшированных фрагментов лент и карточек, секунд.
+# Актуальность обеспечивают версии в posts.fragments.
+FRAGMENT_CACHE_TTL = 60 * 60
+
+# Замеры запросов (core.middleware.PerformanceMiddleware). Для доли
+# PERF_TRACE_SAMPLE_RATE запросов пишется SQL; трассы запросов дольше
+# PERF_SLOW_REQUEST_MS мс сохраняются и видны на /internal/perf/.
+PERF_METRICS_ENABLED = True
+PERF_SLOW_REQUEST_MS = 500
+PERF_TRACE_SAMPLE_RATE = 0.1
+
+# Поиск медленных и повторяющихся (N+1) запросов, core.querywatch;
+# включается при разработке и в тестах бюджетов запросов.
+# При QUERYWATCH_RAISE превышение QUERY_BUDGETS — исключение, иначе
+# предупреждение в журнале core.querywatch.
+QUERYWATCH_ENABLED = False
+QUERYWATCH_RAISE = False
+QUERYWATCH_SLOW_MS = 100
+QUERYWATCH_DUPLICATES = 3
+# Запросов на страницу при пустом кэше, с учётом сессии, пользователя
+# и COUNT(*) при постраничной навигации (?page=).
+QUERY_BUDGETS = {
+    'posts:index': 5,
+    'posts:group_index': 5,
+    'posts:group_list': 6,
+    'posts:profile': 8,
+    'posts:post_detail': 5,
+    'posts:follow_index': 8,
+    'posts:search': 7,
+    'posts:trending': 6,
+    'posts:personal': 6,
 }
@@ -0,0 +1,107 @@
+"""Настройки для боевого запуска.
+
+DJANGO_SETTINGS_MODULE=yatube.settings_prod. По умолчанию — файл SQLite
+в режиме WAL с постоянными соединениями; DATABASE_ENGINE=postgresql
+включает PostgreSQL (параметры в POSTGRES_*). Реплики для чтения лент
+перечисляются через запятую: SQLITE_REPLICAS — пути к копиям файла
+(их обновляет команда copy_sqlite_replica), POSTGRES_REPLICA_HOSTS —
+хосты реплик PostgreSQL.
+"""
+import os
+from copy import deepcopy
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, STATIC_ROOT, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('SECRET_KEY', SECRET_KEY)  # noqa: F405
+
+ALLOWED_HOSTS = os.environ.get(
+    'ALLOWED_HOSTS', ','.join(ALLOWED_HOSTS)  # noqa: F405
+).split(',')
+
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite')
+
+
+def _replicas(primary, field, values):
+    """Алиасы реплик: копии primary с другим значением field."""
+    return {
+        f'replica_{number}': {
+            **primary,
+            field: value,
+            # В тестах реплика — та же БД, что и default.
+            'TEST': {'MIRROR': 'default'},
+        }
+        for number, value in enumerate(values, start=1)
+    }
+
+
+def _split(value):
+    return [item for item in value.split(',') if item]
+
+
+if DATABASE_ENGINE == 'postgresql':
+    PRIMARY_DATABASE = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('POSTGRES_DB', 'yatube'),
+        'USER': os.environ.get('POSTGRES_USER', 'yatube'),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+        'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': 600,
+    }
+    REPLICAS = _replicas(
+        PRIMARY_DATABASE, 'HOST',
+        _split(os.environ.get('POSTGRES_REPLICA_HOSTS', '')),
+    )
+    # Таблица posts_post_fts (миграция 0016) есть только в SQLite.
+    POSTS_SEARCH_BACKEND = 'posts.search.LikeBackend'
+else:
+    PRIMARY_DATABASE = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get(
+            'SQLITE_PATH', os.path.join(BASE_DIR, 'db.sqlite3')
+        ),
+        # Секунд ожидания блокировки записи вместо немедленного
+        # «database is locked».
+        'OPTIONS': {'timeout': 20},
+        'CONN_MAX_AGE': 600,
+    }
+    REPLICAS = _replicas(
+        PRIMARY_DATABASE, 'NAME',
+        _split(os.environ.get('SQLITE_REPLICAS', '')),
+    )
+
+DATABASES = {'default': PRIMARY_DATABASE, **REPLICAS}
+DATABASE_REPLICAS = list(REPLICAS)
+DATABASE_ROUTERS = ['core.db.PrimaryReplicaRouter']
+
+# WAL: читатели не блокируют писателя и друг друга. synchronous=NORMAL
+# в режиме WAL не теряет целостность, только последние транзакции при
+# сбое питания. Отрицательный cache_size — размер в КиБ.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -32000,
+    'temp_store': 'MEMORY',
+    'mmap_size': 128 * 1024 * 1024,
+}
+
+# Шаблоны разбираются один раз на процесс; при старте воркера все
+# шаблоны проекта загружаются заранее (TEMPLATE_WARMUP).
+TEMPLATES = deepcopy(TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+TEMPLATE_WARMUP = True
+
+# Статика: хэши в именах, урезанный CSS и сжатые копии (collectstatic),
+# раздача из WSGI-приложения без отдельного сервера.
+STATICFILES_STORAGE = 'core.staticfiles.CompressedManifestStaticFilesStorage'
+STATIC_ROOT = os.environ.get('STATIC_ROOT', STATIC_ROOT)
+STATIC_WSGI = True
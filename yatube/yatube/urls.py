@@ -6,9 +6,11 @@ from django.urls import include, path
 urlpatterns = [
     path('auth/', include('users.urls', namespace='users')),
     path('admin/', admin.site.urls),
+    path('api/v1/', include('posts.api_urls', namespace='api')),
     path('', include('posts.urls', namespace='posts')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path('internal/', include('core.urls', namespace='core')),
 ]
 
 handler403 = 'core.views.permission_denied'
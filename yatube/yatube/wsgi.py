@@ -1,7 +1,18 @@
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+if settings.TEMPLATE_WARMUP:
+    from core.template_cache import warm_up
+
+    warm_up()
+
+if settings.STATIC_WSGI:
+    from core.static_wsgi import StaticFilesApp
+
+    application = StaticFilesApp(application)